@@ -0,0 +1,226 @@
+"""Reportes de ventas por día, producto, categoría y cajero sobre los acumulados diarios.
+
+Los días completos del rango se leen de ventas_diarias_producto / ventas_diarias_usuario (una fila
+por día y producto o usuario, mantenidas por trigger en cada venta); solo las puntas de días
+incompletos se leen de la tabla ventas (o de los archivos anuales, si caen en un año archivado).
+
+Benchmark (sobre una base de prueba, nunca la del negocio):
+    DB_PATH=/tmp/ventas_prueba.db python -m core.analitica_ventas --sinteticas 10000000
+"""
+import time
+import random
+import sqlite3
+import logging
+import argparse
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from core.database import conectar_db, transaccion, SQL_IMPORTE_VENTA
+from core.archivo_ventas import ventas_en_rango
+
+# Dimensiones de reporte: (tabla de acumulados, columna en el acumulado, expresión en ventas).
+# Los totales por día salen del acumulado por usuario: hay muchos menos cajeros que productos.
+DIMENSIONES = {
+    "dia": ("ventas_diarias_usuario", "dia", "substr(v.fecha, 1, 10)"),
+    "producto": ("ventas_diarias_producto", "producto_id", "IFNULL(v.producto_id, 0)"),
+    "usuario": ("ventas_diarias_usuario", "usuario_id", "IFNULL(v.usuario_id, 0)"),
+}
+
+def _instante(valor, fin=False):
+    """Convierte una fecha o fecha y hora en datetime. Una fecha sola como `fin` incluye todo ese día."""
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime.combine(valor + timedelta(days=1) if fin else valor, datetime.min.time())
+    instante = datetime.fromisoformat(valor)
+    if fin and len(valor) == 10:
+        instante += timedelta(days=1)
+    return instante
+
+def limites_rango(desde, hasta):
+    """(inicio, fin) como datetime del intervalo [inicio, fin) que cubre [desde, hasta]."""
+    return _instante(desde), _instante(hasta, fin=True)
+
+def tramos_consulta(desde, hasta):
+    """Parte [desde, hasta] en días completos (de los acumulados) y puntas sueltas (de ventas).
+
+    Devuelve ((primer_dia, ultimo_dia) o None, [(inicio, fin), ...]) con fechas en texto; las
+    puntas son intervalos [inicio, fin). `hasta` sin hora incluye ese día; con hora es excluyente.
+    """
+    inicio, fin = limites_rango(desde, hasta)
+    if fin <= inicio:
+        return None, []
+    primer_dia = inicio.date() if inicio.time() == datetime.min.time() else inicio.date() + timedelta(days=1)
+    ultimo_dia = fin.date() - timedelta(days=1)  # el día de `fin` no está completo (fin es excluyente)
+    if primer_dia > ultimo_dia:
+        return None, [(str(inicio), str(fin))]
+
+    sueltos = []
+    corte_inicio = datetime.combine(primer_dia, datetime.min.time())
+    corte_fin = datetime.combine(ultimo_dia + timedelta(days=1), datetime.min.time())
+    if inicio < corte_inicio:
+        sueltos.append((str(inicio), str(corte_inicio)))
+    if corte_fin < fin:
+        sueltos.append((str(corte_fin), str(fin)))
+    return (primer_dia.isoformat(), ultimo_dia.isoformat()), sueltos
+
+def _consulta_agregada(dimension, dias, sueltos, tabla_ventas="ventas"):
+    """SQL y parámetros que devuelven (clave, unidades, importe) de la dimensión en los tramos dados."""
+    tabla, columna, expresion = DIMENSIONES[dimension]
+    partes, parametros = [], []
+    if dias:
+        partes.append(f"SELECT {columna} AS clave, unidades, importe FROM {tabla} WHERE dia >= ? AND dia <= ?")
+        parametros.extend(dias)
+    for inicio, fin in sueltos:
+        partes.append(
+            f"SELECT {expresion} AS clave, v.cantidad AS unidades, {SQL_IMPORTE_VENTA.format(v='v')} AS importe "
+            f"FROM {tabla_ventas} v "
+            f"WHERE v.fecha >= ? AND v.fecha < ?"
+        )
+        parametros.extend((inicio, fin))
+    if not partes:
+        partes.append("SELECT NULL AS clave, 0 AS unidades, 0.0 AS importe WHERE 0")
+    union = " UNION ALL ".join(partes)
+    return f"SELECT clave, SUM(unidades) AS unidades, SUM(importe) AS importe FROM ({union}) GROUP BY clave", parametros
+
+def _consultar(descripcion, dimension, desde, hasta, armar=lambda sql: sql, extra=()):
+    """Ejecuta `armar(sql agregado)`; los años archivados se adjuntan solo si alguna punta cae en ellos."""
+    dias, sueltos = tramos_consulta(desde, hasta)
+    try:
+        with ventas_en_rango(sueltos[0][0], sueltos[-1][1]) if sueltos else nullcontext("ventas") as tabla_ventas:
+            sql, parametros = _consulta_agregada(dimension, dias, sueltos, tabla_ventas)
+            return conectar_db().execute(armar(sql), [*parametros, *extra]).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al calcular {descripcion}: {e}")
+        return []
+
+def ventas_por_dia(desde, hasta):
+    """[(dia, unidades, importe)] ordenado por día."""
+    return _consultar("ventas por día", "dia", desde, hasta, lambda sql: f"{sql} ORDER BY clave")
+
+def ventas_por_producto(desde, hasta, limite=None):
+    """[(producto_id, nombre, unidades, importe)] de mayor a menor importe."""
+    def armar(sql):
+        return f'''
+            SELECT t.clave, IFNULL(p.nombre, 'Producto ' || t.clave), t.unidades, t.importe
+            FROM ({sql}) t LEFT JOIN productos p ON p.id = t.clave
+            ORDER BY t.importe DESC
+        ''' + (" LIMIT ?" if limite else "")
+    return _consultar("ventas por producto", "producto", desde, hasta, armar, (limite,) if limite else ())
+
+def ventas_por_categoria(desde, hasta):
+    """[(categoria, unidades, importe)] de mayor a menor importe (categoría actual de cada producto)."""
+    return _consultar("ventas por categoría", "producto", desde, hasta, lambda sql: f'''
+        SELECT IFNULL(p.categoria, 'Productos Varios'), SUM(t.unidades), SUM(t.importe)
+        FROM ({sql}) t LEFT JOIN productos p ON p.id = t.clave
+        GROUP BY 1 ORDER BY 3 DESC
+    ''')
+
+def ventas_por_usuario(desde, hasta):
+    """[(usuario_id, nombre, unidades, importe)] por cajero, de mayor a menor importe."""
+    return _consultar("ventas por usuario", "usuario", desde, hasta, lambda sql: f'''
+        SELECT t.clave, IFNULL(u.nombre, 'Usuario ' || t.clave), t.unidades, t.importe
+        FROM ({sql}) t LEFT JOIN usuarios u ON u.id = t.clave
+        ORDER BY t.importe DESC
+    ''')
+
+def totales_ventas(desde, hasta):
+    """(unidades, importe) vendidos en el rango."""
+    filas = _consultar("totales de ventas", "usuario", desde, hasta,
+                       lambda sql: f"SELECT IFNULL(SUM(unidades), 0), IFNULL(SUM(importe), 0.0) FROM ({sql})")
+    return filas[0] if filas else (0, 0.0)
+
+### **🔹 Benchmark**
+
+def generar_ventas_sinteticas(filas, dias=730, productos=5000, usuarios=20, lote=50000, semilla=1):
+    """Carga `filas` renglones de venta al azar en los últimos `dias` días (para medir; los triggers actualizan los acumulados)."""
+    aleatorio = random.Random(semilla)
+    hoy = datetime.now().replace(microsecond=0)
+    with transaccion("IMMEDIATE") as conn:
+        existentes = conn.execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO productos (nombre, marca, cantidad, precio, categoria) VALUES (?, ?, ?, ?, ?)",
+            ((f"Producto {i}", f"Marca {i % 97}", 1000, round(aleatorio.uniform(1, 500), 2), f"Categoría {i % 25}")
+             for i in range(existentes, productos)),
+        )
+        existentes = conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO usuarios (nombre, password, email, dni, rol) VALUES (?, '-', ?, ?, 'usuario')",
+            ((f"cajero{i}", f"cajero{i}@ejemplo.com", f"DNI{i}") for i in range(existentes, usuarios)),
+        )
+        ticket = conn.execute("SELECT ultimo FROM secuencia_tickets WHERE id = 1").fetchone()[0]
+    segundos_rango = dias * 86400
+    for comienzo in range(0, filas, lote):
+        renglones = []
+        for i in range(comienzo, min(comienzo + lote, filas)):
+            fecha = hoy - timedelta(seconds=segundos_rango * (filas - i) // filas)
+            renglones.append((
+                aleatorio.randint(1, usuarios), aleatorio.randint(1, productos), aleatorio.randint(1, 5),
+                fecha.strftime("%Y-%m-%d %H:%M:%S"), ticket + i // 3 + 1, round(aleatorio.uniform(1, 500), 2),
+            ))
+        with transaccion("IMMEDIATE") as conn:
+            conn.executemany(
+                "INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario) VALUES (?, ?, ?, ?, ?, ?)",
+                renglones,
+            )
+
+def _ventas_directas(dimension, desde, hasta):
+    """La misma agregación leyendo solo la tabla ventas (referencia para comparar)."""
+    expresion = DIMENSIONES[dimension][2]
+    inicio, fin = limites_rango(desde, hasta)
+    return conectar_db().execute(
+        f"SELECT {expresion}, SUM(v.cantidad), SUM({SQL_IMPORTE_VENTA.format(v='v')}) FROM ventas v "
+        f"WHERE v.fecha >= ? AND v.fecha < ? GROUP BY 1",
+        (str(inicio), str(fin)),
+    ).fetchall()
+
+def medir_reportes(desde, hasta, repeticiones=3):
+    """Segundos por reporte leyendo ventas directamente vs. acumulados + puntas; verifica que coincidan."""
+    consultas = {
+        "dia": ventas_por_dia,
+        "producto": ventas_por_producto,
+        "usuario": ventas_por_usuario,
+    }
+
+    def medir(funcion):
+        mejor, resultado = float("inf"), None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = funcion()
+            mejor = min(mejor, time.perf_counter() - inicio)
+        return mejor, resultado
+
+    resultados = {}
+    for dimension, funcion in consultas.items():
+        directo, filas_directas = medir(lambda: _ventas_directas(dimension, desde, hasta))
+        acumulado, filas = medir(lambda: funcion(desde, hasta))
+        esperado = {clave: (unidades, round(importe, 2)) for clave, unidades, importe in filas_directas}
+        obtenido = {fila[0]: (fila[-2], round(fila[-1], 2)) for fila in filas}
+        resultados[dimension] = {"directo_s": directo, "acumulados_s": acumulado, "filas": len(filas), "coincide": esperado == obtenido}
+    return resultados
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mide los reportes de ventas con y sin acumulados diarios.")
+    parser.add_argument("--sinteticas", type=int, default=0, help="cargar antes N ventas de prueba")
+    parser.add_argument("--desde", help="inicio del rango (por defecto, hace un año a media mañana)")
+    parser.add_argument("--hasta", help="fin del rango (por defecto, ahora)")
+    args = parser.parse_args(argumentos)
+
+    from core.database import inicializar_db
+
+    inicializar_db()
+    if args.sinteticas:
+        inicio = time.perf_counter()
+        generar_ventas_sinteticas(args.sinteticas)
+        segundos = time.perf_counter() - inicio
+        print(f"{args.sinteticas} ventas cargadas en {segundos:.1f} s ({args.sinteticas / segundos:.0f} filas/s con triggers)")
+    ahora = datetime.now().replace(microsecond=0)
+    desde = args.desde or str((ahora - timedelta(days=365)).replace(hour=10, minute=30, second=0))
+    hasta = args.hasta or str(ahora)
+    for dimension, r in medir_reportes(desde, hasta).items():
+        print(
+            f"{dimension:>9}: directo {r['directo_s'] * 1000:8.1f} ms | acumulados {r['acumulados_s'] * 1000:7.1f} ms "
+            f"| {r['filas']} filas | coincide={r['coincide']}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Archivo de ventas por año: los años cerrados pasan de ordico.db a ventas_AAAA.db.
+
+La base principal queda chica (y sus copias, VACUUM y consultas sin índice, rápidas). Los
+acumulados diarios (ventas_diarias_*) se conservan en la base principal, así que los reportes por
+días completos no necesitan los archivos; las consultas que sí leen renglones usan
+ventas_en_rango(), que adjunta (ATTACH) solo los años del rango y los une en una vista temporal.
+
+El paso de un año es seguro ante cortes:
+1. Los renglones se copian a ventas_AAAA.db.tmp, que se renombra al terminar.
+2. Se comparan cantidad de renglones y SHA-256 de la copia con los de la base principal.
+3. En una transacción se registra el año en ventas_archivadas; desde ahí las consultas leen ese
+   año del archivo e ignoran lo que quede en la base principal.
+4. Se borran los renglones de la base principal en lotes cortos (las cajas no esperan).
+Si se corta en cualquier punto, volver a ejecutar archivar_anio() retoma desde donde quedó.
+
+Uso:
+    python -m core.archivo_ventas archivar 2023 [--vacuum]
+    python -m core.archivo_ventas verificar [2023]
+    python -m core.archivo_ventas listar
+"""
+import os
+import time
+import hashlib
+import sqlite3
+import logging
+import argparse
+import itertools
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from core.database import conectar_db, transaccion
+from utils.config import DB_PATH, VENTAS_ARCHIVO_DIR, VENTAS_ARCHIVO_LOTE, VENTAS_ARCHIVO_PAUSA
+
+COLUMNAS_VENTA = "id, usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario"
+VISTA_HISTORICA = "ventas_historicas"  # prefijo: cada ventas_en_rango() arma su propia vista
+_usos_rango = itertools.count(1)
+
+_ESQUEMA_ARCHIVO = (
+    '''CREATE TABLE IF NOT EXISTS ventas (
+           id INTEGER PRIMARY KEY,
+           usuario_id INTEGER,
+           producto_id INTEGER,
+           cantidad INTEGER,
+           fecha TEXT,
+           ticket INTEGER,
+           precio_unitario REAL
+       )''',
+    "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha)",
+    "CREATE INDEX IF NOT EXISTS idx_ventas_producto_fecha ON ventas (producto_id, fecha)",
+    "CREATE INDEX IF NOT EXISTS idx_ventas_ticket ON ventas (ticket)",
+)
+
+class ArchivoInconsistente(Exception):
+    """El archivo de un año no coincide con la base principal o con su registro."""
+
+def ruta_archivo(anio):
+    directorio = VENTAS_ARCHIVO_DIR or os.path.dirname(os.path.abspath(DB_PATH))
+    return os.path.join(directorio, f"ventas_{anio}.db")
+
+def _limites_anio(anio):
+    return f"{anio}-01-01", f"{anio + 1}-01-01"
+
+def _firma(conn, esquema, anio):
+    """(renglones, sha256) de las ventas del año, recorridas por id."""
+    inicio, fin = _limites_anio(anio)
+    resumen = hashlib.sha256()
+    filas = 0
+    cursor = conn.execute(
+        f"SELECT {COLUMNAS_VENTA} FROM {esquema}.ventas WHERE fecha >= ? AND fecha < ? ORDER BY id", (inicio, fin)
+    )
+    while True:
+        lote = cursor.fetchmany(10000)
+        if not lote:
+            break
+        resumen.update("".join(f"{fila!r}\n" for fila in lote).encode())
+        filas += len(lote)
+    return filas, resumen.hexdigest()
+
+def anios_archivados():
+    """{anio: (archivo, filas, sha256, archivado_en)} de la tabla ventas_archivadas."""
+    try:
+        return {fila[0]: fila[1:] for fila in conectar_db().execute(
+            "SELECT anio, archivo, filas, sha256, archivado_en FROM ventas_archivadas ORDER BY anio"
+        )}
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al leer el registro de ventas archivadas: {e}")
+        return {}
+
+def _copiar_anio(anio, ruta):
+    """Copia las ventas del año a un archivo temporal y lo renombra a `ruta` cuando está completo."""
+    temporal = ruta + ".tmp"
+    if os.path.exists(temporal):
+        os.remove(temporal)  # copia a medias de una corrida cortada
+    inicio, fin = _limites_anio(anio)
+    archivo = sqlite3.connect(temporal, isolation_level=None)
+    try:
+        archivo.execute("PRAGMA journal_mode = DELETE")
+        archivo.execute("PRAGMA synchronous = FULL")
+        archivo.execute("ATTACH DATABASE ? AS principal", (os.path.abspath(DB_PATH),))
+        archivo.execute("BEGIN")
+        archivo.execute(_ESQUEMA_ARCHIVO[0])
+        archivo.execute(
+            f"INSERT INTO ventas ({COLUMNAS_VENTA}) SELECT {COLUMNAS_VENTA} FROM principal.ventas "
+            f"WHERE fecha >= ? AND fecha < ? ORDER BY id",
+            (inicio, fin),
+        )
+        for sql in _ESQUEMA_ARCHIVO[1:]:
+            archivo.execute(sql)
+        archivo.execute("COMMIT")
+        archivo.execute("DETACH DATABASE principal")
+    finally:
+        archivo.close()
+    os.replace(temporal, ruta)
+    if os.name == "posix":  # el renombre también tiene que llegar al disco antes de registrar el año
+        carpeta = os.open(os.path.dirname(ruta), os.O_RDONLY)
+        try:
+            os.fsync(carpeta)
+        finally:
+            os.close(carpeta)
+
+def _firma_archivo(anio, ruta):
+    archivo = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        return _firma(archivo, "main", anio)
+    finally:
+        archivo.close()
+
+def _borrar_archivadas(anio, lote=VENTAS_ARCHIVO_LOTE):
+    """Borra de la base principal las ventas del año en transacciones cortas; devuelve cuántas borró."""
+    inicio, fin = _limites_anio(anio)
+    borradas = 0
+    while True:
+        with transaccion("IMMEDIATE") as conn:
+            cursor = conn.execute(
+                "DELETE FROM ventas WHERE id IN (SELECT id FROM ventas WHERE fecha >= ? AND fecha < ? LIMIT ?)",
+                (inicio, fin, lote),
+            )
+        borradas += cursor.rowcount
+        if cursor.rowcount < lote:
+            return borradas
+        time.sleep(VENTAS_ARCHIVO_PAUSA)  # hueco para que las cajas tomen el lock de escritura
+
+def archivar_anio(anio, lote=VENTAS_ARCHIVO_LOTE):
+    """Mueve las ventas de un año cerrado a ventas_AAAA.db. Devuelve un resumen.
+
+    Lanza ValueError si el año no está cerrado y ArchivoInconsistente si la copia no coincide.
+    """
+    if anio >= date.today().year:
+        raise ValueError(f"Solo se archivan años cerrados: {anio} todavía está en curso.")
+    inicio_reloj = time.perf_counter()
+    ruta = ruta_archivo(anio)
+    registro = anios_archivados().get(anio)
+
+    if registro is None:
+        with transaccion() as conn:  # foto consistente para la firma
+            filas, sha256 = _firma(conn, "main", anio)
+            ultimo_id = conn.execute("SELECT IFNULL(MAX(id), 0) FROM ventas").fetchone()[0]
+        if filas == 0:
+            logging.info(f"ℹ️ No hay ventas de {anio} para archivar.")
+            return {"anio": anio, "filas": 0, "borradas": 0, "archivo": None, "segundos": 0.0}
+        if not os.path.exists(ruta):
+            _copiar_anio(anio, ruta)
+        if _firma_archivo(anio, ruta) != (filas, sha256):
+            raise ArchivoInconsistente(
+                f"{ruta} no coincide con las ventas de {anio} en la base principal; bórrelo y vuelva a archivar."
+            )
+        with transaccion("IMMEDIATE") as conn:
+            # Las ventas no se editan ni se borran; solo falta descartar altas con fecha de ese año
+            # posteriores a la firma (el "+" evita el índice por fecha: se recorren solo los ids nuevos)
+            if conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM ventas WHERE id > ? AND +fecha >= ? AND +fecha < ?)",
+                (ultimo_id, *_limites_anio(anio)),
+            ).fetchone()[0]:
+                os.remove(ruta)  # copia vieja: el próximo intento la rehace
+                raise ArchivoInconsistente(f"Las ventas de {anio} cambiaron durante el archivo; vuelva a intentarlo.")
+            conn.execute(
+                "INSERT INTO ventas_archivadas (anio, archivo, filas, sha256, archivado_en) VALUES (?, ?, ?, ?, ?)",
+                (anio, os.path.basename(ruta), filas, sha256, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+        logging.info(f"🗄 Ventas de {anio} copiadas y verificadas en {ruta}: {filas} renglones, sha256 {sha256[:12]}…")
+    else:
+        filas, sha256 = registro[1], registro[2]
+        if not os.path.exists(ruta):
+            raise ArchivoInconsistente(f"{anio} figura archivado pero falta {ruta}.")
+
+    borradas = _borrar_archivadas(anio, lote)
+    resumen = {"anio": anio, "filas": filas, "borradas": borradas, "archivo": ruta,
+               "segundos": time.perf_counter() - inicio_reloj}
+    logging.info(f"✅ Año {anio} archivado: {borradas} renglones quitados de la base principal en {resumen['segundos']:.1f} s.")
+    return resumen
+
+def verificar_archivo(anio):
+    """Compara renglones y SHA-256 del archivo de un año con su registro. Devuelve True si coinciden."""
+    registro = anios_archivados().get(anio)
+    if registro is None:
+        logging.warning(f"⚠️ El año {anio} no está archivado.")
+        return False
+    ruta = ruta_archivo(anio)
+    if not os.path.exists(ruta):
+        logging.error(f"❌ Falta el archivo de ventas de {anio}: {ruta}")
+        return False
+    archivo = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        integridad = archivo.execute("PRAGMA integrity_check").fetchone()[0]
+        firma = _firma(archivo, "main", anio)
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al verificar {ruta}: {e}")
+        return False
+    finally:
+        archivo.close()
+    correcto = integridad == "ok" and firma == (registro[1], registro[2])
+    if correcto:
+        logging.info(f"✅ Archivo de {anio} verificado: {firma[0]} renglones, sha256 {firma[1][:12]}…")
+    else:
+        logging.error(f"❌ El archivo de {anio} no coincide (integridad={integridad}, renglones={firma[0]}, esperado={registro[1]}).")
+    return correcto
+
+def _anios_del_rango(inicio, fin):
+    """Primer y último año que toca el intervalo [inicio, fin) (fechas o fechas con hora)."""
+    primero = datetime.fromisoformat(str(inicio)).year if inicio else None
+    ultimo = (datetime.fromisoformat(str(fin)) - timedelta(seconds=1)).year if fin else None
+    return primero, ultimo
+
+@contextmanager
+def ventas_en_rango(inicio=None, fin=None):
+    """Devuelve el nombre de la tabla a consultar para las ventas del intervalo [inicio, fin).
+
+    Si el rango toca años archivados, adjunta sus archivos a la conexión del hilo y arma una vista
+    temporal ventas_historicas_N (base principal + archivos, sin los renglones que falten borrar);
+    si no, devuelve "ventas" sin tocar nada. Sin límites abarca todos los años.
+
+    Cada llamada usa nombres propios para la vista y los esquemas adjuntos, así que se puede anidar
+    o usar desde dos lugares con la misma conexión. Se debe usar fuera de una transacción (ATTACH
+    no puede ejecutarse dentro de una).
+    """
+    archivados = anios_archivados()
+    if archivados:
+        primero, ultimo = _anios_del_rango(inicio, fin)
+        primero, ultimo = primero or min(archivados), ultimo or max(archivados)
+        archivados = {anio: registro for anio, registro in archivados.items() if primero <= anio <= ultimo}
+    if not archivados:
+        yield "ventas"
+        return
+
+    conn = conectar_db()
+    uso = next(_usos_rango)
+    vista = f"{VISTA_HISTORICA}_{uso}"
+    adjuntos = []
+    try:
+        partes, excluidos = [], []
+        for anio in archivados:
+            ruta = ruta_archivo(anio)
+            if not os.path.exists(ruta):
+                logging.error(f"❌ Falta el archivo de ventas de {anio} ({ruta}); el reporte no incluirá ese año.")
+                continue
+            esquema = f"ventas_{anio}_{uso}"
+            conn.execute(f"ATTACH DATABASE ? AS {esquema}", (ruta,))
+            adjuntos.append(esquema)
+            partes.append(f"SELECT {COLUMNAS_VENTA} FROM {esquema}.ventas")
+            inicio, fin = _limites_anio(anio)
+            excluidos.append(f"(fecha >= '{inicio}' AND fecha < '{fin}')")
+        filtro = f" WHERE NOT ({' OR '.join(excluidos)})" if excluidos else ""
+        partes.insert(0, f"SELECT {COLUMNAS_VENTA} FROM main.ventas{filtro}")
+        conn.execute(f"CREATE TEMP VIEW {vista} AS {' UNION ALL '.join(partes)}")
+        yield vista
+    finally:
+        conn.execute(f"DROP VIEW IF EXISTS temp.{vista}")
+        for esquema in adjuntos:
+            conn.execute(f"DETACH DATABASE {esquema}")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Archiva las ventas de años cerrados en ventas_AAAA.db.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    archivar = subcomandos.add_parser("archivar", help="mueve un año cerrado a su archivo")
+    archivar.add_argument("anio", type=int)
+    archivar.add_argument("--vacuum", action="store_true", help="compactar la base principal al terminar")
+    verificar = subcomandos.add_parser("verificar", help="controla renglones y SHA-256 de los archivos")
+    verificar.add_argument("anio", type=int, nargs="?")
+    subcomandos.add_parser("listar", help="muestra los años archivados")
+    args = parser.parse_args(argumentos)
+
+    from core.database import inicializar_db
+
+    inicializar_db()
+    if args.comando == "archivar":
+        try:
+            resumen = archivar_anio(args.anio)
+        except (ValueError, ArchivoInconsistente) as e:
+            parser.error(str(e))
+        if args.vacuum and resumen["borradas"]:
+            inicio = time.perf_counter()
+            conectar_db().execute("VACUUM")
+            logging.info(f"🧹 VACUUM de la base principal en {time.perf_counter() - inicio:.1f} s.")
+        return 0
+    if args.comando == "verificar":
+        anios = [args.anio] if args.anio else list(anios_archivados())
+        return 0 if all([verificar_archivo(anio) for anio in anios]) else 1
+    for anio, (archivo, filas, sha256, archivado_en) in anios_archivados().items():
+        print(f"{anio}: {archivo} | {filas} renglones | sha256 {sha256} | archivado {archivado_en}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
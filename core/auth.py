@@ -1,53 +1,179 @@
-from werkzeug.security import generate_password_hash, check_password_hash
-from core.database import obtener_usuario_por_email, obtener_usuario_por_nombre, agregar_usuario, obtener_cantidad_usuarios  # ✅ Importación correcta
+from core.database import obtener_usuario_para_login, agregar_usuario, actualizar_hash_usuario  # ✅ Importación correcta
+from core.directorio_usuarios import cantidad_usuarios
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.limitador_login import LimitadorLogin, LoginBloqueado
+from utils.config import (
+    PASSWORD_HASH_ITERACIONES, AUTH_HILOS, TERMINAL_ID, LOGIN_VENTANA, LOGIN_MAX_INTENTOS_USUARIO,
+    LOGIN_MAX_INTENTOS_TERMINAL, LOGIN_BLOQUEO_BASE, LOGIN_BLOQUEO_MAX, LOGIN_MAX_CLAVES,
+)
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def autenticar_usuario(entrada, password):
-    """Verifica si las credenciales son correctas. Permite ingresar con nombre o email."""
-    usuario = obtener_usuario_por_email(entrada)  # Buscar por email
+# Hashes fuera del hilo de la interfaz: cada verificación PBKDF2 tarda cientos de ms
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
+# Se consulta antes de tocar la base o calcular un hash: un intento rechazado cuesta microsegundos
+_limitador = LimitadorLogin(
+    {"usuario": LOGIN_MAX_INTENTOS_USUARIO, "terminal": LOGIN_MAX_INTENTOS_TERMINAL},
+    LOGIN_VENTANA, LOGIN_BLOQUEO_BASE, LOGIN_BLOQUEO_MAX, LOGIN_MAX_CLAVES,
+)
+
+def _claves_login(entrada, terminal):
+    return (("usuario", entrada.strip().lower()), ("terminal", terminal))
+
+def espera_login(entrada, terminal=TERMINAL_ID):
+    """Segundos que faltan para poder intentar un login (0 si está permitido)."""
+    return _limitador.espera(_claves_login(entrada, terminal))
+
+def metodo_hash():
+    """Método de werkzeug con el costo configurado, p. ej. "pbkdf2:sha256:1000000"."""
+    return f"pbkdf2:sha256:{PASSWORD_HASH_ITERACIONES}"
+
+def hashear_password(password):
+    from werkzeug.security import generate_password_hash  # Se carga en el primer uso
+
+    return generate_password_hash(password, method=metodo_hash(), salt_length=16)
+
+def necesita_rehash(hash_guardado):
+    """True si el hash se generó con otro método o costo que el configurado."""
+    return hash_guardado.split("$", 1)[0] != metodo_hash()
+
+def _rehashear(id_usuario, hash_anterior, password):
+    if actualizar_hash_usuario(id_usuario, hash_anterior, hashear_password(password)):
+        logging.info(f"🔐 Hash de contraseña actualizado a {metodo_hash()} para el usuario {id_usuario}")
+
+def _registrar_login(resultado, entrada, busqueda_ms, hash_ms=0.0, id_usuario=None):
+    """Traza del intento de login en formato clave=valor, sin contraseñas ni hashes."""
+    nivel = logging.INFO if resultado == "ok" else logging.WARNING
+    logging.log(
+        nivel,
+        f"🔐 login resultado={resultado} entrada={entrada!r} usuario_id={id_usuario} "
+        f"busqueda_ms={busqueda_ms:.2f} hash_ms={hash_ms:.0f}",
+    )
+
+def autenticar_usuario(entrada, password, terminal=TERMINAL_ID):
+    """Verifica si las credenciales son correctas. Permite ingresar con nombre o email.
+
+    Lanza LoginBloqueado si se superó el límite de intentos del usuario o de la terminal.
+    """
+    claves = _claves_login(entrada, terminal)
+    espera = _limitador.intentar(claves)
+    if espera:
+        raise LoginBloqueado(espera)
+
+    inicio = time.perf_counter()
+    usuario = obtener_usuario_para_login(entrada)
+    busqueda_ms = (time.perf_counter() - inicio) * 1000
     if not usuario:
-        usuario = obtener_usuario_por_nombre(entrada)  # Buscar por nombre
-
-    if usuario:
-        hashed_password = usuario[2]  # ✅ La contraseña almacenada en la BD está encriptada
-
-        logging.info(f"🔍 Usuario encontrado en la BD: {usuario}")
-        logging.info(f"🔍 Contraseña ingresada: {password}")
-        logging.info(f"🔍 Hash en la BD: {hashed_password}")
-
-        if check_password_hash(hashed_password, password):  # ✅ Compara correctamente
-            logging.info(f"✅ Inicio de sesión exitoso para: {entrada}")
-            return {
-                "username": usuario[1], 
-                "email": usuario[3], 
-                "dni": usuario[4], 
-                "rol": usuario[5]
-            }
-        else:
-            logging.warning(f"❌ Contraseña incorrecta para: {entrada}")
-            return None
-    else:
-        logging.warning(f"❌ Usuario no encontrado con: {entrada}")
+        _registrar_login("usuario_inexistente", entrada, busqueda_ms)
         return None
 
-def registrar_usuario(username, password, email, dni, rol="cajero"):
-    """Registra un nuevo usuario con rol seleccionado o por defecto."""
-    cantidad_usuarios = obtener_cantidad_usuarios()
-    logging.info(f"🔍 Cantidad de usuarios en la BD: {cantidad_usuarios}")
+    from werkzeug.security import check_password_hash  # Se carga en el primer login
+
+    id_usuario, nombre, hashed_password, email, dni, rol = usuario
+    inicio = time.perf_counter()
+    valida = check_password_hash(hashed_password, password)
+    hash_ms = (time.perf_counter() - inicio) * 1000
+    if not valida:
+        _registrar_login("password_incorrecta", entrada, busqueda_ms, hash_ms, id_usuario)
+        return None
 
-    if cantidad_usuarios == 0:
+    _registrar_login("ok", entrada, busqueda_ms, hash_ms, id_usuario)
+    _limitador.exito(claves[0])
+    if necesita_rehash(hashed_password):
+        # El usuario no espera al nuevo hash: se calcula en segundo plano
+        obtener_ejecutor_auth().submit(_rehashear, id_usuario, hashed_password, password)
+    return {
+        "id": id_usuario,
+        "username": nombre,
+        "email": email,
+        "dni": dni,
+        "rol": rol
+    }
+
+class UsuarioExistente(ValueError):
+    """El nombre de usuario, el email o el DNI ya están registrados."""
+
+def _registrar(username, password, email, dni, rol):
+    """Registra el usuario; devuelve (registrado, mensaje para mostrar)."""
+    registrados = cantidad_usuarios()
+    logging.info(f"🔍 Cantidad de usuarios en la BD: {registrados}")
+
+    if registrados == 0:
         rol = "admin"
 
     print(f"🛠 Registrando usuario {username} con rol: {rol}")
 
-    hashed_password = generate_password_hash(password, method='pbkdf2:sha256', salt_length=16)
+    hashed_password = hashear_password(password)
 
     if agregar_usuario(username, hashed_password, email, dni, rol):
         logging.info(f"✅ Usuario registrado correctamente: {username} con rol {rol}")
-        return f"Usuario registrado exitosamente como {rol}."
+        return True, f"Usuario registrado exitosamente como {rol}."
     else:
         logging.warning(f"⚠️ Error: Usuario '{username}', email '{email}' o DNI '{dni}' ya existen.")
-        return "El nombre de usuario, el email o el DNI ya existen."
+        return False, "El nombre de usuario, el email o el DNI ya existen."
+
+def registrar_usuario(username, password, email, dni, rol="cajero"):
+    """Registra un nuevo usuario con rol seleccionado o por defecto."""
+    return _registrar(username, password, email, dni, rol)[1]
+
+def _registrar_o_fallar(username, password, email, dni, rol):
+    registrado, mensaje = _registrar(username, password, email, dni, rol)
+    if not registrado:
+        raise UsuarioExistente(mensaje)
+    return mensaje
+
+def obtener_ejecutor_auth():
+    """Pool de hilos compartido para verificar y generar hashes de contraseñas."""
+    global _ejecutor
+    with _ejecutor_lock:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(max_workers=AUTH_HILOS, thread_name_prefix="auth")
+        return _ejecutor
+
+def autenticar_usuario_async(entrada, password):
+    """Como autenticar_usuario(), pero en segundo plano: devuelve un Future con el resultado."""
+    return obtener_ejecutor_auth().submit(autenticar_usuario, entrada, password)
+
+def registrar_usuario_async(username, password, email, dni, rol="cajero"):
+    """Como registrar_usuario(), pero en segundo plano: devuelve un Future con el mensaje.
+
+    Si el usuario ya existe el Future falla con UsuarioExistente (con el mensaje para mostrar).
+    """
+    return obtener_ejecutor_auth().submit(_registrar_o_fallar, username, password, email, dni, rol)
+
+def detener_ejecutor_auth():
+    """Espera los hashes pendientes (por ejemplo, un rehash tras el login) al cerrar la aplicación."""
+    global _ejecutor
+    with _ejecutor_lock:
+        ejecutor, _ejecutor = _ejecutor, None
+    if ejecutor is not None:
+        ejecutor.shutdown(wait=True)
+
+def medir_busqueda_login(entrada, repeticiones=10000):
+    """Micro-benchmark: microsegundos por búsqueda de login (dos consultas anteriores vs. una)."""
+    from core.database import obtener_usuario_por_email, obtener_usuario_por_nombre
+
+    def medir(buscar):
+        buscar()
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            buscar()
+        return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    return {
+        "dos_consultas_us": medir(lambda: obtener_usuario_por_email(entrada) or obtener_usuario_por_nombre(entrada)),
+        "una_consulta_us": medir(lambda: obtener_usuario_para_login(entrada)),
+    }
+
+if __name__ == "__main__":
+    import sys
+
+    entrada = sys.argv[1] if len(sys.argv) > 1 else "admin"
+    resultado = medir_busqueda_login(entrada)
+    print(f"Búsqueda de login '{entrada}': {resultado['dos_consultas_us']:.1f} µs con dos consultas, {resultado['una_consulta_us']:.1f} µs con una")
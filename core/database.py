@@ -1,28 +1,137 @@
+import os
 import sqlite3
 import logging
-import pandas as pd
-from utils.config import DB_PATH  # ✅ Usa configuración centralizada
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from utils.config import DB_PATH, DB_PERFILES, DB_PERFIL, DB_MANTENIMIENTO_INTERVALO  # ✅ Usa configuración centralizada
+from core.directorio_usuarios import invalidar_directorio_usuarios
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# 🔹 Una conexión por hilo: se abre una sola vez y se reutiliza en cada consulta.
+# Cada hilo cierra la suya (cerrar_conexion); si un hilo termina sin cerrarla, se libera junto
+# con su almacenamiento local.
+_local = threading.local()
+
+# PRAGMA que valen por conexión (journal_mode se guarda en el archivo y se aplica en inicializar_db)
+_PRAGMAS_SESION = ("synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+_mantenimiento_parar = threading.Event()
+
+def obtener_perfil_db():
+    """Devuelve el perfil de PRAGMA configurado (o 'rendimiento' si el nombre no existe)."""
+    if DB_PERFIL not in DB_PERFILES:
+        logging.warning(f"⚠️ Perfil de base de datos '{DB_PERFIL}' desconocido, se usa 'rendimiento'.")
+        return DB_PERFILES["rendimiento"]
+    return DB_PERFILES[DB_PERFIL]
+
+def _aplicar_pragmas_sesion(conn):
+    """Aplica los PRAGMA de sesión una única vez al abrir la conexión."""
+    perfil = obtener_perfil_db()
+    for pragma in _PRAGMAS_SESION:
+        conn.execute(f"PRAGMA {pragma} = {perfil[pragma]}")
+
 def conectar_db():
-    """Establece una conexión a la base de datos SQLite."""
-    try:
-        conn = sqlite3.connect(DB_PATH)
+    """Devuelve la conexión SQLite del hilo actual, creándola la primera vez.
+
+    La conexión es compartida: no se debe cerrar después de usarla.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
         return conn
+    try:
+        # isolation_level=None: las lecturas no abren transacciones implícitas,
+        # las escrituras usan transaccion() con BEGIN/COMMIT explícitos.
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        _aplicar_pragmas_sesion(conn)
     except sqlite3.Error as e:
         logging.error(f"❌ Error al conectar con la base de datos: {e}")
-        return None
+        raise
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
 
-def inicializar_db():
-    """Crea las tablas necesarias en la base de datos si no existen."""
+def cerrar_conexion():
+    """Cierra la conexión del hilo actual (las de otros hilos solo las puede cerrar su dueño)."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"⚠️ Error al cerrar la conexión con la base de datos: {e}")
+
+@contextmanager
+def transaccion(modo="DEFERRED"):
+    """Ejecuta un bloque dentro de una transacción: COMMIT al salir, ROLLBACK si hay error.
+
+    Si ya hay una transacción abierta en el hilo, el bloque se une a ella.
+    """
     conn = conectar_db()
-    if conn:
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute(f"BEGIN {modo}")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+def obtener_pragmas_activos():
+    """Devuelve los PRAGMA efectivos de la conexión actual (para diagnóstico)."""
+    conn = conectar_db()
+    activos = {"perfil": DB_PERFIL, "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0]}
+    for pragma in _PRAGMAS_SESION:
+        activos[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+    return activos
+
+def mantenimiento_db():
+    """Vuelca el WAL al archivo principal y actualiza las estadísticas del planificador."""
+    try:
+        conn = conectar_db()
+        ocupado, paginas_wal, paginas_copiadas = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        conn.execute("PRAGMA optimize")
+        logging.info(f"🧹 Mantenimiento DB: checkpoint {paginas_copiadas}/{paginas_wal} páginas (ocupado={ocupado}).")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error en el mantenimiento de la base de datos: {e}")
+        return False
+
+def iniciar_mantenimiento_periodico(intervalo=DB_MANTENIMIENTO_INTERVALO):
+    """Lanza un hilo en segundo plano que ejecuta mantenimiento_db() cada `intervalo` segundos."""
+    def _bucle():
         try:
-            cursor = conn.cursor()
+            while not _mantenimiento_parar.wait(intervalo):
+                mantenimiento_db()
+        finally:
+            cerrar_conexion()
+
+    _mantenimiento_parar.clear()
+    hilo = threading.Thread(target=_bucle, name="mantenimiento-db", daemon=True)
+    hilo.start()
+    return hilo
+
+def detener_mantenimiento_periodico():
+    """Detiene el hilo de mantenimiento periódico."""
+    _mantenimiento_parar.set()
+
+def inicializar_db():
+    """Crea las tablas necesarias y aplica el perfil de rendimiento configurado."""
+    try:
+        deseado = obtener_perfil_db()["journal_mode"]
+        modo = conectar_db().execute(f"PRAGMA journal_mode = {deseado}").fetchone()[0]
+        if modo.upper() != deseado.upper():
+            logging.warning(f"⚠️ No se pudo activar journal_mode={deseado}, sigue en {modo}.")
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al aplicar el perfil de la base de datos: {e}")
+    try:
+        with transaccion() as conn:
             # Tabla de usuarios
-            cursor.execute('''
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS usuarios (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     nombre TEXT UNIQUE NOT NULL,
@@ -33,30 +142,301 @@ def inicializar_db():
                 )
             ''')
             # Tabla de productos
-            cursor.execute('''
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS productos (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT UNIQUE NOT NULL,
+                    nombre TEXT NOT NULL,
+                    marca TEXT NOT NULL,
                     cantidad INTEGER NOT NULL,
-                    precio REAL NOT NULL
+                    precio REAL NOT NULL,
+                    categoria TEXT NOT NULL
                 )
             ''')
-            conn.commit()
-            logging.info("✅ Base de datos inicializada correctamente.")
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al inicializar la base de datos: {e}")
+            # Tabla de ventas
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ventas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    usuario_id INTEGER,
+                    producto_id INTEGER,
+                    cantidad INTEGER,
+                    fecha TEXT,
+                    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+                    FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE
+                )
+            ''')
+        aplicar_migraciones()
+        logging.info("✅ Base de datos inicializada correctamente.")
+        logging.info(f"⚙️ PRAGMA activos: {obtener_pragmas_activos()}")
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al inicializar la base de datos: {e}")
+
+### **🔹 Migraciones de esquema (versionadas con PRAGMA user_version)**
+
+def _columnas_de(conn, tabla):
+    return {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}
+
+def _migracion_columnas_productos(conn):
+    """Agrega marca y categoria a bases creadas con el esquema viejo de productos."""
+    columnas = _columnas_de(conn, "productos")
+    if "marca" not in columnas:
+        conn.execute("ALTER TABLE productos ADD COLUMN marca TEXT NOT NULL DEFAULT ''")
+    if "categoria" not in columnas:
+        conn.execute("ALTER TABLE productos ADD COLUMN categoria TEXT NOT NULL DEFAULT 'Productos Varios'")
+
+# Largos de prefijo indexados: con "1" la primera tecla no recorre todos los términos de esa letra
+_PREFIJOS_FTS = "1 2 3"
+
+def _crear_tabla_fts(conn):
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+            nombre, marca, categoria,
+            content='productos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='{_PREFIJOS_FTS}'
+        )
+    ''')
+
+def _migracion_busqueda_fts(conn):
+    """Índice FTS5 sobre nombre/marca/categoria, sin acentos y con prefijos, sincronizado por triggers."""
+    try:
+        _crear_tabla_fts(conn)
+    except sqlite3.OperationalError as e:
+        logging.warning(f"⚠️ SQLite sin FTS5 ({e}); la búsqueda de productos usará LIKE.")
+        return
+    # Triggers sueltos: executescript() haría COMMIT de la transacción de la migración
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN
+            INSERT INTO productos_fts (rowid, nombre, marca, categoria)
+            VALUES (new.id, new.nombre, new.marca, new.categoria);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN
+            INSERT INTO productos_fts (productos_fts, rowid, nombre, marca, categoria)
+            VALUES ('delete', old.id, old.nombre, old.marca, old.categoria);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_au AFTER UPDATE OF nombre, marca, categoria ON productos BEGIN
+            INSERT INTO productos_fts (productos_fts, rowid, nombre, marca, categoria)
+            VALUES ('delete', old.id, old.nombre, old.marca, old.categoria);
+            INSERT INTO productos_fts (rowid, nombre, marca, categoria)
+            VALUES (new.id, new.nombre, new.marca, new.categoria);
+        END
+    ''')
+    conn.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+
+def _migracion_prefijos_fts(conn):
+    """Rehace productos_fts con los prefijos de _PREFIJOS_FTS (las bases viejas solo tenían 2 y 3)."""
+    fila = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'productos_fts'").fetchone()
+    if fila is None or f"prefix='{_PREFIJOS_FTS}'" in fila[0]:
+        return  # sin FTS5, o la tabla ya se creó con estos prefijos
+    conn.execute("DROP TABLE productos_fts")  # los triggers siguen y escriben en la tabla nueva
+    _crear_tabla_fts(conn)
+    conn.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+
+def _migracion_registro_cambios(conn):
+    """Revisión global de productos y registro del último cambio de cada producto, mantenidos por triggers."""
+    conn.execute("CREATE TABLE IF NOT EXISTS revision_productos (id INTEGER PRIMARY KEY CHECK (id = 1), valor INTEGER NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO revision_productos (id, valor) VALUES (1, 0)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS productos_cambios (
+            producto_id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL,
+            eliminado INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_productos_cambios_revision ON productos_cambios (revision)")
+    _crear_triggers_revision(conn)
+
+def _crear_triggers_revision(conn):
+    """(Re)crea los triggers que anotan cada cambio de productos en productos_cambios.
+
+    El upsert se escribe con ON CONFLICT DO UPDATE y no con INSERT OR REPLACE: dentro de un trigger,
+    la política de conflicto de la sentencia que lo dispara (por ejemplo el INSERT ... ON CONFLICT de
+    la importación) reemplaza al OR REPLACE, y el segundo cambio de un producto violaba la clave.
+    """
+    for evento, fila, eliminado in (("INSERT", "new", 0), ("UPDATE", "new", 0), ("DELETE", "old", 1)):
+        conn.execute(f"DROP TRIGGER IF EXISTS productos_revision_{evento.lower()}")
+        conn.execute(f'''
+            CREATE TRIGGER productos_revision_{evento.lower()} AFTER {evento} ON productos BEGIN
+                UPDATE revision_productos SET valor = valor + 1 WHERE id = 1;
+                INSERT INTO productos_cambios (producto_id, revision, eliminado)
+                VALUES ({fila}.id, (SELECT valor FROM revision_productos WHERE id = 1), {eliminado})
+                ON CONFLICT (producto_id) DO UPDATE
+                SET revision = excluded.revision, eliminado = excluded.eliminado;
+            END
+        ''')
+
+# Importe de un renglón de venta; las ventas anteriores a la migración 5 no guardaron el precio
+SQL_IMPORTE_VENTA = "{v}.cantidad * IFNULL({v}.precio_unitario, IFNULL((SELECT precio FROM productos WHERE id = {v}.producto_id), 0))"
+
+def _reconstruir_ventas_diarias(conn, desde=None, hasta=None):
+    """Recalcula los acumulados diarios de los días [desde, hasta] (todos si no se indican) desde ventas."""
+    condiciones_dia, condiciones_fecha, parametros = ["1"], ["v.fecha IS NOT NULL"], []
+    if desde:
+        condiciones_dia.append("dia >= ?")
+        condiciones_fecha.append("v.fecha >= ?")
+        parametros.append(desde)
+    if hasta:
+        condiciones_dia.append("dia <= ?")
+        condiciones_fecha.append("v.fecha < date(?, '+1 day')")
+        parametros.append(hasta)
+    filtro_dia = " WHERE " + " AND ".join(condiciones_dia)
+    filtro_fecha = " WHERE " + " AND ".join(condiciones_fecha)
+    importe = SQL_IMPORTE_VENTA.format(v="v")
+    for tabla, clave in (("ventas_diarias_producto", "producto_id"), ("ventas_diarias_usuario", "usuario_id")):
+        conn.execute(f"DELETE FROM {tabla}{filtro_dia}", parametros)
+        conn.execute(f'''
+            INSERT INTO {tabla} (dia, {clave}, unidades, importe)
+            SELECT substr(v.fecha, 1, 10), IFNULL(v.{clave}, 0), SUM(v.cantidad), SUM({importe})
+            FROM ventas v{filtro_fecha}
+            GROUP BY 1, 2
+        ''', parametros)
+
+def _migracion_ventas_diarias(conn):
+    """Acumulados de ventas por día × producto y por día × usuario, mantenidos por un trigger en cada venta."""
+    for tabla, clave in (("ventas_diarias_producto", "producto_id"), ("ventas_diarias_usuario", "usuario_id")):
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {tabla} (
+                dia TEXT NOT NULL,
+                {clave} INTEGER NOT NULL,
+                unidades INTEGER NOT NULL,
+                importe REAL NOT NULL,
+                PRIMARY KEY (dia, {clave})
+            ) WITHOUT ROWID
+        ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ventas_diarias_producto_producto ON ventas_diarias_producto (producto_id, dia)")
+    importe = SQL_IMPORTE_VENTA.format(v="new")
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ventas_diarias_ai AFTER INSERT ON ventas BEGIN
+            INSERT INTO ventas_diarias_producto (dia, producto_id, unidades, importe)
+            VALUES (substr(new.fecha, 1, 10), IFNULL(new.producto_id, 0), new.cantidad, {importe})
+            ON CONFLICT (dia, producto_id) DO UPDATE
+            SET unidades = unidades + excluded.unidades, importe = importe + excluded.importe;
+            INSERT INTO ventas_diarias_usuario (dia, usuario_id, unidades, importe)
+            VALUES (substr(new.fecha, 1, 10), IFNULL(new.usuario_id, 0), new.cantidad, {importe})
+            ON CONFLICT (dia, usuario_id) DO UPDATE
+            SET unidades = unidades + excluded.unidades, importe = importe + excluded.importe;
+        END
+    ''')
+    _reconstruir_ventas_diarias(conn)
+
+def _migracion_secuencia_tickets(conn):
+    """Último número de ticket en una tabla propia, para que no se repita al archivar años de ventas.
+
+    Se siembra con el mayor ticket de ventas y de los archivos ya hechos; el trigger la sube si
+    alguien inserta ventas con un ticket mayor sin pasar por registrar_venta().
+    """
+    from core.archivo_ventas import ruta_archivo  # archivo_ventas importa este módulo
+
+    ultimo = conn.execute("SELECT IFNULL(MAX(ticket), 0) FROM ventas").fetchone()[0]
+    for (anio,) in conn.execute("SELECT anio FROM ventas_archivadas").fetchall():
+        ruta = ruta_archivo(anio)
+        if not os.path.exists(ruta):
+            logging.warning(f"⚠️ Falta el archivo de ventas de {anio} ({ruta}); sus tickets no cuentan para la secuencia.")
+            continue
+        archivo = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+        try:
+            ultimo = max(ultimo, archivo.execute("SELECT IFNULL(MAX(ticket), 0) FROM ventas").fetchone()[0])
         finally:
-            conn.close()
+            archivo.close()
+    conn.execute("CREATE TABLE IF NOT EXISTS secuencia_tickets (id INTEGER PRIMARY KEY CHECK (id = 1), ultimo INTEGER NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO secuencia_tickets (id, ultimo) VALUES (1, ?)", (ultimo,))
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS ventas_secuencia_ai AFTER INSERT ON ventas
+        WHEN new.ticket > (SELECT ultimo FROM secuencia_tickets WHERE id = 1) BEGIN
+            UPDATE secuencia_tickets SET ultimo = new.ticket WHERE id = 1;
+        END
+    ''')
+
+def _migracion_quitar_indices_clave(conn):
+    """Borra los índices UNIQUE de clave natural que dejaban las sincronizaciones anteriores."""
+    for (nombre,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'productos' AND name LIKE 'ux\\_productos\\_%' ESCAPE '\\'"
+    ).fetchall():
+        conn.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+# Cada migración: (versión, descripción, lista de SQL o función que recibe la conexión)
+MIGRACIONES = (
+    (1, "Columnas marca y categoria en productos", _migracion_columnas_productos),
+    (2, "Índices de búsqueda de productos y de ventas", [
+        "CREATE INDEX IF NOT EXISTS idx_productos_nombre ON productos (nombre)",
+        "CREATE INDEX IF NOT EXISTS idx_productos_marca ON productos (marca)",
+        "CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos (categoria)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_producto_fecha ON ventas (producto_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_usuario_fecha ON ventas (usuario_id, fecha)",
+    ]),
+    (3, "Búsqueda de texto completo de productos (FTS5)", _migracion_busqueda_fts),
+    (4, "Registro de cambios de productos para refresco incremental", _migracion_registro_cambios),
+    (5, "Número de ticket y precio de venta en ventas", [
+        "ALTER TABLE ventas ADD COLUMN ticket INTEGER",
+        "ALTER TABLE ventas ADD COLUMN precio_unitario REAL",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_ticket ON ventas (ticket)",
+    ]),
+    (6, "Acumulados diarios de ventas por producto y por usuario", _migracion_ventas_diarias),
+    (7, "Estado guardado del motor de reposición", [
+        """CREATE TABLE IF NOT EXISTS reposicion_estado (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               dia_cerrado TEXT NOT NULL,
+               alfa REAL NOT NULL
+           )""",
+        """CREATE TABLE IF NOT EXISTS reposicion_velocidad (
+               producto_id INTEGER PRIMARY KEY,
+               velocidad REAL NOT NULL,
+               cuadrados REAL NOT NULL
+           )""",
+    ]),
+    (8, "Registro de años de ventas archivados", [
+        """CREATE TABLE IF NOT EXISTS ventas_archivadas (
+               anio INTEGER PRIMARY KEY,
+               archivo TEXT NOT NULL,
+               filas INTEGER NOT NULL,
+               sha256 TEXT NOT NULL,
+               archivado_en TEXT NOT NULL
+           )""",
+    ]),
+    (9, "Triggers del registro de cambios de productos con UPSERT", _crear_triggers_revision),
+    (10, "Secuencia persistente de números de ticket", _migracion_secuencia_tickets),
+    (11, "Sin índice UNIQUE permanente por la clave natural de productos", _migracion_quitar_indices_clave),
+    (12, "Prefijos de una letra en la búsqueda de productos", _migracion_prefijos_fts),
+)
+
+def obtener_version_esquema():
+    """Devuelve la versión de esquema guardada en PRAGMA user_version."""
+    return conectar_db().execute("PRAGMA user_version").fetchone()[0]
+
+def aplicar_migraciones():
+    """Aplica, en orden y cada una en su transacción, las migraciones pendientes."""
+    aplicadas = 0
+    for version, descripcion, paso in MIGRACIONES:
+        if version <= obtener_version_esquema():
+            continue
+        with transaccion("IMMEDIATE") as conn:
+            # Otra terminal pudo haberla aplicado mientras esperábamos el lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+            if callable(paso):
+                paso(conn)
+            else:
+                for sql in paso:
+                    conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {version}")
+        aplicadas += 1
+        logging.info(f"🛠 Migración {version} aplicada: {descripcion}")
+    if aplicadas:
+        conectar_db().execute("PRAGMA optimize")
+    return aplicadas
 
 ### **🔹 Funciones para manejar usuarios*
 def agregar_usuario(nombre, password, email, dni, rol):
     """Inserta un nuevo usuario en la base de datos."""
     try:
-        conn = conectar_db()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO usuarios (nombre, password, email, dni, rol) VALUES (?, ?, ?, ?, ?)",
-                       (nombre, password, email, dni, rol))
-        conn.commit()
+        with transaccion() as conn:
+            conn.execute("INSERT INTO usuarios (nombre, password, email, dni, rol) VALUES (?, ?, ?, ?, ?)",
+                         (nombre, password, email, dni, rol))
+        invalidar_directorio_usuarios()
         logging.info(f"✅ Usuario registrado correctamente: {nombre} con rol {rol}")
         return True
     except sqlite3.IntegrityError as e:
@@ -65,277 +445,390 @@ def agregar_usuario(nombre, password, email, dni, rol):
     except sqlite3.Error as e:
         logging.error(f"❌ Error al agregar usuario: {e}")
         return False
-    finally:
-        conn.close()
+
 def obtener_usuarios():
-    """Obtiene la lista de usuarios desde la base de datos."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM usuarios")
-            return cursor.fetchall()
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener usuarios: {e}")
-            return []
-        finally:
-            conn.close()
+    """Obtiene la lista de usuarios desde la base de datos como (id, nombre, email, dni, rol), sin contraseñas."""
+    try:
+        return conectar_db().execute("SELECT id, nombre, email, dni, rol FROM usuarios").fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener usuarios: {e}")
+        return []
+
 def obtener_usuario_por_email(email):
     """Obtiene un usuario por su correo electrónico."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM usuarios WHERE email = ?", (email,))
-            return cursor.fetchone()
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener usuario por email '{email}': {e}")
-            return None
-        finally:
-            conn.close()
+    try:
+        return conectar_db().execute("SELECT * FROM usuarios WHERE email = ?", (email,)).fetchone()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener usuario por email '{email}': {e}")
+        return None
 
-def obtener_usuarios():
-    """Obtiene la lista de usuarios desde la base de datos."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM usuarios")
-            return cursor.fetchall()
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener usuarios: {e}")
-            return []
-        finally:
-            conn.close()
 def obtener_usuario_por_dni(dni):
     """Obtiene un usuario por su número de DNI."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM usuarios WHERE dni = ?", (dni,))
-            return cursor.fetchone()
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener usuario por DNI '{dni}': {e}")
-            return None
-        finally:
-            conn.close()
+    try:
+        return conectar_db().execute("SELECT * FROM usuarios WHERE dni = ?", (dni,)).fetchone()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener usuario por DNI '{dni}': {e}")
+        return None
 
 def obtener_usuario_por_nombre(nombre):
     """Obtiene un usuario por su nombre de usuario."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM usuarios WHERE nombre = ?", (nombre,))
-            return cursor.fetchone()
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener usuario por nombre '{nombre}': {e}")
-            return None
-        finally:
-            conn.close()
-def eliminar_usuario(id_usuario):
-    """Elimina un usuario por su ID."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM usuarios WHERE id = ?", (id_usuario,))
-            conn.commit()
-            logging.info(f"✅ Usuario eliminado correctamente: {id_usuario}")
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al eliminar usuario '{id_usuario}': {e}")
-            return False
-        finally:
-            conn.close()
+    try:
+        return conectar_db().execute("SELECT * FROM usuarios WHERE nombre = ?", (nombre,)).fetchone()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener usuario por nombre '{nombre}': {e}")
+        return None
+
+# Texto fijo: sqlite3 reutiliza la sentencia preparada en la conexión de cada hilo
+_SQL_USUARIO_LOGIN = "SELECT id, nombre, password, email, dni, rol FROM usuarios WHERE email = ? OR nombre = ?"
+
+def obtener_usuario_para_login(entrada):
+    """Busca el usuario por email o nombre en una sola consulta (índices UNIQUE de ambas columnas).
+
+    Devuelve (id, nombre, password, email, dni, rol); si `entrada` coincide con el email de un
+    usuario y el nombre de otro, gana el email.
+    """
+    try:
+        # Como mucho dos filas: se elige en Python para no pagar un ORDER BY
+        filas = conectar_db().execute(_SQL_USUARIO_LOGIN, (entrada, entrada)).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al buscar usuario para login '{entrada}': {e}")
+        return None
+    return next((fila for fila in filas if fila[3] == entrada), filas[0] if filas else None)
 
 def obtener_cantidad_usuarios():
     """Obtiene la cantidad total de usuarios registrados."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM usuarios")
-            cantidad = cursor.fetchone()[0]
-            return cantidad
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener cantidad de usuarios: {e}")
-            return 0
-        finally:
-            conn.close()
+    try:
+        return conectar_db().execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener cantidad de usuarios: {e}")
+        return 0
 
 def actualizar_password(email, nueva_password):
     """Actualiza la contraseña de un usuario dado su correo electrónico."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE usuarios SET password = ? WHERE email = ?", (nueva_password, email))
-            conn.commit()
-            logging.info(f"✅ Contraseña actualizada para el usuario con email: {email}")
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al actualizar contraseña para '{email}': {e}")
-            return False
-        finally:
-            conn.close()
+    try:
+        with transaccion() as conn:
+            conn.execute("UPDATE usuarios SET password = ? WHERE email = ?", (nueva_password, email))
+        invalidar_directorio_usuarios()
+        logging.info(f"✅ Contraseña actualizada para el usuario con email: {email}")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al actualizar contraseña para '{email}': {e}")
+        return False
+
+def actualizar_hash_usuario(id_usuario, hash_anterior, hash_nuevo):
+    """Reemplaza el hash de la contraseña si no cambió desde que se leyó (rehash al iniciar sesión)."""
+    try:
+        with transaccion() as conn:
+            cursor = conn.execute(
+                "UPDATE usuarios SET password = ? WHERE id = ? AND password = ?",
+                (hash_nuevo, id_usuario, hash_anterior),
+            )
+        return cursor.rowcount == 1
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al actualizar el hash del usuario {id_usuario}: {e}")
+        return False
 
 def actualizar_rol_usuario(id_usuario, nuevo_rol):
     """Actualiza el rol de un usuario en la base de datos."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE usuarios SET rol = ? WHERE id = ?", (nuevo_rol, id_usuario))
-            conn.commit()
-            logging.info(f"✅ Rol actualizado para el usuario con ID: {id_usuario}")
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al actualizar rol para '{id_usuario}': {e}")
-            return False
-        finally:
-            conn.close()
+    try:
+        with transaccion() as conn:
+            conn.execute("UPDATE usuarios SET rol = ? WHERE id = ?", (nuevo_rol, id_usuario))
+        invalidar_directorio_usuarios()
+        logging.info(f"✅ Rol actualizado para el usuario con ID: {id_usuario}")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al actualizar rol para '{id_usuario}': {e}")
+        return False
 
 def eliminar_usuario(id_usuario):
     """Elimina un usuario por su ID."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM usuarios WHERE id = ?", (id_usuario,))
-            conn.commit()
-            logging.info(f"✅ Usuario eliminado correctamente: {id_usuario}")
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al eliminar usuario '{id_usuario}': {e}")
-            return False
-        finally:
-            conn.close()
+    try:
+        with transaccion() as conn:
+            conn.execute("DELETE FROM usuarios WHERE id = ?", (id_usuario,))
+        invalidar_directorio_usuarios()
+        logging.info(f"✅ Usuario eliminado correctamente: {id_usuario}")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al eliminar usuario '{id_usuario}': {e}")
+        return False
 
 ### **🔹 Funciones para manejar productos**
 
 def obtener_productos():
     """Obtiene todos los productos de la base de datos."""
+    try:
+        return conectar_db().execute(
+            "SELECT id, nombre, IFNULL(marca, '') AS marca, cantidad, precio, IFNULL(categoria, 'Productos Varios') FROM productos"
+        ).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener productos: {e}")
+        return []
+
+# Máximo de coincidencias del índice que se ordenan en cada grupo (nombre / resto de columnas).
+# Con 200 000 productos la búsqueda tarda 0,5-4,5 ms. Quedan en 10-35 ms las palabras con cientos de
+# terminaciones distintas (códigos como "marca1" -> marca1, marca10..marca199), porque FTS5 une
+# los documentos de todos esos términos antes de cortar. Si aparece en catálogos reales, lo
+# siguiente es agregar a _PREFIJOS_FTS el largo típico de esos códigos.
+_CANDIDATOS_FTS = 500
+
+_SQL_BUSQUEDA_FTS = '''
+    SELECT p.id, p.nombre, p.precio, p.cantidad
+    FROM (SELECT rowid FROM productos_fts WHERE productos_fts MATCH ? LIMIT ?) f
+    JOIN productos p ON p.id = f.rowid
+    ORDER BY length(p.nombre), p.nombre
+    LIMIT ?
+'''
+
+def obtener_revision_productos():
+    """Devuelve la revisión actual del catálogo (aumenta con cada alta, cambio o baja)."""
+    try:
+        return conectar_db().execute("SELECT valor FROM revision_productos WHERE id = 1").fetchone()[0]
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener la revisión de productos: {e}")
+        return 0
+
+def productos_modificados_desde(revision):
+    """Devuelve (revision_actual, productos_cambiados, ids_eliminados) posteriores a `revision`.
+
+    Los productos cambiados tienen la misma forma que en obtener_productos().
+    """
+    try:
+        # Una sola transacción de lectura: revisión y cambios salen de la misma foto de la base
+        with transaccion() as conn:
+            actual = conn.execute("SELECT valor FROM revision_productos WHERE id = 1").fetchone()[0]
+            cambiados = conn.execute(
+                '''SELECT p.id, p.nombre, IFNULL(p.marca, ''), p.cantidad, p.precio, IFNULL(p.categoria, 'Productos Varios')
+                   FROM productos_cambios c JOIN productos p ON p.id = c.producto_id
+                   WHERE c.revision > ? AND c.eliminado = 0''',
+                (revision,),
+            ).fetchall()
+            eliminados = [fila[0] for fila in conn.execute(
+                "SELECT producto_id FROM productos_cambios WHERE revision > ? AND eliminado = 1", (revision,)
+            )]
+        return actual, cambiados, eliminados
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener cambios de productos desde la revisión {revision}: {e}")
+        return revision, [], []
+
+def _consulta_fts(texto):
+    """Convierte lo que escribe el cajero en una consulta FTS5: cada palabra como prefijo."""
+    palabras = texto.replace('"', " ").split()
+    return " ".join(f'"{p}"*' for p in palabras)
+
+def buscar_productos(texto, limite=100):
+    """Busca productos por nombre, marca o categoría.
+
+    Ignora acentos y mayúsculas y acepta palabras incompletas ("lact" encuentra "Lácteos").
+    Primero van los que tienen la primera palabra en el nombre y después el resto de las coincidencias;
+    dentro de cada grupo, los nombres más cortos (los más parecidos a lo escrito). No se usa bm25:
+    sus estadísticas recorren todas las coincidencias y con términos comunes tardaba 10-40 ms.
+    Devuelve tuplas (id, nombre, precio, cantidad).
+    """
     conn = conectar_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, nombre, IFNULL(marca, '') AS marca, cantidad, precio, IFNULL(categoria, 'Productos Varios') FROM productos")  
-    productos = cursor.fetchall()
-    conn.close()
-    return productos
+    consulta = _consulta_fts(texto)
+    try:
+        if not consulta:
+            return conn.execute(
+                "SELECT id, nombre, precio, cantidad FROM productos ORDER BY nombre LIMIT ?", (limite,)
+            ).fetchall()
+        # La primera palabra en el nombre y el resto en cualquier columna ("leche seren"): exigir
+        # todas en el nombre obligaría a FTS5 a revisar cada documento que las tiene en otra columna
+        filas = conn.execute(_SQL_BUSQUEDA_FTS, (f"{{nombre}} : {consulta}", _CANDIDATOS_FTS, limite)).fetchall()
+        if len(filas) < limite:
+            vistos = {fila[0] for fila in filas}
+            otras = conn.execute(_SQL_BUSQUEDA_FTS, (consulta, _CANDIDATOS_FTS, limite + len(filas))).fetchall()
+            filas += [fila for fila in otras if fila[0] not in vistos][:limite - len(filas)]
+        return filas
+    except sqlite3.OperationalError:
+        # Sin FTS5 (o índice aún no creado): búsqueda simple por nombre
+        try:
+            return conn.execute(
+                "SELECT id, nombre, precio, cantidad FROM productos WHERE nombre LIKE ? LIMIT ?",
+                ('%' + texto + '%', limite),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"❌ Error al buscar productos '{texto}': {e}")
+            return []
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al buscar productos '{texto}': {e}")
+        return []
 
 def agregar_producto(nombre, marca, cantidad, precio, categoria):
     """Agrega un producto con categoría a la base de datos."""
     try:
-        conn = conectar_db()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO productos (nombre, marca, cantidad, precio, categoria) VALUES (?, ?, ?, ?, ?)",
-                       (nombre, marca, cantidad, precio, categoria))
-        conn.commit()
+        with transaccion() as conn:
+            conn.execute("INSERT INTO productos (nombre, marca, cantidad, precio, categoria) VALUES (?, ?, ?, ?, ?)",
+                         (nombre, marca, cantidad, precio, categoria))
         logging.info(f"✅ Producto agregado: {nombre} - Marca: {marca} - Categoría: {categoria}")
         return True
     except sqlite3.Error as e:
         logging.error(f"❌ Error al agregar producto: {e}")
         return False
-    finally:
-        conn.close()
-    
-
-def actualizar_producto(nombre, marca, cantidad, precio, categoria):
-    """Actualiza el precio de un producto dado su ID."""
-    """Agrega un nuevo producto a la base de datos."""
-
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """UPDATE productos 
-                SET nombre = ?, marca = ?, cantidad = ?, precio = ?, categoria = ?
-                WHERE id = ?""",
-                (nombre, marca, cantidad, precio, categoria, id)  # El ID solo se usa en WHERE
-            )
-            conn.commit()
-            logging.info(f"✅ Producto actualizado con ID: {id}")
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al actualizar producto: {e}")
-            return False
-        finally:
-            conn.close()
-
 
 def eliminar_producto(id_producto):
     try:
-        conn = conectar_db()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM productos WHERE id = ?", (id_producto,))
-        conn.commit()
+        with transaccion() as conn:
+            cursor = conn.execute("DELETE FROM productos WHERE id = ?", (id_producto,))
         return cursor.rowcount > 0  # Retorna True si se eliminó
     except sqlite3.Error as e:
         logging.error(f"❌ Error al eliminar producto: {e}")
         return False
-    finally:
-        conn.close()
 
-
-def actualizar_producto(id_producto, nombre, cantidad, precio):
+def actualizar_producto(id_producto, nombre, marca, cantidad, precio, categoria):
     """Actualiza un producto en la base de datos."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE productos SET nombre = ?, cantidad = ?, precio = ? WHERE id = ?", (nombre, cantidad, precio, id_producto))
-            conn.commit()
-            logging.info(f"✅ Producto con ID {id_producto} actualizado correctamente.")
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al actualizar producto: {e}")
-            return False
-        finally:
-            conn.close()
+    try:
+        with transaccion() as conn:
+            conn.execute("UPDATE productos SET nombre = ?, marca = ?, cantidad = ?, precio = ?, categoria = ? WHERE id = ?",
+                         (nombre, marca, cantidad, precio, categoria, id_producto))
+        logging.info(f"✅ Producto con ID {id_producto} actualizado correctamente.")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al actualizar producto: {e}")
+        return False
 
 def obtener_producto_por_id(id_producto):
     """Obtiene un producto por su ID."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM productos WHERE id = ?", (id_producto,))
-            return cursor.fetchone()
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener producto por ID '{id_producto}': {e}")
-            return None
-        finally:
-            conn.close()
+    try:
+        return conectar_db().execute("SELECT * FROM productos WHERE id = ?", (id_producto,)).fetchone()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener producto por ID '{id_producto}': {e}")
+        return None
 
 def obtener_cantidad_productos():
     """Obtiene la cantidad total de productos registrados."""
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM productos")
-            cantidad = cursor.fetchone()[0]
-            return cantidad
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al obtener cantidad de productos: {e}")
-            return 0
-        finally:
-            conn.close()
-def importar_desde_excel(archivo):
-    conn = conectar_db()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            df = pd.read_excel(archivo)
-            for _, row in df.iterrows():
-                cursor.execute("INSERT INTO productos (nombre, marca, cantidad, precio, categoria) VALUES (?, ?, ?, ?, ?)",
-                               (row["Nombre"], row["Marca"], row["Cantidad"], row["Precio"], row["Categoría"]))
-            conn.commit()
-            return True
-        except sqlite3.Error as e:
-            logging.error(f"❌ Error al importar productos desde Excel: {e}")
-            return False
-        finally:
-            conn.close()
\ No newline at end of file
+    try:
+        return conectar_db().execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener cantidad de productos: {e}")
+        return 0
+
+def importar_desde_excel(archivo, progreso=None, sincronizar=False):
+    """Importa productos desde Excel en lotes (ver core.importador)."""
+    from core.importador import importar_desde_excel as _importar
+    return _importar(archivo, progreso, sincronizar)
+
+### **🔹 Funciones para manejar ventas**
+
+class StockInsuficiente(Exception):
+    """No alcanza el stock de un producto para completar la venta."""
+
+    def __init__(self, producto_id, solicitado, disponible):
+        self.producto_id = producto_id
+        self.solicitado = solicitado
+        self.disponible = disponible
+        super().__init__(f"Stock insuficiente para el producto {producto_id}: pedido {solicitado}, disponible {disponible}")
+
+class VentaInvalida(ValueError):
+    """La venta pide cantidades no positivas o productos que no existen; no se registra nada."""
+
+def obtener_stock_producto(id_producto):
+    """Devuelve la cantidad en stock actual de un producto (None si no existe)."""
+    try:
+        fila = conectar_db().execute("SELECT cantidad FROM productos WHERE id = ?", (id_producto,)).fetchone()
+        return fila[0] if fila else None
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener stock del producto '{id_producto}': {e}")
+        return None
+
+def registrar_venta(usuario_id, items):
+    """Registra una venta y descuenta el stock en una sola transacción.
+
+    `items` es una lista de (producto_id, cantidad). Con BEGIN IMMEDIATE la venta toma el
+    lock de escritura antes de leer, así dos cajas no pueden vender el mismo stock.
+    Devuelve el número de ticket; lanza StockInsuficiente (sin cambios en la base) si algún
+    producto no alcanza, VentaInvalida si hay cantidades no positivas o productos inexistentes,
+    o devuelve None ante un error de base de datos.
+    """
+    # Un mismo producto puede aparecer más de una vez en el carrito
+    cantidades = {}
+    for producto_id, cantidad in items:
+        if int(cantidad) <= 0:  # una cantidad negativa sumaría stock en el UPDATE
+            raise VentaInvalida(f"Cantidad inválida para el producto {producto_id}: {cantidad}")
+        cantidades[int(producto_id)] = cantidades.get(int(producto_id), 0) + int(cantidad)
+    if not cantidades:
+        raise VentaInvalida("La venta no tiene productos.")
+    fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        with transaccion("IMMEDIATE") as conn:
+            ids = list(cantidades)
+            existentes = {fila[0] for fila in conn.execute(
+                f"SELECT id FROM productos WHERE id IN ({', '.join('?' * len(ids))})", ids
+            )}
+            faltantes = [producto_id for producto_id in ids if producto_id not in existentes]
+            if faltantes:
+                raise VentaInvalida(f"Productos inexistentes: {', '.join(map(str, faltantes))}")
+            precios = {}
+            for producto_id, cantidad in cantidades.items():
+                cursor = conn.execute(
+                    "UPDATE productos SET cantidad = cantidad - ? WHERE id = ? AND cantidad >= ?",
+                    (cantidad, producto_id, cantidad),
+                )
+                precio, disponible = conn.execute(
+                    "SELECT precio, cantidad FROM productos WHERE id = ?", (producto_id,)
+                ).fetchone() or (None, 0)
+                if cursor.rowcount != 1:
+                    raise StockInsuficiente(producto_id, cantidad, disponible)
+                precios[producto_id] = precio
+
+            # La secuencia no depende de ventas: archivar un año no hace repetir números
+            conn.execute("UPDATE secuencia_tickets SET ultimo = ultimo + 1 WHERE id = 1")
+            ticket = conn.execute("SELECT ultimo FROM secuencia_tickets WHERE id = 1").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario) VALUES (?, ?, ?, ?, ?, ?)",
+                [(usuario_id, producto_id, cantidad, fecha, ticket, precios[producto_id])
+                 for producto_id, cantidad in cantidades.items()],
+            )
+        logging.info(f"✅ Venta registrada: ticket {ticket} con {len(cantidades)} productos (usuario {usuario_id})")
+        return ticket
+    except (StockInsuficiente, VentaInvalida) as e:
+        logging.warning(f"⚠️ {e}")
+        raise
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al registrar la venta: {e}")
+        return None
+
+def obtener_ventas_por_fecha(desde, hasta):
+    """Renglones de venta entre dos fechas ("AAAA-MM-DD", ambas inclusive) con el nombre del producto.
+
+    Devuelve (ticket, venta_id, usuario_id, fecha, producto_id, nombre, cantidad, precio_unitario)
+    ordenados por fecha y ticket, incluidas las de años archivados. Las ventas anteriores a los
+    tickets tienen ticket NULL y, si no guardaron el precio, se usa el precio actual del producto.
+    """
+    from core.archivo_ventas import ventas_en_rango  # core.archivo_ventas importa este módulo
+
+    fin = (datetime.fromisoformat(hasta) + timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        with ventas_en_rango(desde, fin) as tabla:
+            return conectar_db().execute(
+                f"""SELECT v.ticket, v.id, v.usuario_id, v.fecha, v.producto_id,
+                           IFNULL(p.nombre, 'Producto ' || v.producto_id),
+                           v.cantidad, IFNULL(v.precio_unitario, IFNULL(p.precio, 0))
+                    FROM {tabla} v LEFT JOIN productos p ON p.id = v.producto_id
+                    WHERE v.fecha >= ? AND v.fecha < ?
+                    ORDER BY v.fecha, v.ticket, v.id""",
+                (desde, fin),
+            ).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al obtener ventas entre {desde} y {hasta}: {e}")
+        return []
+
+def recalcular_ventas_diarias(desde=None, hasta=None):
+    """Rehace los acumulados diarios de un rango de días (o de toda la historia) desde la tabla ventas.
+
+    Los triggers los mantienen al día en cada venta; esto sirve para ponerlos al día después de
+    corregir ventas a mano. Devuelve True si terminó bien.
+    """
+    try:
+        with transaccion("IMMEDIATE") as conn:
+            # Las ventas de los años archivados ya no están en la tabla: sus acumulados se conservan
+            ultimo_archivado = conn.execute("SELECT MAX(anio) FROM ventas_archivadas").fetchone()[0]
+            if ultimo_archivado and (not desde or desde < f"{ultimo_archivado + 1}-01-01"):
+                desde = f"{ultimo_archivado + 1}-01-01"
+                logging.warning(f"⚠️ Hasta {ultimo_archivado} las ventas están archivadas: se recalcula desde {desde}.")
+            _reconstruir_ventas_diarias(conn, desde, hasta)
+        logging.info(f"✅ Acumulados diarios de ventas recalculados ({desde or 'inicio'} → {hasta or 'hoy'}).")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al recalcular los acumulados diarios de ventas: {e}")
+        return False
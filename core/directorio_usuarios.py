@@ -0,0 +1,69 @@
+import logging
+import threading
+from collections import Counter
+
+# Directorio de usuarios en memoria (sin contraseñas). Se carga en el primer pedido y se descarta
+# con invalidar_directorio_usuarios(), que llaman las funciones de core.database que modifican usuarios.
+_lock = threading.Lock()
+_usuarios = None          # id → (id, nombre, email, dni, rol)
+_roles = Counter()        # rol → cantidad de usuarios
+_generacion = 0           # cambia con cada invalidación: evita guardar una carga ya vieja
+_estadisticas = {"aciertos": 0, "fallos": 0, "invalidaciones": 0}
+
+def invalidar_directorio_usuarios():
+    """Descarta el directorio en memoria; la próxima consulta lo vuelve a leer de la base."""
+    global _usuarios, _generacion
+    with _lock:
+        _usuarios = None
+        _roles.clear()
+        _generacion += 1
+        _estadisticas["invalidaciones"] += 1
+
+def _directorio():
+    """Devuelve el directorio, cargándolo si hace falta (cuenta aciertos y fallos)."""
+    global _usuarios
+    with _lock:
+        if _usuarios is not None:
+            _estadisticas["aciertos"] += 1
+            return _usuarios
+        _estadisticas["fallos"] += 1
+        generacion = _generacion
+
+    from core.database import obtener_usuarios  # core.database importa este módulo
+
+    usuarios = {fila[0]: tuple(fila) for fila in obtener_usuarios()}
+    with _lock:
+        # Una lista vacía puede ser un error de base de datos: no se guarda
+        if usuarios and generacion == _generacion:
+            _usuarios = usuarios
+            _roles.clear()
+            _roles.update(usuario[4] for usuario in usuarios.values())
+    logging.debug(f"👥 Directorio de usuarios cargado: {len(usuarios)} usuarios")
+    return usuarios
+
+def listar_usuarios():
+    """Usuarios ordenados por ID como (id, nombre, email, dni, rol)."""
+    return sorted(_directorio().values())
+
+def obtener_usuario(id_usuario):
+    """(id, nombre, email, dni, rol) del usuario o None."""
+    return _directorio().get(id_usuario)
+
+def rol_de_usuario(id_usuario):
+    usuario = _directorio().get(id_usuario)
+    return usuario[4] if usuario else None
+
+def cantidad_usuarios(rol=None):
+    """Cantidad de usuarios registrados (o de un rol) sin consultar la base."""
+    usuarios = _directorio()
+    if rol is None:
+        return len(usuarios)
+    with _lock:
+        if usuarios is _usuarios:
+            return _roles[rol]
+    return sum(1 for usuario in usuarios.values() if usuario[4] == rol)
+
+def estadisticas_directorio():
+    """Contadores de aciertos, fallos e invalidaciones del directorio (para monitoreo)."""
+    with _lock:
+        return dict(_estadisticas, cargado=_usuarios is not None)
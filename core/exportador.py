@@ -0,0 +1,248 @@
+import os
+import csv
+import time
+import logging
+import argparse
+from contextlib import nullcontext
+from datetime import date, timedelta
+from core.database import inicializar_db, transaccion
+
+TAMANO_LOTE = 5000
+
+# Columnas exportables de cada tabla: nombre → (expresión SQL, tipo "i"/"d"/"s")
+TABLAS_EXPORTABLES = {
+    "productos": {
+        "id": ("id", "i"),
+        "nombre": ("nombre", "s"),
+        "marca": ("IFNULL(marca, '')", "s"),
+        "cantidad": ("cantidad", "i"),
+        "precio": ("precio", "d"),
+        "categoria": ("IFNULL(categoria, 'Productos Varios')", "s"),
+    },
+    "ventas": {
+        "id": ("id", "i"),
+        "ticket": ("ticket", "i"),
+        "fecha": ("fecha", "s"),
+        "usuario_id": ("usuario_id", "i"),
+        "producto_id": ("producto_id", "i"),
+        "cantidad": ("cantidad", "i"),
+        "precio_unitario": ("precio_unitario", "d"),
+    },
+}
+FORMATOS = ("csv", "xlsx", "parquet")
+
+def _armar_consulta(tabla, columnas, categoria=None, stock_maximo=None, desde=None, hasta=None, origen=None):
+    """Devuelve (columnas, sql_select, sql_count, parámetros) validando columnas y filtros.
+
+    `origen` es la tabla o vista a leer (por defecto, `tabla`).
+    """
+    if tabla not in TABLAS_EXPORTABLES:
+        raise ValueError(f"Tabla no exportable: {tabla}")
+    definicion = TABLAS_EXPORTABLES[tabla]
+    columnas = tuple(columnas or definicion)
+    desconocidas = [c for c in columnas if c not in definicion]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas en {tabla}: {', '.join(desconocidas)}")
+
+    condiciones, parametros = [], []
+    if tabla == "productos":
+        if desde or hasta:
+            raise ValueError("Los filtros de fecha solo se aplican a ventas.")
+        if categoria is not None:
+            condiciones.append("IFNULL(categoria, 'Productos Varios') = ?")
+            parametros.append(categoria)
+        if stock_maximo is not None:
+            condiciones.append("cantidad <= ?")
+            parametros.append(stock_maximo)
+    else:
+        if categoria is not None or stock_maximo is not None:
+            raise ValueError("Los filtros de categoría y stock solo se aplican a productos.")
+        if desde:
+            condiciones.append("fecha >= ?")
+            parametros.append(desde)
+        if hasta:
+            condiciones.append("fecha < date(?, '+1 day')")
+            parametros.append(hasta)
+
+    donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    expresiones = ", ".join(f"{definicion[c][0]} AS {c}" for c in columnas)
+    origen = origen or tabla
+    return (
+        columnas,
+        f"SELECT {expresiones} FROM {origen}{donde} ORDER BY id",
+        f"SELECT COUNT(*) FROM {origen}{donde}",
+        parametros,
+    )
+
+def _origen(tabla, desde=None, hasta=None):
+    """Contexto que entrega la tabla a leer: las ventas incluyen los años archivados (ver core.archivo_ventas)."""
+    if tabla != "ventas":
+        return nullcontext(tabla)
+    from core.archivo_ventas import ventas_en_rango
+
+    try:
+        fin = (date.fromisoformat(hasta) + timedelta(days=1)).isoformat() if hasta else None
+        if desde:
+            date.fromisoformat(desde)
+    except ValueError:
+        raise ValueError("Las fechas de --desde y --hasta van como AAAA-MM-DD.")
+    return ventas_en_rango(desde, fin)
+
+class _EscritorCSV:
+    def __init__(self, ruta, columnas, tipos):
+        self._archivo = open(ruta, "w", newline="", encoding="utf-8-sig")  # con BOM: Excel detecta UTF-8
+        self._csv = csv.writer(self._archivo)
+        self._csv.writerow(columnas)
+
+    def escribir(self, filas):
+        self._csv.writerows(filas)
+
+    def cerrar(self):
+        self._archivo.close()
+
+class _EscritorXLSX:
+    """openpyxl en modo write-only: las filas se vuelcan a disco a medida que se agregan."""
+
+    def __init__(self, ruta, columnas, tipos):
+        from openpyxl import Workbook  # Solo se carga al exportar
+
+        self._ruta = ruta
+        self._libro = Workbook(write_only=True)
+        self._hoja = self._libro.create_sheet("Datos")
+        self._hoja.append(list(columnas))
+
+    def escribir(self, filas):
+        for fila in filas:
+            self._hoja.append(fila)
+
+    def cerrar(self):
+        self._libro.save(self._ruta)
+
+class _EscritorParquet:
+    """pyarrow.ParquetWriter: cada lote se escribe como un row group."""
+
+    _TIPOS = {"i": "int64", "d": "float64", "s": "string"}
+
+    def __init__(self, ruta, columnas, tipos):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Para exportar a Parquet hay que instalar pyarrow (pip install pyarrow).")
+
+        self._pa = pa
+        self._schema = pa.schema([(c, getattr(pa, self._TIPOS[t])()) for c, t in zip(columnas, tipos)])
+        self._escritor = pq.ParquetWriter(ruta, self._schema)
+
+    def escribir(self, filas):
+        columnas = list(zip(*filas)) if filas else [() for _ in self._schema]
+        arrays = [self._pa.array(valores, type=campo.type) for valores, campo in zip(columnas, self._schema)]
+        self._escritor.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def cerrar(self):
+        self._escritor.close()
+
+_ESCRITORES = {"csv": _EscritorCSV, "xlsx": _EscritorXLSX, "parquet": _EscritorParquet}
+
+def formato_de_archivo(archivo):
+    """Deduce el formato por la extensión (.csv, .xlsx, .parquet)."""
+    formato = os.path.splitext(archivo)[1].lower().lstrip(".")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación no soportado: .{formato} (use {', '.join(FORMATOS)})")
+    return formato
+
+def exportar(archivo, tabla="productos", columnas=None, formato=None, categoria=None, stock_maximo=None,
+             desde=None, hasta=None, progreso=None, tamano_lote=TAMANO_LOTE):
+    """Exporta una tabla en lotes de `tamano_lote` filas sin cargarla entera en memoria.
+
+    La lectura corre en una sola transacción de lectura (foto consistente; con WAL no frena a las
+    ventas) y el archivo se escribe en un temporal que se renombra al terminar. Las ventas de años
+    archivados se leen de sus archivos, en el mismo orden por id.
+    `progreso(exportadas, total, filas_por_segundo)` se llama después de cada lote; si devuelve
+    False la exportación se cancela y no queda archivo. Devuelve un resumen con filas, segundos,
+    filas_por_segundo y cancelado.
+    """
+    formato = formato or formato_de_archivo(archivo)
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+    columnas = _armar_consulta(tabla, columnas, categoria, stock_maximo, desde, hasta)[0]
+    tipos = [TABLAS_EXPORTABLES[tabla][c][1] for c in columnas]
+    rango = _origen(tabla, desde, hasta)
+
+    inicio = time.perf_counter()
+    resumen = {"filas": 0, "segundos": 0.0, "filas_por_segundo": 0.0, "cancelado": False}
+    temporal = archivo + ".tmp"
+    escritor = _ESCRITORES[formato](temporal, columnas, tipos)
+    try:
+        # ventas_en_rango() adjunta los archivos fuera de la transacción (ATTACH no puede ir dentro)
+        with rango as origen, transaccion() as conn:
+            _, sql, sql_total, parametros = _armar_consulta(tabla, columnas, categoria, stock_maximo, desde, hasta, origen)
+            total = conn.execute(sql_total, parametros).fetchone()[0] if progreso else None
+            cursor = conn.execute(sql, parametros)
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                escritor.escribir(filas)
+                resumen["filas"] += len(filas)
+                segundos = time.perf_counter() - inicio
+                resumen["filas_por_segundo"] = resumen["filas"] / segundos if segundos > 0 else 0.0
+                if progreso and progreso(resumen["filas"], total, resumen["filas_por_segundo"]) is False:
+                    resumen["cancelado"] = True
+                    break
+        escritor.cerrar()
+    except BaseException:
+        # La limpieza no debe tapar el error original (p. ej. un libro XLSX que ya falló al guardarse)
+        try:
+            escritor.cerrar()
+        except Exception as e:
+            logging.warning(f"⚠️ No se pudo cerrar el archivo temporal {temporal}: {e}")
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+    if resumen["cancelado"]:
+        os.remove(temporal)
+        logging.warning(f"⚠️ Exportación de {tabla} cancelada tras {resumen['filas']} filas.")
+    else:
+        os.replace(temporal, archivo)
+    resumen["segundos"] = time.perf_counter() - inicio
+    logging.info(
+        f"✅ Exportación de {tabla} a {formato}: {resumen['filas']} filas en {resumen['segundos']:.2f} s "
+        f"({resumen['filas_por_segundo']:.0f} filas/s) → {archivo}"
+    )
+    return resumen
+
+def exportar_a_archivo(archivo, tabla="productos", progreso=None, **filtros):
+    """Versión tolerante a errores de exportar(): devuelve el resumen o False."""
+    try:
+        return exportar(archivo, tabla, progreso=progreso, **filtros)
+    except Exception as e:  # formato/columnas inválidos, pyarrow ausente, disco lleno...
+        logging.error(f"❌ Error al exportar {tabla}: {e}")
+        return False
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Exporta productos o ventas a CSV, XLSX o Parquet.")
+    parser.add_argument("archivo", help="archivo de destino (.csv, .xlsx o .parquet)")
+    parser.add_argument("--tabla", choices=tuple(TABLAS_EXPORTABLES), default="productos")
+    parser.add_argument("--formato", choices=FORMATOS, help="por defecto se deduce de la extensión")
+    parser.add_argument("--columnas", help="columnas separadas por coma (por defecto, todas)")
+    parser.add_argument("--categoria", help="solo productos de esta categoría")
+    parser.add_argument("--stock-maximo", type=int, help="solo productos con cantidad <= N (stock bajo)")
+    parser.add_argument("--desde", help="ventas desde esta fecha (AAAA-MM-DD)")
+    parser.add_argument("--hasta", help="ventas hasta esta fecha inclusive (AAAA-MM-DD)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="filas por lote")
+    args = parser.parse_args(argumentos)
+
+    inicializar_db()
+    try:
+        resumen = exportar(
+            args.archivo, args.tabla, args.columnas.split(",") if args.columnas else None, args.formato,
+            args.categoria, args.stock_maximo, args.desde, args.hasta, tamano_lote=args.lote,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return 0 if not resumen["cancelado"] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+import time
+import sqlite3
+import logging
+from core.database import transaccion
+from utils.config import CLAVE_NATURAL_PRODUCTOS
+
+# Columnas esperadas en la planilla del proveedor
+COLUMNAS_EXCEL = ("Nombre", "Marca", "Cantidad", "Precio", "Categoría")
+CATEGORIA_POR_DEFECTO = "Productos Varios"
+TAMANO_LOTE = 5000
+COLUMNAS_PRODUCTO = ("nombre", "marca", "cantidad", "precio", "categoria")
+
+def _indices_columnas(encabezado):
+    """Ubica cada columna esperada dentro de la fila de encabezado."""
+    nombres = [str(c).strip() if c is not None else "" for c in (encabezado or ())]
+    faltantes = [c for c in COLUMNAS_EXCEL if c not in nombres]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el Excel: {', '.join(faltantes)}")
+    return {c: nombres.index(c) for c in COLUMNAS_EXCEL}
+
+def _columna(filas, indice):
+    """Extrae una columna completa del lote (las filas cortas aportan None)."""
+    return [fila[indice] if indice < len(fila) else None for fila in filas]
+
+def _a_texto(valores, por_defecto=""):
+    return [str(v).strip() if v is not None and str(v).strip() else por_defecto for v in valores]
+
+def _a_numero(valores, tipo):
+    convertidos = []
+    for v in valores:
+        try:
+            convertidos.append(tipo(float(v)) if v is not None and v != "" else tipo(0))
+        except (TypeError, ValueError):
+            convertidos.append(None)
+    return convertidos
+
+def convertir_lote(filas, indices):
+    """Convierte un lote de filas crudas a tuplas listas para INSERT, columna por columna.
+
+    Devuelve (registros, descartadas): se descartan filas sin nombre o con números inválidos.
+    """
+    nombres = _a_texto(_columna(filas, indices["Nombre"]))
+    marcas = _a_texto(_columna(filas, indices["Marca"]))
+    cantidades = _a_numero(_columna(filas, indices["Cantidad"]), int)
+    precios = _a_numero(_columna(filas, indices["Precio"]), float)
+    categorias = _a_texto(_columna(filas, indices["Categoría"]), CATEGORIA_POR_DEFECTO)
+
+    registros = [
+        registro for registro in zip(nombres, marcas, cantidades, precios, categorias)
+        if registro[0] and registro[2] is not None and registro[3] is not None
+    ]
+    return registros, len(filas) - len(registros)
+
+def leer_excel_por_lotes(archivo, tamano_lote=TAMANO_LOTE):
+    """Lee la primera hoja en modo streaming (openpyxl read-only) y entrega lotes de filas crudas.
+
+    Genera tuplas (indices_columnas, filas, total_estimado).
+    """
+    from openpyxl import load_workbook  # Solo se carga al importar
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        hoja = libro.active
+        total_estimado = max((hoja.max_row or 1) - 1, 0)
+        filas = hoja.iter_rows(values_only=True)
+        indices = _indices_columnas(next(filas, None))
+        lote = []
+        for fila in filas:
+            if not fila or all(v is None for v in fila):
+                continue
+            lote.append(fila)
+            if len(lote) >= tamano_lote:
+                yield indices, lote, total_estimado
+                lote = []
+        if lote:
+            yield indices, lote, total_estimado
+    finally:
+        libro.close()
+
+def _insertar_lote(conn, registros):
+    conn.executemany(
+        "INSERT INTO productos (nombre, marca, cantidad, precio, categoria) VALUES (?, ?, ?, ?, ?)",
+        registros,
+    )
+    return {"insertadas": len(registros), "actualizadas": 0, "sin_cambios": 0}
+
+class ProductosRepetidos(ValueError):
+    """Hay productos con la misma clave natural: no se puede sincronizar hasta unificarlos."""
+
+def _validar_clave(clave):
+    """Verifica que la clave natural solo use columnas conocidas (se interpola en el SQL)."""
+    clave = tuple(clave)
+    if not clave or any(c not in COLUMNAS_PRODUCTO for c in clave) or len(set(clave)) != len(clave):
+        raise ValueError(f"Clave natural inválida para productos: {clave}")
+    if len(clave) == len(COLUMNAS_PRODUCTO):
+        raise ValueError(f"La clave natural {clave} usa todas las columnas: no queda nada que actualizar.")
+    return clave
+
+def _nombre_indice_clave(clave):
+    return "ux_productos_" + "_".join(clave)
+
+def asegurar_indice_clave(conn, clave):
+    """Crea el índice UNIQUE que necesita ON CONFLICT sobre la clave natural.
+
+    El índice existe solo mientras dura la sincronización (quitar_indice_clave() lo borra): si
+    quedara, la importación sin sincronizar y agregar_producto() no podrían repetir la clave.
+    """
+    columnas = ", ".join(clave)
+    try:
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {_nombre_indice_clave(clave)} ON productos ({columnas})")
+    except sqlite3.IntegrityError:
+        duplicados = conn.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM productos GROUP BY {columnas} HAVING COUNT(*) > 1)"
+        ).fetchone()[0]
+        raise ProductosRepetidos(
+            f"Hay {duplicados} productos repetidos por ({columnas}); hay que unificarlos antes de sincronizar."
+        )
+
+def quitar_indice_clave(clave):
+    try:
+        with transaccion("IMMEDIATE") as conn:
+            conn.execute(f"DROP INDEX IF EXISTS {_nombre_indice_clave(clave)}")
+    except sqlite3.Error as e:
+        logging.error(f"❌ Error al quitar el índice de la clave natural: {e}")
+
+def _sincronizar_lote(conn, registros, clave):
+    """Upsert del lote: inserta los nuevos y actualiza solo los que cambiaron."""
+    posiciones = [COLUMNAS_PRODUCTO.index(c) for c in clave]
+    # Si la planilla repite una clave, gana la última fila (como haría una carga secuencial)
+    unicos = list({tuple(r[i] for i in posiciones): r for r in registros}.values())
+
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS lote_importacion ({', '.join(COLUMNAS_PRODUCTO)})")
+    conn.execute("DELETE FROM lote_importacion")
+    conn.executemany("INSERT INTO lote_importacion VALUES (?, ?, ?, ?, ?)", unicos)
+
+    # Se cuenta sobre el lote antes de fusionar: total_changes también suma lo que escriben los
+    # triggers (FTS, registro de cambios) y no sirve para saber cuántos productos se tocaron
+    union = " AND ".join(f"p.{c} = l.{c}" for c in clave)
+    resto = [c for c in COLUMNAS_PRODUCTO if c not in clave]
+    nuevas = conn.execute(
+        f"SELECT COUNT(*) FROM lote_importacion l WHERE NOT EXISTS (SELECT 1 FROM productos p WHERE {union})"
+    ).fetchone()[0]
+    cambiadas = conn.execute(
+        f"""SELECT COUNT(*) FROM lote_importacion l JOIN productos p ON {union}
+            WHERE {' OR '.join(f"p.{c} IS NOT l.{c}" for c in resto)}"""
+    ).fetchone()[0]
+
+    conn.execute(
+        f"""INSERT INTO productos ({', '.join(COLUMNAS_PRODUCTO)})
+            SELECT {', '.join(COLUMNAS_PRODUCTO)} FROM lote_importacion WHERE true
+            ON CONFLICT ({', '.join(clave)}) DO UPDATE SET
+                {', '.join(f"{c} = excluded.{c}" for c in resto)}
+            WHERE {' OR '.join(f"productos.{c} IS NOT excluded.{c}" for c in resto)}"""
+    )
+    return {
+        "insertadas": nuevas,
+        "actualizadas": cambiadas,
+        "sin_cambios": len(unicos) - nuevas - cambiadas,
+    }
+
+def importar_excel(archivo, progreso=None, tamano_lote=TAMANO_LOTE, sincronizar=False, clave=CLAVE_NATURAL_PRODUCTOS):
+    """Importa productos desde Excel en lotes, con una transacción por lote.
+
+    Con `sincronizar=True` los productos se identifican por la clave natural `clave`:
+    los nuevos se insertan, los existentes se actualizan solo si cambió algún dato
+    (INSERT ... ON CONFLICT DO UPDATE) y los iguales no se tocan.
+
+    `progreso(procesadas, total_estimado, filas_por_segundo)` se llama después de cada lote;
+    si devuelve False la importación se detiene (los lotes ya confirmados quedan guardados).
+    Devuelve un resumen con importadas, insertadas, actualizadas, sin_cambios, descartadas,
+    segundos, filas_por_segundo y cancelado.
+    """
+    inicio = time.perf_counter()
+    resumen = {
+        "importadas": 0, "insertadas": 0, "actualizadas": 0, "sin_cambios": 0, "descartadas": 0,
+        "segundos": 0.0, "filas_por_segundo": 0.0, "cancelado": False,
+    }
+    if sincronizar:
+        clave = _validar_clave(clave)
+        try:
+            return _importar_lotes(archivo, progreso, tamano_lote, clave, resumen, inicio)
+        finally:
+            quitar_indice_clave(clave)
+    return _importar_lotes(archivo, progreso, tamano_lote, None, resumen, inicio)
+
+def _importar_lotes(archivo, progreso, tamano_lote, clave, resumen, inicio):
+    """Recorre la planilla lote por lote; con `clave` sincroniza y si no, inserta todo."""
+    for indices, filas, total_estimado in leer_excel_por_lotes(archivo, tamano_lote):
+        registros, descartadas = convertir_lote(filas, indices)
+        with transaccion("IMMEDIATE") as conn:
+            if clave:
+                # Si otra sincronización terminó y lo borró, se vuelve a crear en esta misma transacción
+                asegurar_indice_clave(conn, clave)
+                conteo = _sincronizar_lote(conn, registros, clave)
+            else:
+                conteo = _insertar_lote(conn, registros)
+        for campo, valor in conteo.items():
+            resumen[campo] += valor
+        resumen["importadas"] += len(registros)
+        resumen["descartadas"] += descartadas
+
+        segundos = time.perf_counter() - inicio
+        resumen["segundos"] = segundos
+        resumen["filas_por_segundo"] = resumen["importadas"] / segundos if segundos > 0 else 0.0
+        procesadas = resumen["importadas"] + resumen["descartadas"]
+        if progreso and progreso(procesadas, total_estimado, resumen["filas_por_segundo"]) is False:
+            resumen["cancelado"] = True
+            logging.warning(f"⚠️ Importación cancelada tras {resumen['importadas']} productos.")
+            break
+
+    logging.info(
+        f"✅ Importación desde Excel: {resumen['insertadas']} nuevos, {resumen['actualizadas']} actualizados, "
+        f"{resumen['sin_cambios']} sin cambios, {resumen['descartadas']} descartados, "
+        f"{resumen['segundos']:.2f} s ({resumen['filas_por_segundo']:.0f} filas/s)"
+    )
+    return resumen
+
+def importar_desde_excel(archivo, progreso=None, sincronizar=False):
+    """Versión tolerante a errores de importar_excel(): devuelve el resumen o False.
+
+    Los ValueError (planilla sin las columnas esperadas, ProductosRepetidos) se propagan: su
+    mensaje le dice al usuario qué corregir.
+    """
+    try:
+        return importar_excel(archivo, progreso, sincronizar=sincronizar)
+    except ValueError:
+        raise
+    except Exception as e:  # openpyxl lanza sus propias excepciones para archivos inválidos
+        logging.error(f"❌ Error al importar productos desde Excel: {e}")
+        return False
@@ -0,0 +1,90 @@
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+
+class LoginBloqueado(Exception):
+    """Se superó el límite de intentos de login; hay que esperar `segundos`."""
+
+    def __init__(self, segundos):
+        self.segundos = segundos
+        super().__init__(f"Demasiados intentos de inicio de sesión. Espere {segundos:.0f} segundos.")
+
+class _Estado:
+    __slots__ = ("intentos", "bloqueado_hasta", "bloqueos")
+
+    def __init__(self, limite):
+        self.intentos = deque(maxlen=limite)  # momentos de los últimos intentos
+        self.bloqueado_hasta = 0.0
+        self.bloqueos = 0
+
+class LimitadorLogin:
+    """Limitador de ventana deslizante por clave (usuario, terminal) con memoria acotada.
+
+    Cada clave admite `limites[tipo]` intentos cada `ventana` segundos; al superarlo queda
+    bloqueada `bloqueo_base` segundos, el doble en cada bloqueo siguiente (hasta `bloqueo_max`).
+    Los intentos durante un bloqueo se rechazan sin contarse. Se guardan como mucho `max_claves`
+    claves: al llenarse se descarta la usada hace más tiempo (LRU).
+    """
+
+    def __init__(self, limites, ventana, bloqueo_base, bloqueo_max, max_claves, reloj=time.monotonic):
+        self.limites = dict(limites)
+        self.ventana = ventana
+        self.bloqueo_base = bloqueo_base
+        self.bloqueo_max = bloqueo_max
+        self.max_claves = max_claves
+        self._reloj = reloj
+        self._estados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _estado(self, clave):
+        estado = self._estados.get(clave)
+        if estado is None:
+            estado = self._estados[clave] = _Estado(self.limites[clave[0]])
+            if len(self._estados) > self.max_claves:
+                self._estados.popitem(last=False)
+        else:
+            self._estados.move_to_end(clave)
+        return estado
+
+    def espera(self, claves):
+        """Segundos que faltan para poder intentar (0 si está permitido), sin registrar nada."""
+        ahora = self._reloj()
+        with self._lock:
+            hasta = max((self._estados[c].bloqueado_hasta for c in claves if c in self._estados), default=0.0)
+        return max(hasta - ahora, 0.0)
+
+    def intentar(self, claves):
+        """Registra un intento para todas las claves; devuelve 0 si se permite o los segundos de espera."""
+        ahora = self._reloj()
+        with self._lock:
+            estados = [self._estado(clave) for clave in claves]
+            espera = max(estado.bloqueado_hasta for estado in estados) - ahora
+            if espera > 0:
+                return espera
+
+            for clave, estado in zip(claves, estados):
+                intentos = estado.intentos
+                while intentos and intentos[0] <= ahora - self.ventana:
+                    intentos.popleft()
+                if len(intentos) == intentos.maxlen:
+                    estado.bloqueos += 1
+                    duracion = min(self.bloqueo_base * 2 ** (estado.bloqueos - 1), self.bloqueo_max)
+                    estado.bloqueado_hasta = ahora + duracion
+                    intentos.clear()
+                    espera = max(espera, duracion)
+                    logging.warning(f"🚫 Login bloqueado {duracion:.0f} s para {clave[0]}={clave[1]!r} (bloqueo {estado.bloqueos})")
+            if espera > 0:
+                return espera
+            for estado in estados:
+                estado.intentos.append(ahora)
+            return 0.0
+
+    def exito(self, clave):
+        """Un login correcto limpia los intentos y los bloqueos acumulados de la clave."""
+        with self._lock:
+            self._estados.pop(clave, None)
+
+    def cantidad_claves(self):
+        with self._lock:
+            return len(self._estados)
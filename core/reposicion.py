@@ -0,0 +1,264 @@
+"""Motor de reposición: velocidad de venta, punto de pedido y días de cobertura de cada producto.
+
+El estado vive en arreglos NumPy indexados por id de producto (velocidad, media de los cuadrados
+y stock), así que recalcular las alertas de todo el catálogo es una cuenta vectorizada.
+
+- La velocidad (unidades/día) es un promedio móvil exponencial (EWMA) de las ventas diarias. Se
+  actualiza solo con los días cerrados nuevos, leídos de ventas_diarias_producto, usando la forma
+  cerrada del EWMA: v = v·(1-α)^k + Σ α·(1-α)^antigüedad · unidades. El día en curso no cuenta.
+  El estado se guarda en reposicion_velocidad al cerrar cada día: al reiniciar la aplicación solo
+  se leen los días nuevos (sin estado guardado se arranca con los últimos `historia` días).
+- El stock se sigue con el registro de cambios de productos (las ventas también lo actualizan).
+- Punto de pedido = velocidad · días de entrega + z · desvío diario · √días de entrega.
+
+Medición sobre la base configurada (usar una base de prueba):
+    DB_PATH=/tmp/ventas_prueba.db python -m core.reposicion
+"""
+import math
+import time
+import logging
+import sqlite3
+import threading
+from datetime import date, timedelta
+import numpy as np
+from core.database import transaccion, productos_modificados_desde, cerrar_conexion
+from utils.config import (
+    REPOSICION_VIDA_MEDIA_DIAS, REPOSICION_HISTORIA_DIAS, REPOSICION_DIAS_ENTREGA, REPOSICION_DIAS_CICLO,
+    REPOSICION_NIVEL_SERVICIO_Z, REPOSICION_INTERVALO, REPOSICION_MAX_ALERTAS,
+)
+
+# Con más cambios que estos desde la última revisión conviene releer todo el stock
+_MAX_CAMBIOS_INCREMENTALES = 20000
+
+_TIPO_STOCK = np.dtype([("id", "i8"), ("cantidad", "i8")])
+_TIPO_VENTA_DIARIA = np.dtype([("producto_id", "i8"), ("antiguedad", "i4"), ("unidades", "f8")])
+_TIPO_ESTADO = np.dtype([("producto_id", "i8"), ("velocidad", "f8"), ("cuadrados", "f8")])
+
+# Velocidades menores no se guardan (un producto que dejó de venderse hace meses)
+_VELOCIDAD_MINIMA = 1e-6
+
+class MotorReposicion:
+    """Calcula y publica la lista de productos a reponer, ordenada por días de cobertura.
+
+    actualizar() corre en un hilo de fondo (ver iniciar_motor_reposicion); la interfaz lee el
+    último resultado con alertas() y detecta uno nuevo comparando `version`.
+    """
+
+    def __init__(self, vida_media=REPOSICION_VIDA_MEDIA_DIAS, dias_entrega=REPOSICION_DIAS_ENTREGA,
+                 dias_ciclo=REPOSICION_DIAS_CICLO, z=REPOSICION_NIVEL_SERVICIO_Z,
+                 historia=REPOSICION_HISTORIA_DIAS, max_alertas=REPOSICION_MAX_ALERTAS):
+        self.alfa = 1 - 0.5 ** (1 / vida_media)
+        self.dias_entrega = dias_entrega
+        self.dias_ciclo = dias_ciclo
+        self.z = z
+        self.historia = historia
+        self.max_alertas = max_alertas
+        self._velocidad = np.zeros(0)              # EWMA de unidades vendidas por día
+        self._cuadrados = np.zeros(0)              # EWMA de unidades² (para el desvío)
+        self._stock = np.zeros(0, dtype=np.int64)
+        self._existe = np.zeros(0, dtype=bool)
+        self._dia_cerrado = None                   # último día incluido en la velocidad
+        self._revision = None                      # revisión de productos del stock cargado
+        self._lock = threading.Lock()
+        self._alertas = []
+        self.total_alertas = 0
+        self.version = 0
+
+    def _asegurar_tamano(self, maximo_id):
+        tamano = maximo_id + 1
+        if tamano <= len(self._velocidad):
+            return
+        tamano = max(tamano, len(self._velocidad) * 5 // 4)  # margen para las altas siguientes
+        for nombre in ("_velocidad", "_cuadrados", "_stock", "_existe"):
+            actual = getattr(self, nombre)
+            nuevo = np.zeros(tamano, dtype=actual.dtype)
+            nuevo[:len(actual)] = actual
+            setattr(self, nombre, nuevo)
+
+    def _cargar_stock(self):
+        """Stock de todo el catálogo, o solo de los productos cambiados desde la última revisión."""
+        if self._revision is not None:
+            revision, cambiados, eliminados = productos_modificados_desde(self._revision)
+            if len(cambiados) + len(eliminados) <= _MAX_CAMBIOS_INCREMENTALES:
+                if cambiados:
+                    ids = np.fromiter((fila[0] for fila in cambiados), dtype=np.int64, count=len(cambiados))
+                    self._asegurar_tamano(int(ids.max()))
+                    self._stock[ids] = np.fromiter((fila[3] for fila in cambiados), dtype=np.int64, count=len(cambiados))
+                    self._existe[ids] = True
+                if eliminados:
+                    self._existe[np.asarray(eliminados, dtype=np.int64)] = False
+                self._revision = revision
+                return len(cambiados) + len(eliminados)
+
+        with transaccion() as conn:
+            revision = conn.execute("SELECT valor FROM revision_productos WHERE id = 1").fetchone()[0]
+            filas = np.fromiter(conn.execute("SELECT id, cantidad FROM productos"), dtype=_TIPO_STOCK)
+        self._asegurar_tamano(int(filas["id"].max(initial=0)))
+        self._stock[:] = 0
+        self._existe[:] = False
+        self._stock[filas["id"]] = filas["cantidad"]
+        self._existe[filas["id"]] = True
+        self._revision = revision
+        return len(filas)
+
+    def _actualizar_velocidad(self, hoy):
+        """Incorpora los días cerrados desde la última actualización; devuelve cuántos días sumó."""
+        ayer = hoy - timedelta(days=1)
+        if self._dia_cerrado is None and not self._cargar_estado(ayer):
+            self._dia_cerrado = ayer - timedelta(days=self.historia)
+        dias = (ayer - self._dia_cerrado).days
+        if dias <= 0:
+            return 0
+
+        with transaccion() as conn:
+            cursor = conn.execute(
+                """SELECT producto_id, CAST(julianday(?) - julianday(dia) AS INTEGER), unidades
+                   FROM ventas_diarias_producto WHERE dia > ? AND dia <= ?""",
+                (ayer.isoformat(), self._dia_cerrado.isoformat(), ayer.isoformat()),
+            )
+            ventas = np.fromiter(cursor, dtype=_TIPO_VENTA_DIARIA)
+        ids = ventas["producto_id"]
+        antiguedad, unidades = ventas["antiguedad"], ventas["unidades"]
+        self._asegurar_tamano(int(ids.max(initial=0)))
+
+        retencion = 1 - self.alfa
+        peso = self.alfa * retencion ** antiguedad
+        largo = len(self._velocidad)
+        self._velocidad *= retencion ** dias
+        self._velocidad += np.bincount(ids, weights=peso * unidades, minlength=largo)
+        self._cuadrados *= retencion ** dias
+        self._cuadrados += np.bincount(ids, weights=peso * unidades ** 2, minlength=largo)
+        self._dia_cerrado = ayer
+        self._guardar_estado()
+        return dias
+
+    def _cargar_estado(self, ayer):
+        """Retoma las velocidades guardadas si son recientes y del mismo α. Devuelve True si pudo."""
+        with transaccion() as conn:
+            fila = conn.execute("SELECT dia_cerrado, alfa FROM reposicion_estado WHERE id = 1").fetchone()
+            if fila is None or abs(fila[1] - self.alfa) > 1e-12:
+                return False
+            dia_cerrado = date.fromisoformat(fila[0])
+            if dia_cerrado < ayer - timedelta(days=self.historia):
+                return False
+            estado = np.fromiter(conn.execute("SELECT producto_id, velocidad, cuadrados FROM reposicion_velocidad"),
+                                 dtype=_TIPO_ESTADO)
+        self._asegurar_tamano(int(estado["producto_id"].max(initial=0)))
+        self._velocidad[estado["producto_id"]] = estado["velocidad"]
+        self._cuadrados[estado["producto_id"]] = estado["cuadrados"]
+        self._dia_cerrado = dia_cerrado
+        return True
+
+    def _guardar_estado(self):
+        ids = np.flatnonzero(self._velocidad > _VELOCIDAD_MINIMA)
+        with transaccion("IMMEDIATE") as conn:
+            conn.execute("DELETE FROM reposicion_velocidad")
+            conn.executemany(
+                "INSERT INTO reposicion_velocidad (producto_id, velocidad, cuadrados) VALUES (?, ?, ?)",
+                zip(ids.tolist(), self._velocidad[ids].tolist(), self._cuadrados[ids].tolist()),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO reposicion_estado (id, dia_cerrado, alfa) VALUES (1, ?, ?)",
+                (self._dia_cerrado.isoformat(), self.alfa),
+            )
+
+    def _calcular(self):
+        """Ids en alerta ordenados (menos días de cobertura primero) y sus métricas."""
+        velocidad, stock = self._velocidad, self._stock
+        desvio = np.sqrt(np.maximum(self._cuadrados - velocidad ** 2, 0.0))
+        punto = velocidad * self.dias_entrega + self.z * desvio * math.sqrt(self.dias_entrega)
+        alerta = np.flatnonzero(self._existe & (velocidad > 1e-9) & (stock <= punto))
+        cobertura = stock[alerta] / velocidad[alerta]
+        orden = alerta[np.lexsort((-velocidad[alerta], cobertura))]
+        sugerido = np.maximum(np.ceil(punto[orden] + velocidad[orden] * self.dias_ciclo - stock[orden]), 0)
+        return orden, velocidad[orden], stock[orden] / velocidad[orden], punto[orden], sugerido
+
+    def actualizar(self, hoy=None):
+        """Pone al día stock y velocidades y publica la nueva lista. Devuelve un resumen o None si falla."""
+        inicio = time.perf_counter()
+        try:
+            with self._lock:
+                cambios = self._cargar_stock()
+                dias = self._actualizar_velocidad(hoy or date.today())
+                ids, velocidad, cobertura, punto, sugerido = self._calcular()
+                stock = self._stock[ids]
+            limite = min(len(ids), self.max_alertas)
+            with transaccion() as conn:
+                nombres = {}
+                for desde in range(0, limite, 500):
+                    lote = [int(i) for i in ids[desde:desde + 500]]
+                    nombres.update((fila[0], fila[1:]) for fila in conn.execute(
+                        f"SELECT id, nombre, IFNULL(marca, '') FROM productos WHERE id IN ({', '.join('?' * len(lote))})", lote
+                    ))
+        except sqlite3.Error as e:
+            logging.error(f"❌ Error al actualizar el motor de reposición: {e}")
+            return None
+
+        alertas = []
+        for i in range(limite):
+            producto_id = int(ids[i])
+            nombre, marca = nombres.get(producto_id, (f"Producto {producto_id}", ""))
+            alertas.append((producto_id, nombre, marca, int(stock[i]), float(velocidad[i]),
+                            float(cobertura[i]), float(punto[i]), int(sugerido[i])))
+        self._alertas = alertas  # se reemplaza la lista entera: quien la leyó sigue con la anterior
+        self.total_alertas = len(ids)
+        self.version += 1
+        resumen = {"segundos": time.perf_counter() - inicio, "cambios_stock": cambios, "dias_nuevos": dias,
+                   "alertas": len(ids)}
+        logging.info(
+            f"📦 Reposición: {len(ids)} productos a reponer ({cambios} cambios de stock, {dias} días nuevos) "
+            f"en {resumen['segundos'] * 1000:.0f} ms"
+        )
+        return resumen
+
+    def alertas(self):
+        """Última lista publicada: (id, nombre, marca, stock, venta_diaria, dias_cobertura, punto_pedido, sugerido)."""
+        return self._alertas
+
+### **🔹 Servicio en segundo plano**
+
+_motor = None
+_motor_parar = threading.Event()
+
+def obtener_motor_reposicion():
+    """Devuelve el motor de reposición de la aplicación (se crea la primera vez)."""
+    global _motor
+    if _motor is None:
+        _motor = MotorReposicion()
+    return _motor
+
+def iniciar_motor_reposicion(intervalo=REPOSICION_INTERVALO):
+    """Lanza un hilo que actualiza el motor enseguida y después cada `intervalo` segundos."""
+    motor = obtener_motor_reposicion()
+
+    def _bucle():
+        try:
+            while True:
+                try:
+                    motor.actualizar()
+                except Exception as e:  # un error inesperado no debe matar el hilo
+                    logging.error(f"❌ Error inesperado en el motor de reposición: {e}")
+                if _motor_parar.wait(intervalo):
+                    break
+        finally:
+            cerrar_conexion()
+
+    _motor_parar.clear()
+    hilo = threading.Thread(target=_bucle, name="reposicion", daemon=True)
+    hilo.start()
+    return hilo
+
+def detener_motor_reposicion():
+    _motor_parar.set()
+
+if __name__ == "__main__":
+    from core.database import inicializar_db
+
+    inicializar_db()
+    motor = MotorReposicion()
+    completa = motor.actualizar()
+    incremental = motor.actualizar()
+    print(f"Actualización completa: {completa['segundos'] * 1000:.0f} ms | incremental: {incremental['segundos'] * 1000:.0f} ms "
+          f"| {len(motor._stock)} ids, {completa['alertas']} productos a reponer")
+    for alerta in motor.alertas()[:10]:
+        print("  id={} {} ({}) stock={} venta/día={:.2f} cobertura={:.1f} días punto={:.1f} sugerido={}".format(*alerta))
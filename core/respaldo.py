@@ -0,0 +1,310 @@
+"""Respaldos en caliente de ordico.db con la API de backup de SQLite.
+
+Copiar ordico.db a mano mientras se vende puede dar una copia rota (páginas a medio escribir, WAL
+sin volcar). Acá la copia se hace con Connection.backup() en pasos de RESPALDO_PAGINAS_POR_PASO
+páginas, leyendo desde una foto fija de la base: con WAL, un lector no frena a los escritores, así
+que las cajas siguen vendiendo durante todo el respaldo. Sin la foto fija, cada venta de otra
+conexión haría que SQLite reinicie la copia desde la primera página.
+
+Cada respaldo se escribe en un .tmp, se controla con PRAGMA integrity_check, se comprime (gzip,
+opcional) y recién ahí se renombra; después se borran los más viejos según RESPALDO_RETENCION.
+Los archivos de años cerrados (ventas_AAAA.db) no cambian y no se incluyen: se respaldan una vez.
+
+Uso:
+    python -m core.respaldo crear [--sin-comprimir] [--carpeta DIR]
+    python -m core.respaldo verificar [archivo]
+    python -m core.respaldo listar
+    python -m core.respaldo restaurar archivo    (con la aplicación cerrada)
+"""
+import os
+import re
+import gzip
+import time
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from core.database import conectar_db, transaccion, cerrar_conexion
+from utils.config import (
+    DB_PATH, RESPALDO_DIR, RESPALDO_PAGINAS_POR_PASO, RESPALDO_PAUSA, RESPALDO_INTERVALO,
+    RESPALDO_RETENCION, RESPALDO_COMPRIMIR, RESPALDO_COMPRESION_NIVEL,
+)
+
+_BLOQUE = 1024 * 1024  # bytes por lectura al comprimir/descomprimir
+_respaldo_parar = threading.Event()
+_hilo = None
+
+class RespaldoDanado(Exception):
+    """El respaldo no pasa PRAGMA integrity_check."""
+
+class _RespaldoCancelado(Exception):
+    pass
+
+def _prefijo():
+    return os.path.splitext(os.path.basename(DB_PATH))[0]
+
+def listar_respaldos(carpeta=RESPALDO_DIR):
+    """Rutas de los respaldos de la carpeta, del más viejo al más nuevo."""
+    if not os.path.isdir(carpeta):
+        return []
+    patron = re.compile(rf"^{re.escape(_prefijo())}_\d{{8}}_\d{{6}}\.db(\.gz)?$")
+    return [os.path.join(carpeta, nombre) for nombre in sorted(os.listdir(carpeta)) if patron.match(nombre)]
+
+def _aplicar_retencion(carpeta, conservar):
+    """Borra los respaldos más viejos dejando los `conservar` más nuevos; devuelve cuántos borró."""
+    viejos = listar_respaldos(carpeta)[:-conservar] if conservar > 0 else []
+    for ruta in viejos:
+        os.remove(ruta)
+        logging.info(f"🗑 Respaldo vencido borrado: {ruta}")
+    return len(viejos)
+
+def _integridad(ruta):
+    """Resultado de PRAGMA integrity_check ("ok" si la base está sana)."""
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    conn.set_progress_handler(_respaldo_parar.is_set, 100000)  # al cerrar la aplicación se interrumpe
+    try:
+        return "; ".join(fila[0] for fila in conn.execute("PRAGMA integrity_check"))
+    except sqlite3.OperationalError:
+        if _respaldo_parar.is_set():
+            raise _RespaldoCancelado()
+        raise
+    finally:
+        conn.close()
+
+def _comprimir(origen, destino, nivel=RESPALDO_COMPRESION_NIVEL):
+    with open(origen, "rb") as entrada, gzip.open(destino, "wb", compresslevel=nivel) as salida:
+        while True:
+            bloque = entrada.read(_BLOQUE)
+            if not bloque:
+                break
+            if _respaldo_parar.is_set():
+                raise _RespaldoCancelado()
+            salida.write(bloque)
+
+def _descomprimir(origen, destino):
+    with gzip.open(origen, "rb") as entrada, open(destino, "wb") as salida:
+        shutil.copyfileobj(entrada, salida, _BLOQUE)
+
+def _copiar_en_caliente(destino, paginas, pausa, progreso):
+    """Copia la base a `destino` con la API de backup; devuelve las páginas copiadas."""
+    conn = conectar_db()
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        # Foto fija para toda la copia: las ventas de otras conexiones no la reinician y el lector
+        # no bloquea a nadie
+        foto = transaccion()
+    else:
+        # Con rollback journal cada venta reiniciaría la copia por pasos: se copia en un solo paso
+        # y las cajas esperan lo que dure
+        logging.warning("⚠️ La base no está en modo WAL: las ventas esperan hasta que termine el respaldo.")
+        foto, paginas = nullcontext(conn), -1
+    copia = sqlite3.connect(destino, isolation_level=None)
+    total = [0]
+
+    def _paso(estado, restantes, paginas_totales):
+        total[0] = paginas_totales
+        if _respaldo_parar.is_set() or (progreso and progreso(paginas_totales - restantes, paginas_totales) is False):
+            raise _RespaldoCancelado()
+
+    try:
+        with foto as conn:
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # abre la foto de lectura
+            conn.backup(copia, pages=paginas, progress=_paso, sleep=pausa)
+        copia.execute("PRAGMA journal_mode = DELETE")  # un solo archivo, sin -wal al lado
+    finally:
+        copia.close()
+    return total[0]
+
+def crear_respaldo(carpeta=RESPALDO_DIR, comprimir=RESPALDO_COMPRIMIR, conservar=RESPALDO_RETENCION,
+                   progreso=None, paginas=RESPALDO_PAGINAS_POR_PASO, pausa=RESPALDO_PAUSA):
+    """Respalda la base en `carpeta` sin frenar las ventas. Devuelve un resumen.
+
+    `progreso(paginas_copiadas, paginas_totales)` se llama en cada paso; si devuelve False el
+    respaldo se cancela y no queda archivo. `conservar=None` no borra respaldos viejos.
+    Lanza RespaldoDanado si la copia no pasa integrity_check.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    for nombre in os.listdir(carpeta):
+        if nombre.endswith(".tmp"):
+            os.remove(os.path.join(carpeta, nombre))  # restos de un respaldo cortado
+
+    inicio = time.perf_counter()
+    ruta = os.path.join(carpeta, f"{_prefijo()}_{datetime.now():%Y%m%d_%H%M%S}.db")
+    temporal = ruta + ".tmp"
+    resumen = {"archivo": None, "bytes": 0, "paginas": 0, "segundos": 0.0, "mb_por_segundo": 0.0,
+               "segundos_copia": 0.0, "segundos_verificacion": 0.0, "segundos_compresion": 0.0,
+               "cancelado": False}
+    try:
+        resumen["paginas"] = _copiar_en_caliente(temporal, paginas, pausa, progreso)
+        resumen["segundos_copia"] = time.perf_counter() - inicio
+        copiados = os.path.getsize(temporal)
+        resumen["mb_por_segundo"] = copiados / 1048576 / resumen["segundos_copia"] if resumen["segundos_copia"] > 0 else 0.0
+
+        marca = time.perf_counter()
+        integridad = _integridad(temporal)
+        resumen["segundos_verificacion"] = time.perf_counter() - marca
+        if integridad != "ok":
+            raise RespaldoDanado(f"El respaldo no pasó integrity_check: {integridad[:200]}")
+
+        if comprimir:
+            marca = time.perf_counter()
+            ruta += ".gz"
+            _comprimir(temporal, ruta + ".tmp")
+            os.remove(temporal)
+            temporal = ruta + ".tmp"
+            resumen["segundos_compresion"] = time.perf_counter() - marca
+        os.replace(temporal, ruta)
+    except _RespaldoCancelado:
+        resumen["cancelado"] = True
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    resumen["segundos"] = time.perf_counter() - inicio
+    if resumen["cancelado"]:
+        logging.warning(f"⚠️ Respaldo cancelado tras {resumen['segundos']:.1f} s.")
+        return resumen
+    resumen["archivo"] = ruta
+    resumen["bytes"] = os.path.getsize(ruta)
+    logging.info(
+        f"✅ Respaldo {ruta}: {resumen['paginas']} páginas copiadas en {resumen['segundos_copia']:.1f} s "
+        f"({resumen['mb_por_segundo']:.0f} MiB/s), {resumen['bytes'] / 1048576:.1f} MiB en disco."
+    )
+    if conservar is not None:
+        _aplicar_retencion(carpeta, conservar)
+    return resumen
+
+def _abrir_respaldo(ruta):
+    """Ruta a una base SQLite legible del respaldo y si es temporal (los .gz se descomprimen aparte)."""
+    if not ruta.endswith(".gz"):
+        return ruta, False
+    descriptor, temporal = tempfile.mkstemp(suffix=".db", dir=os.path.dirname(os.path.abspath(ruta)))
+    os.close(descriptor)
+    try:
+        _descomprimir(ruta, temporal)
+    except BaseException:
+        os.remove(temporal)
+        raise
+    return temporal, True
+
+def verificar_respaldo(ruta):
+    """Corre PRAGMA integrity_check sobre el respaldo. Devuelve True si está sano."""
+    if not os.path.exists(ruta):
+        logging.error(f"❌ No existe el respaldo {ruta}")
+        return False
+    inicio = time.perf_counter()
+    try:
+        base, temporal = _abrir_respaldo(ruta)
+        try:
+            integridad = _integridad(base)
+        finally:
+            if temporal:
+                os.remove(base)
+    except (OSError, EOFError, sqlite3.Error) as e:  # gzip truncado o corrupto, archivo que no es SQLite
+        logging.error(f"❌ Error al verificar {ruta}: {e}")
+        return False
+    if integridad != "ok":
+        logging.error(f"❌ El respaldo {ruta} está dañado: {integridad[:200]}")
+        return False
+    logging.info(f"✅ Respaldo {ruta} verificado en {time.perf_counter() - inicio:.1f} s.")
+    return True
+
+def restaurar_respaldo(ruta):
+    """Reemplaza la base por el respaldo, después de verificarlo y de respaldar la base actual.
+
+    Se debe ejecutar con la aplicación cerrada. Lanza RespaldoDanado si el respaldo no está sano.
+    """
+    if not verificar_respaldo(ruta):
+        raise RespaldoDanado(f"{ruta} no está sano; no se restaura.")
+    if os.path.exists(DB_PATH):
+        previo = crear_respaldo(conservar=None)  # por si hay que deshacer la restauración
+        logging.info(f"🗄 Base anterior guardada en {previo['archivo']}")
+
+    base, temporal = _abrir_respaldo(ruta)
+    origen = sqlite3.connect(base, isolation_level=None)
+    destino = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        origen.backup(destino)
+        integridad = destino.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        destino.close()
+        origen.close()
+        if temporal:
+            os.remove(base)
+    if integridad != "ok":
+        raise RespaldoDanado(f"La base restaurada no pasó quick_check: {integridad}")
+    logging.info(f"✅ Base restaurada desde {ruta}")
+    return True
+
+def _segundos_hasta_proximo(intervalo, carpeta=RESPALDO_DIR):
+    """Espera hasta el próximo respaldo: reiniciar la aplicación no adelanta ni posterga el ciclo."""
+    respaldos = listar_respaldos(carpeta)
+    if not respaldos:
+        return 0
+    return max(0, intervalo - (time.time() - os.path.getmtime(respaldos[-1])))
+
+def iniciar_respaldos_periodicos(intervalo=RESPALDO_INTERVALO):
+    """Lanza un hilo que hace un respaldo cada `intervalo` segundos (compresión incluida)."""
+    global _hilo
+
+    def _bucle():
+        espera = _segundos_hasta_proximo(intervalo)
+        try:
+            while not _respaldo_parar.wait(espera):
+                try:
+                    crear_respaldo()
+                except (sqlite3.Error, OSError, RespaldoDanado) as e:
+                    logging.error(f"❌ Error en el respaldo programado: {e}")
+                espera = intervalo
+        finally:
+            cerrar_conexion()
+
+    _respaldo_parar.clear()
+    _hilo = threading.Thread(target=_bucle, name="respaldo-db", daemon=True)
+    _hilo.start()
+    return _hilo
+
+def detener_respaldos_periodicos(espera=10):
+    """Detiene el hilo de respaldos; un respaldo en curso se cancela y borra su temporal."""
+    _respaldo_parar.set()
+    if _hilo is not None and _hilo.is_alive():
+        _hilo.join(espera)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Respaldos en caliente de la base de ORDICO.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    crear = subcomandos.add_parser("crear", help="respalda la base ahora")
+    crear.add_argument("--carpeta", default=RESPALDO_DIR)
+    crear.add_argument("--sin-comprimir", action="store_true")
+    verificar = subcomandos.add_parser("verificar", help="integrity_check de un respaldo (por defecto, todos)")
+    verificar.add_argument("archivo", nargs="?")
+    subcomandos.add_parser("listar", help="muestra los respaldos de la carpeta")
+    restaurar = subcomandos.add_parser("restaurar", help="reemplaza la base por un respaldo (con la aplicación cerrada)")
+    restaurar.add_argument("archivo")
+    args = parser.parse_args(argumentos)
+
+    if args.comando == "crear":
+        from core.database import inicializar_db
+
+        inicializar_db()
+        resumen = crear_respaldo(args.carpeta, comprimir=not args.sin_comprimir)
+        return 0 if resumen["archivo"] else 1
+    if args.comando == "verificar":
+        respaldos = [args.archivo] if args.archivo else listar_respaldos()
+        return 0 if all([verificar_respaldo(ruta) for ruta in respaldos]) else 1
+    if args.comando == "listar":
+        for ruta in listar_respaldos():
+            fecha = datetime.fromtimestamp(os.path.getmtime(ruta)).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{os.path.basename(ruta)} | {os.path.getsize(ruta) / 1048576:.1f} MiB | {fecha}")
+        return 0
+    try:
+        restaurar_respaldo(args.archivo)
+    except RespaldoDanado as e:
+        parser.error(str(e))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
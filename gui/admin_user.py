@@ -1,8 +1,6 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QComboBox, QPushButton, QMessageBox
-from core.auth import registrar_usuario
-import logging
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QComboBox, QPushButton, QMessageBox
-from core.auth import registrar_usuario
+from core.auth import registrar_usuario_async
+from gui.tarea_fondo import TareaFondo
 import logging
 
 class AdminUsersDialog(QDialog):
@@ -65,11 +63,15 @@ class AdminUsersDialog(QDialog):
             QMessageBox.warning(self, "Error", "Todos los campos son obligatorios.")
             return
 
-        mensaje = registrar_usuario(username, password, email, dni, rol)
+        # El hash de la contraseña se calcula en segundo plano
+        self.nuevo_usuario = (username, rol)
+        TareaFondo(registrar_usuario_async(username, password, email, dni, rol), self, self.usuario_creado, self.usuario_no_creado)
+
+    def usuario_creado(self, mensaje):
+        QMessageBox.information(self, "Éxito", mensaje)
+        logging.info(f"✅ Usuario creado: {self.nuevo_usuario[0]} con rol {self.nuevo_usuario[1]}")
+        self.accept()
 
-        if "exitosamente" in mensaje:
-            QMessageBox.information(self, "Éxito", mensaje)
-            logging.info(f"✅ Usuario creado: {username} con rol {rol}")
-            self.accept()
-        else:
-            QMessageBox.warning(self, "Error", mensaje)
+    def usuario_no_creado(self, mensaje):
+        # Usuario repetido (UsuarioExistente) o error inesperado al registrar
+        QMessageBox.warning(self, "Error", mensaje)
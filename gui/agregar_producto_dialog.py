@@ -1,15 +1,16 @@
 import logging
 import sys
 from PyQt5.QtWidgets import QDialog,QVBoxLayout, QFormLayout, QLabel, QLineEdit, QComboBox, QPushButton, QMessageBox, QFileDialog, QWidget, QTableWidget, QHeaderView, QHBoxLayout, QTableWidgetItem
-from core.database import agregar_producto, obtener_productos
+from core.database import agregar_producto, actualizar_producto, obtener_productos
 
 categorias_en_memoria = [
     "Comestibles", "Lácteos", "Panadería", "Dulces", "Jardinería",
     "Cuidado personal", "Carnes rojas", "Carnes blancas", "Productos Varios"]
 
 class AgregarProductoDialog(QDialog):
-    def __init__(self, nombre="", marca="", cantidad="", precio="", categoria=""):
+    def __init__(self, nombre="", marca="", cantidad="", precio="", categoria="", id_producto=None):
         super().__init__()
+        self.id_producto = id_producto  # Si viene un ID, el diálogo edita ese producto
         self.nombre = nombre
         self.marca = marca
         self.cantidad = cantidad
@@ -19,7 +20,7 @@ class AgregarProductoDialog(QDialog):
 
     def init_ui(self):
         """Inicializa la interfaz de agregar producto con sugerencias de categoría."""
-        self.setWindowTitle("Agregar Producto")
+        self.setWindowTitle("Editar Producto" if self.id_producto is not None else "Agregar Producto")
         self.setGeometry(200, 200, 400, 300)
 
         form_layout = QFormLayout()
@@ -76,6 +77,15 @@ class AgregarProductoDialog(QDialog):
         if categoria and categoria not in categorias_en_memoria:
             categorias_en_memoria.append(categoria)  # Se guarda en memoria para futuras sugerencias
 
+        # ✅ Con ID se actualiza el producto existente
+        if self.id_producto is not None:
+            if actualizar_producto(self.id_producto, nombre, marca, cantidad, precio, categoria):
+                QMessageBox.information(self, "Éxito", "Producto actualizado correctamente.")
+                self.accept()
+            else:
+                QMessageBox.warning(self, "Error", "No se pudo actualizar el producto.")
+            return
+
         # ✅ Llamar a la función que guarda en la base de datos (sin ID)
         if agregar_producto(nombre, marca, cantidad, precio, categoria):
             QMessageBox.information(self, "Éxito", "Producto agregado correctamente.")
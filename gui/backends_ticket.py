@@ -0,0 +1,130 @@
+import os
+from utils.config import TICKET_BACKEND, TICKET_DISENO, TICKET_ANCHO_TEXTO
+
+class BackendTicket:
+    """Interfaz de los generadores de tickets: renderizar() devuelve los bytes a guardar o imprimir."""
+
+    nombre = ""
+    extension = ""
+
+    def renderizar(self, empresa, productos, subtotal, total, impuestos):
+        raise NotImplementedError
+
+class BackendPDF(BackendTicket):
+    """Ticket en PDF con FPDF (plantillas compiladas de gui.generar_ticket)."""
+
+    nombre = "pdf"
+    extension = ".pdf"
+
+    def __init__(self, diseno=TICKET_DISENO):
+        self.diseno = diseno
+
+    def renderizar(self, empresa, productos, subtotal, total, impuestos):
+        from gui.generar_ticket import construir_ticket_pdf
+
+        pdf = construir_ticket_pdf(empresa, productos, subtotal, total, impuestos, self.diseno)
+        return pdf.output(dest="S").encode("latin-1")  # FPDF 1.7 devuelve el PDF como str latin-1
+
+class BackendTexto(BackendTicket):
+    """Ticket en texto de ancho fijo (UTF-8), para impresoras de tickets o archivo .txt."""
+
+    nombre = "texto"
+    extension = ".txt"
+    codificacion = "utf-8"
+
+    def __init__(self, ancho=TICKET_ANCHO_TEXTO):
+        self.ancho = ancho
+        # Columnas: cantidad, producto, precio unitario, total (separadas por un espacio)
+        self.ancho_cantidad, self.ancho_precio, self.ancho_total = 4, 10, 11
+        self.ancho_producto = ancho - self.ancho_cantidad - self.ancho_precio - self.ancho_total - 3
+
+    def _fila(self, cantidad, producto, precio, total):
+        return (
+            f"{cantidad:>{self.ancho_cantidad}} {producto[:self.ancho_producto]:<{self.ancho_producto}} "
+            f"{precio:>{self.ancho_precio}} {total:>{self.ancho_total}}"
+        )
+
+    def lineas(self, empresa, productos, subtotal, total, impuestos):
+        """Arma el ticket como una lista de (texto, estilo); estilo es None, "titulo" o "negrita"."""
+        direccion = empresa.get('direccion', empresa.get('Direccion', 'No disponible'))
+        separador = ("-" * self.ancho, None)
+        lineas = [
+            (str(empresa['nombre']).center(self.ancho), "titulo"),
+            (f"CUIT: {empresa['cuit']}".center(self.ancho), None),
+            (f"Dirección: {direccion}"[:self.ancho].center(self.ancho), None),
+            separador,
+            (self._fila("Cant", "Producto", "P.U.", "Total"), "negrita"),
+            separador,
+        ]
+        for producto in productos:
+            lineas.append((self._fila(
+                producto['cantidad'],
+                str(producto['nombre']),
+                f"${producto['precio_unitario']:.2f}",
+                f"${producto['total']:.2f}",
+            ), None))
+        lineas.append(separador)
+        lineas.append((f"Subtotal: ${subtotal:.2f}".rjust(self.ancho), None))
+        lineas.append((f"Impuestos: ${impuestos:.2f}".rjust(self.ancho), None))
+        lineas.append((f"Total: ${total:.2f}".rjust(self.ancho), "negrita"))
+        return lineas
+
+    def renderizar(self, empresa, productos, subtotal, total, impuestos):
+        lineas = self.lineas(empresa, productos, subtotal, total, impuestos)
+        return ("\n".join(texto.rstrip() for texto, _estilo in lineas) + "\n").encode(self.codificacion)
+
+class BackendEscPos(BackendTexto):
+    """El mismo ticket de texto con comandos ESC/POS (negrita, título grande y corte de papel)."""
+
+    nombre = "escpos"
+    extension = ".bin"
+    codificacion = "cp850"
+
+    INICIAR = b"\x1b@"               # ESC @: reinicia la impresora
+    CODEPAGE_850 = b"\x1bt\x02"      # ESC t 2: tabla de caracteres PC850
+    NEGRITA = (b"\x1bE\x01", b"\x1bE\x00")
+    CENTRADO = (b"\x1ba\x01", b"\x1ba\x00")
+    DOBLE_TAMANO = (b"\x1d!\x11", b"\x1d!\x00")
+    AVANZAR_Y_CORTAR = b"\x1dVB\x03"  # GS V 66 3: avanza 3 líneas y corta
+
+    def renderizar(self, empresa, productos, subtotal, total, impuestos):
+        salida = bytearray(self.INICIAR + self.CODEPAGE_850)
+        for texto, estilo in self.lineas(empresa, productos, subtotal, total, impuestos):
+            datos = texto.rstrip().encode(self.codificacion, errors="replace") + b"\n"
+            if estilo == "titulo":
+                # En doble tamaño entran la mitad de caracteres: lo centra la impresora
+                datos = texto.strip().encode(self.codificacion, errors="replace") + b"\n"
+                salida += self.CENTRADO[0] + self.DOBLE_TAMANO[0] + self.NEGRITA[0] + datos
+                salida += self.NEGRITA[1] + self.DOBLE_TAMANO[1] + self.CENTRADO[1]
+            elif estilo == "negrita":
+                salida += self.NEGRITA[0] + datos + self.NEGRITA[1]
+            else:
+                salida += datos
+        salida += self.AVANZAR_Y_CORTAR
+        return bytes(salida)
+
+BACKENDS_TICKET = {
+    BackendPDF.nombre: BackendPDF,
+    BackendTexto.nombre: BackendTexto,
+    BackendEscPos.nombre: BackendEscPos,
+}
+
+def obtener_backend(nombre=TICKET_BACKEND):
+    """Crea el backend de tickets configurado ("pdf", "texto" o "escpos")."""
+    if nombre not in BACKENDS_TICKET:
+        raise ValueError(f"Backend de tickets desconocido: {nombre}")
+    return BACKENDS_TICKET[nombre]()
+
+def guardar_ticket(ruta, datos):
+    """Escribe el ticket en un archivo de forma atómica (archivo temporal + rename)."""
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(datos)
+    os.replace(temporal, ruta)
+    return ruta
+
+def enviar_a_dispositivo(dispositivo, datos):
+    """Manda el ticket a una impresora local o cola de impresión (p. ej. /dev/usb/lp0)."""
+    with open(dispositivo, "wb") as salida:
+        salida.write(datos)
+    return dispositivo
@@ -1,11 +1,14 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QMessageBox, QSpinBox
-from gui.generar_ticket import generar_ticket_pdf
-import sqlite3
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QMessageBox, QSpinBox, QTableView, QAbstractItemView
+from gui.servicio_tickets import obtener_servicio_tickets
+from gui.modelo_tabla import ModeloTablaColumnar
+from utils.config import TICKET_BACKEND, DATOS_EMPRESA, TASA_IMPUESTOS, STOCK_BAJO
+from core.database import buscar_productos, obtener_stock_producto, registrar_venta, StockInsuficiente, VentaInvalida
 
 class Carrito(QDialog):
     """Ventana de ventas (para cajeros)"""
-    def __init__(self):
+    def __init__(self, usuario_actual=None):
         super().__init__()
+        self.usuario_actual = usuario_actual or {}
         self.init_ui()
         self.carrito = []
     
@@ -20,15 +23,20 @@ class Carrito(QDialog):
         self.layout.addWidget(self.label)
 
         self.entrada_busqueda = QLineEdit()
+        self.entrada_busqueda.returnPressed.connect(self.buscar_productos)
         self.layout.addWidget(self.entrada_busqueda)
 
         self.boton_buscar = QPushButton("Buscar")
         self.boton_buscar.clicked.connect(self.buscar_productos)
         self.layout.addWidget(self.boton_buscar)
 
-        self.tabla_productos = QTableWidget()
-        self.tabla_productos.setColumnCount(4)
-        self.tabla_productos.setHorizontalHeaderLabels(["ID", "Nombre", "Precio", "Cantidad Disponible"])
+        self.modelo_productos = ModeloTablaColumnar([
+            ("ID", "i"), ("Nombre", "s"), ("Precio", "d"), ("Cantidad Disponible", "i")
+        ], self)
+        self.tabla_productos = QTableView()
+        self.tabla_productos.setModel(self.modelo_productos)
+        self.tabla_productos.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla_productos.setSelectionMode(QAbstractItemView.SingleSelection)  # Sin ordenar: se respeta la relevancia
         self.layout.addWidget(self.tabla_productos)
 
         self.label_cantidad = QLabel("Cantidad a Comprar:")
@@ -55,36 +63,40 @@ class Carrito(QDialog):
         self.boton_finalizar.clicked.connect(self.finalizar_compra)
         self.layout.addWidget(self.boton_finalizar)
 
+        self.label_ticket = QLabel("")
+        self.layout.addWidget(self.label_ticket)
+
+        # Los tickets se generan en segundo plano; acá solo se informa cuando quedan listos
+        self.servicio_tickets = obtener_servicio_tickets()
+        self.servicio_tickets.ticket_listo.connect(self.ticket_listo)
+        self.servicio_tickets.ticket_error.connect(self.ticket_error)
+
     def buscar_productos(self):
         query = self.entrada_busqueda.text()
-        conn = sqlite3.connect("ordico.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nombre, precio, cantidad FROM productos WHERE nombre LIKE ?", ('%' + query + '%',))
-        productos = cursor.fetchall()
-        conn.close()
-
-        self.tabla_productos.setRowCount(len(productos))
-        for row_idx, producto in enumerate(productos):
-            for col_idx, dato in enumerate(producto):
-                self.tabla_productos.setItem(row_idx, col_idx, QTableWidgetItem(str(dato)))
+        productos = buscar_productos(query)
+        self.modelo_productos.cargar(productos)
 
     def agregar_al_carrito(self):
-        selected_row = self.tabla_productos.currentRow()
-        if selected_row == -1:
+        selected_index = self.tabla_productos.currentIndex()
+        if not selected_index.isValid():
             QMessageBox.warning(self, "Error", "Seleccione un producto.")
             return
 
-        id_producto = self.tabla_productos.item(selected_row, 0).text()
-        nombre = self.tabla_productos.item(selected_row, 1).text()
-        precio = float(self.tabla_productos.item(selected_row, 2).text())
-        cantidad_disponible = int(self.tabla_productos.item(selected_row, 3).text())
+        id_producto, nombre, precio, _ = self.modelo_productos.fila(selected_index.row())
         cantidad_a_comprar = self.cantidad_spinbox.value()
 
+        # Stock actual de la base (la tabla puede estar desactualizada) menos lo que ya está en el carrito
+        cantidad_disponible = obtener_stock_producto(id_producto)
+        if cantidad_disponible is None:
+            QMessageBox.warning(self, "Error", "El producto ya no existe.")
+            return
+        cantidad_disponible -= sum(item[3] for item in self.carrito if item[0] == id_producto)
+
         if cantidad_a_comprar > cantidad_disponible:
             QMessageBox.warning(self, "Error", "Stock insuficiente para la cantidad solicitada.")
             return
 
-        if cantidad_disponible <= 5:
+        if cantidad_disponible <= STOCK_BAJO:
             QMessageBox.warning(self, "Advertencia", f"Quedan pocos productos en stock: {cantidad_disponible} unidades.")
 
         self.carrito.append([id_producto, nombre, precio, cantidad_a_comprar])
@@ -111,11 +123,7 @@ class Carrito(QDialog):
             QMessageBox.warning(self, "Carrito vacío", "No hay productos en el carrito.")
             return
 
-        datos_empresa = {
-            "nombre": "ORDICO",
-            "cuit": "30-12345678-9",
-            "direccion": "Calle Falsa 123"
-        }
+        datos_empresa = dict(DATOS_EMPRESA)
 
         print("📄 Datos de la empresa ANTES de generar el ticket:", datos_empresa)
         
@@ -127,13 +135,34 @@ class Carrito(QDialog):
         } for item in self.carrito]
 
         subtotal = sum(p["total"] for p in productos)
-        impuestos = subtotal * 0.21
+        impuestos = subtotal * TASA_IMPUESTOS
         total = subtotal + impuestos
 
+        # La venta se registra (y descuenta stock) antes de emitir el ticket
         try:
-            generar_ticket_pdf(datos_empresa, productos, subtotal, total, impuestos)
-            QMessageBox.information(self, "Compra finalizada", "El ticket ha sido generado correctamente.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error al generar el ticket", f"Ocurrió un error: {str(e)}")
+            ticket = registrar_venta(self.usuario_actual.get("id"), [(item[0], item[3]) for item in self.carrito])
+        except StockInsuficiente as e:
+            nombre = next((item[1] for item in self.carrito if item[0] == e.producto_id), e.producto_id)
+            QMessageBox.warning(self, "Stock insuficiente", f"No hay stock suficiente de {nombre}: quedan {e.disponible} unidades.")
+            return
+        except VentaInvalida as e:
+            QMessageBox.warning(self, "Venta inválida", str(e))
+            return
+        if ticket is None:
+            QMessageBox.critical(self, "Error", "No se pudo registrar la venta.")
+            return
+
+        self.servicio_tickets.encolar(ticket, datos_empresa, productos, subtotal, total, impuestos, backend=TICKET_BACKEND)
+        self.label_ticket.setText(f"🧾 Generando ticket {ticket}...")
+        QMessageBox.information(self, "Compra finalizada", f"Venta registrada. Ticket N° {ticket}.")
 
         self.carrito = []
+        self.actualizar_carrito()
+        self.buscar_productos()  # Refresca el stock mostrado
+
+    def ticket_listo(self, numero, ruta):
+        self.label_ticket.setText(f"🧾 Ticket {numero} guardado en {ruta}")
+
+    def ticket_error(self, numero, mensaje):
+        self.label_ticket.setText(f"❌ No se pudo generar el ticket {numero}")
+        QMessageBox.critical(self, "Error al generar el ticket", f"Ticket {numero}: {mensaje}")
@@ -1,37 +1,216 @@
-from fpdf import FPDF
 import os
-from tkinter import Tk, filedialog
-import webbrowser
+import time
+from functools import lru_cache
+from utils.config import TICKET_DISENO
+
+# Diseños de ticket (medidas en mm, letras en puntos)
+DISENOS_TICKET = {
+    # Hoja A4 con el aspecto del ticket original
+    "a4": {
+        "formato": "A4",
+        "ancho_pagina": 210,
+        "alto_pagina": 297,
+        "margen": 10,
+        "margen_salto": 15,
+        "ancho_util": 200,
+        "alto_linea": 10,
+        "fuente": "Arial",
+        "tamano_titulo": 16,
+        "tamano_texto": 12,
+        "bordes": 1,
+        "guiones": 42,
+        "separar_columnas": False,
+        # (título, ancho, alineación, recortar): solo se recortan textos, nunca importes
+        "columnas": (("Cantidad", 40, "L", False), ("Producto", 80, "L", True), ("Precio U.", 30, "L", False), ("Total", 40, "L", False)),
+    },
+    # Rollo de impresora térmica de 80 mm (72 mm imprimibles); el largo se ajusta a los ítems
+    "termica": {
+        "formato": None,  # se calcula en cada ticket
+        "ancho_pagina": 80,
+        "alto_pagina": None,
+        "margen": 4,
+        "margen_salto": 0,
+        "ancho_util": 72,
+        "alto_linea": 5,
+        "fuente": "Arial",
+        "tamano_titulo": 12,
+        "tamano_texto": 8,
+        "bordes": 0,
+        "guiones": None,  # tantos como entren en el ancho útil
+        "separar_columnas": True,
+        "columnas": (("Cant", 8, "R", False), ("Producto", 28, "L", True), ("P.U.", 17, "R", False), ("Total", 19, "R", False)),
+    },
+}
+
+_MARGEN_CELDA = 1  # mm que FPDF deja entre el borde de la celda y el texto
+
+@lru_cache(maxsize=None)
+def _medidor(familia, estilo, tamano):
+    """Documento FPDF vacío con la fuente elegida, solo para medir textos."""
+    from fpdf import FPDF  # Se carga recién al generar el primer ticket
 
-def generar_ticket_pdf(empresa, productos, subtotal, total, impuestos):
     pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(200, 10, empresa['nombre'], ln=True, align='C')
-    pdf.set_font("Arial", "", 12)
-    pdf.cell(200, 10, f"CUIT: {empresa['cuit']}", ln=True, align='C')
-    pdf.cell(200, 10, f"Dirección: {empresa.get('direccion', empresa.get('Direccion', 'No disponible'))}", ln=True, align='C')
-    pdf.cell(200, 10, "------------------------------------------", ln=True, align='C')
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(40, 10, "Cantidad", border=1)
-    pdf.cell(80, 10, "Producto", border=1)
-    pdf.cell(30, 10, "Precio U.", border=1)
-    pdf.cell(40, 10, "Total", border=1, ln=True)
-    
-    pdf.set_font("Arial", "", 12)
-    for producto in productos:
-        pdf.cell(40, 10, str(producto['cantidad']), border=1)
-        pdf.cell(80, 10, producto['nombre'], border=1)
-        pdf.cell(30, 10, f"${producto['precio_unitario']:.2f}", border=1)
-        pdf.cell(40, 10, f"${producto['total']:.2f}", border=1, ln=True)
-    
-    pdf.cell(200, 10, "------------------------------------------", ln=True, align='C')
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(200, 10, f"Subtotal: ${subtotal:.2f}", ln=True, align='R')
-    pdf.cell(200, 10, f"Impuestos: ${impuestos:.2f}", ln=True, align='R')
-    pdf.cell(200, 10, f"Total: ${total:.2f}", ln=True, align='R')
-    
+    pdf.set_font(familia, estilo, tamano)
+    return pdf
+
+def ancho_texto(texto, familia, estilo, tamano):
+    """Ancho en mm de `texto` (FPDF.get_string_width() con la fuente en caché)."""
+    return _medidor(familia, estilo, tamano).get_string_width(texto)
+
+@lru_cache(maxsize=4096)
+def recortar_texto(texto, ancho_max, familia, estilo, tamano):
+    """Recorta `texto` para que entre en `ancho_max` mm; devuelve (texto, ancho)."""
+    ancho = ancho_texto(texto, familia, estilo, tamano)
+    if ancho <= ancho_max:
+        return texto, ancho
+    while texto and ancho_texto(texto + "...", familia, estilo, tamano) > ancho_max:
+        texto = texto[:-1]
+    texto += "..."
+    return texto, ancho_texto(texto, familia, estilo, tamano)
+
+class PlantillaTicket:
+    """Ticket precompilado para una empresa y un diseño.
+
+    El encabezado (empresa, separadores y títulos de columnas) se arma una sola vez como una
+    lista de celdas con los textos ya recortados; cada ticket la vuelca con FPDF.cell() y
+    agrega las filas de productos con las columnas precalculadas. Solo se usa la API pública
+    de FPDF, así que no depende de sus estructuras internas.
+    """
+
+    def __init__(self, empresa, diseno=TICKET_DISENO):
+        if diseno not in DISENOS_TICKET:
+            raise ValueError(f"Diseño de ticket desconocido: {diseno}")
+        self.nombre_diseno = diseno
+        self.diseno = d = DISENOS_TICKET[diseno]
+        self.fuente = d["fuente"]
+        self.tamano = d["tamano_texto"]
+        self.alto_linea = d["alto_linea"]
+        self.separador = self._separador()
+        self._columnas = self._compilar_columnas()
+        self._encabezado = self._compilar_encabezado(empresa)
+        self.alto_encabezado = d["margen"] + sum(alto for _, _, _, alto, _, _, _, salto in self._encabezado if salto)
+
+    def _separador(self):
+        d = self.diseno
+        guiones = d["guiones"]
+        if guiones is None:
+            ancho_guion = ancho_texto("-", d["fuente"], "", d["tamano_texto"])
+            guiones = int((d["ancho_util"] - 2 * _MARGEN_CELDA) / ancho_guion)
+        return "-" * guiones
+
+    def _compilar_columnas(self):
+        """Ancho, alineación y recorte de cada columna de la tabla de productos."""
+        return tuple(
+            {"ancho": ancho, "alineacion": alineacion, "recortar": recortar}
+            for _titulo, ancho, alineacion, recortar in self.diseno["columnas"]
+        )
+
+    def _compilar_encabezado(self, empresa):
+        """Celdas del encabezado: (estilo, tamaño, ancho, alto, texto, borde, alineación, salto de línea)."""
+        d = self.diseno
+        ancho, alto = d["ancho_util"], self.alto_linea
+        direccion = empresa.get('direccion', empresa.get('Direccion', 'No disponible'))
+
+        texto, _ = recortar_texto(str(empresa['nombre']), ancho, self.fuente, "B", d["tamano_titulo"])
+        celdas = [("B", d["tamano_titulo"], ancho, alto, texto, 0, 'C', True)]
+        for linea in (f"CUIT: {empresa['cuit']}", f"Dirección: {direccion}", self.separador):
+            texto, _ = recortar_texto(linea, ancho, self.fuente, "", self.tamano)
+            celdas.append(("", self.tamano, ancho, alto, texto, 0, 'C', True))
+        ultima = len(d["columnas"]) - 1
+        for i, (titulo, ancho_columna, alineacion, _recortar) in enumerate(d["columnas"]):
+            celdas.append(("B", self.tamano, ancho_columna, alto, titulo, d["bordes"], alineacion, i == ultima))
+        if d["separar_columnas"]:
+            celdas.append(("", self.tamano, ancho, alto, self.separador, 0, 'C', True))
+        return tuple(celdas)
+
+    def alto_ticket(self, cantidad_productos):
+        """Largo del papel para el diseño térmico (encabezado + ítems + totales + márgenes)."""
+        return self.alto_encabezado + (cantidad_productos + 4) * self.alto_linea + self.diseno["margen"]
+
+    def _nuevo_documento(self, alto):
+        from fpdf import FPDF  # Se carga recién al generar el primer ticket
+
+        d = self.diseno
+        pdf = FPDF(format=d["formato"] or (d["ancho_pagina"], alto))
+        pdf.set_margins(d["margen"], d["margen"])
+        pdf.set_auto_page_break(auto=bool(d["alto_pagina"]), margin=d["margen_salto"])
+        pdf.add_page()
+        return pdf
+
+    def _escribir_encabezado(self, pdf):
+        fuente_actual = None
+        for estilo, tamano, ancho, alto, texto, borde, alineacion, salto in self._encabezado:
+            if (estilo, tamano) != fuente_actual:
+                pdf.set_font(self.fuente, estilo, tamano)
+                fuente_actual = (estilo, tamano)
+            pdf.cell(ancho, alto, texto, border=borde, ln=1 if salto else 0, align=alineacion)
+
+    def _escribir_filas(self, pdf, productos):
+        """Una celda por columna, con el ancho y la alineación precalculados y el nombre ya recortado."""
+        alto = self.alto_linea
+        bordes = self.diseno["bordes"]
+        pdf.set_font(self.fuente, "", self.tamano)
+        for producto in productos:
+            valores = (
+                str(producto['cantidad']),
+                str(producto['nombre']),
+                f"${producto['precio_unitario']:.2f}",
+                f"${producto['total']:.2f}",
+            )
+            for columna, valor in zip(self._columnas, valores):
+                if columna["recortar"]:
+                    valor, _ = recortar_texto(valor, columna["ancho"] - 2 * _MARGEN_CELDA, self.fuente, "", self.tamano)
+                pdf.cell(columna["ancho"], alto, valor, border=bordes, align=columna["alineacion"])
+            pdf.ln(alto)
+
+    def construir(self, productos, subtotal, total, impuestos):
+        """Arma el documento FPDF de un ticket a partir de la plantilla."""
+        d = self.diseno
+        pdf = self._nuevo_documento(d["alto_pagina"] or self.alto_ticket(len(productos)))
+        self._escribir_encabezado(pdf)
+        self._escribir_filas(pdf, productos)
+
+        ancho, alto = d["ancho_util"], self.alto_linea
+        pdf.cell(ancho, alto, self.separador, ln=1, align='C')
+        pdf.set_font(self.fuente, "B", self.tamano)
+        pdf.cell(ancho, alto, f"Subtotal: ${subtotal:.2f}", ln=1, align='R')
+        pdf.cell(ancho, alto, f"Impuestos: ${impuestos:.2f}", ln=1, align='R')
+        pdf.cell(ancho, alto, f"Total: ${total:.2f}", ln=1, align='R')
+        return pdf
+
+@lru_cache(maxsize=32)
+def _plantilla(nombre, cuit, direccion, diseno):
+    return PlantillaTicket({"nombre": nombre, "cuit": cuit, "direccion": direccion}, diseno)
+
+def obtener_plantilla(empresa, diseno=TICKET_DISENO):
+    """Devuelve la plantilla compilada para la empresa y el diseño (se compila la primera vez)."""
+    direccion = empresa.get('direccion', empresa.get('Direccion', 'No disponible'))
+    return _plantilla(empresa['nombre'], empresa['cuit'], direccion, diseno)
+
+def limpiar_cache_plantillas():
+    """Descarta las plantillas compiladas (por ejemplo, si cambian los datos de la empresa)."""
+    _plantilla.cache_clear()
+    recortar_texto.cache_clear()
+
+def construir_ticket_pdf(empresa, productos, subtotal, total, impuestos, diseno=TICKET_DISENO):
+    """Arma el documento FPDF del ticket (sin guardarlo)."""
+    return obtener_plantilla(empresa, diseno).construir(productos, subtotal, total, impuestos)
+
+def guardar_ticket_pdf(ruta, empresa, productos, subtotal, total, impuestos, diseno=TICKET_DISENO):
+    """Genera el ticket y lo escribe en `ruta` de forma atómica (archivo temporal + rename)."""
+    pdf = construir_ticket_pdf(empresa, productos, subtotal, total, impuestos, diseno)
+    temporal = ruta + ".tmp"
+    pdf.output(temporal)
+    os.replace(temporal, ruta)
+    return ruta
+
+def generar_ticket_pdf(empresa, productos, subtotal, total, impuestos, diseno=TICKET_DISENO):
+    """Genera el ticket y pregunta dónde guardarlo (uso manual)."""
+    from tkinter import Tk, filedialog
+    import webbrowser
+
+    pdf = construir_ticket_pdf(empresa, productos, subtotal, total, impuestos, diseno)
+
     # Guardar el archivo
     Tk().withdraw()
     file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
@@ -39,12 +218,28 @@ def generar_ticket_pdf(empresa, productos, subtotal, total, impuestos):
         pdf.output(file_path)
         webbrowser.open(file_path)
 
-# Ejemplo de uso
-datos_empresa = {"nombre": "ORDICO", "cuit": "30-12345678-9", "Direccion": "Ruta 60, km 6"}
-productos = [{"nombre": "Arroz", "cantidad": 2, "precio_unitario": 150.0, "total": 300.0},
-    {"nombre": "Fideos", "cantidad": 1, "precio_unitario": 120.0, "total": 120.0}]
-subtotal = 420.0
-total = 508.2
-impuestos = 88.2
+def medir_tickets(cantidad=1000, items=8, diseno=TICKET_DISENO):
+    """Benchmark: milisegundos por ticket compilando la plantilla cada vez vs. usando la caché."""
+    empresa = {"nombre": "ORDICO", "cuit": "30-12345678-9", "direccion": "Calle Falsa 123"}
+    productos = [
+        {"nombre": f"Producto de prueba {i}", "cantidad": 2, "precio_unitario": 150.5, "total": 301.0}
+        for i in range(items)
+    ]
+
+    def medir(limpiar):
+        inicio = time.perf_counter()
+        for _ in range(cantidad):
+            if limpiar:
+                limpiar_cache_plantillas()
+            construir_ticket_pdf(empresa, productos, 100.0, 121.0, 21.0, diseno).output("", "S")
+        return (time.perf_counter() - inicio) / cantidad * 1000
+
+    medir(False)  # calienta fpdf y las métricas de fuente
+    return {"sin_cache_ms": medir(True), "con_cache_ms": medir(False)}
+
+if __name__ == "__main__":
+    import sys
 
-generar_ticket_pdf(datos_empresa, productos, subtotal, total, impuestos)
+    diseno = sys.argv[1] if len(sys.argv) > 1 else TICKET_DISENO
+    resultado = medir_tickets(diseno=diseno)
+    print(f"Ticket {diseno}: {resultado['sin_cache_ms']:.3f} ms sin caché, {resultado['con_cache_ms']:.3f} ms con plantilla en caché")
@@ -1,5 +1,6 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
-from core.auth import autenticar_usuario
+from core.auth import autenticar_usuario_async, espera_login
+from gui.tarea_fondo import TareaFondo
 from gui.register import RegistroDialog  
 from gui.recovery import RecuperarContrasenaDialog  
 import logging
@@ -69,8 +70,20 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Error", "Debe ingresar usuario/email y contraseña.")
             return
 
+        espera = espera_login(entrada)
+        if espera:
+            QMessageBox.warning(self, "Demasiados intentos", f"Demasiados intentos de inicio de sesión. Espere {espera:.0f} segundos.")
+            return
+
         logging.info(f"Intentando iniciar sesión con usuario/email: {entrada}")
-        usuario = autenticar_usuario(entrada, password)
+        # La verificación del hash corre en segundo plano para no congelar la ventana
+        self.login_button.setEnabled(False)
+        self.login_button.setText("Verificando...")
+        TareaFondo(autenticar_usuario_async(entrada, password), self, self.login_terminado, self.login_fallido)
+
+    def login_terminado(self, usuario):
+        self.login_button.setEnabled(True)
+        self.login_button.setText("Iniciar Sesión")
 
         if usuario:
             logging.info(f"✅ Inicio de sesión exitoso. Usuario: {usuario['username']}")
@@ -81,6 +94,12 @@ class LoginDialog(QDialog):
             logging.warning("❌ Nombre de usuario o contraseña incorrectos.")
             QMessageBox.warning(self, "Error", "Nombre de usuario o contraseña incorrectos.")
 
+    def login_fallido(self, mensaje):
+        self.login_button.setEnabled(True)
+        self.login_button.setText("Iniciar Sesión")
+        logging.error(f"❌ Error al verificar las credenciales: {mensaje}")
+        QMessageBox.warning(self, "Error", f"No se pudo verificar el inicio de sesión.\n{mensaje}")
+
     def open_register(self):
         self.registro_dialog = RegistroDialog()
         self.registro_dialog.exec_()
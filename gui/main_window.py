@@ -1,4 +1,3 @@
-import pandas as pd
 from PyQt5.QtWidgets import QFileDialog, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QAction, QMessageBox
 from PyQt5.QtCore import Qt
 import logging
@@ -108,6 +107,8 @@ class MainWindow(QMainWindow):
 
         if archivo:
             try:
+                import pandas as pd  # Solo se necesita para leer el Excel
+
                 logging.info(f"🔹 Importando archivo: {archivo}")
                 df = pd.read_excel(archivo)  # Leer archivo Excel
 
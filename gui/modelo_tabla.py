@@ -0,0 +1,357 @@
+from array import array
+from bisect import bisect_left
+from PyQt5.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex
+from utils.helpers import normalizar_texto
+
+# Tipos de columna: "i" entero, "d" decimal, "s" texto
+_TIPOS_ARRAY = {"i": "q", "d": "d"}
+
+class ModeloTablaColumnar(QAbstractTableModel):
+    """Modelo de tabla de solo lectura guardado por columnas (array para números, listas para texto).
+
+    Las celdas se arman recién cuando la vista las pide (solo las filas visibles) y el
+    ordenamiento se hace dentro del modelo con una permutación de índices, sin mover datos.
+    """
+
+    def __init__(self, columnas, parent=None):
+        """`columnas` es una lista de (encabezado, tipo)."""
+        super().__init__(parent)
+        self._encabezados = [encabezado for encabezado, _ in columnas]
+        self._tipos = [tipo for _, tipo in columnas]
+        self._columnas = self._columnas_vacias()
+        self._orden = array("q")  # posición en la vista -> posición en el almacenamiento
+        self._columna_orden = None
+        self._sentido_orden = Qt.AscendingOrder
+        self._claves = None  # claves de búsqueda por fila almacenada (se calculan al primer filtro)
+        self._fila_de_id = None  # id (primera columna) -> fila almacenada, para cambios incrementales
+        self._posicion_de = None  # fila almacenada -> posición visible
+
+    def _columnas_vacias(self):
+        return [array(_TIPOS_ARRAY[t]) if t in _TIPOS_ARRAY else [] for t in self._tipos]
+
+    def _columna_compacta(self, tipo, valores):
+        if tipo not in _TIPOS_ARRAY:
+            return ["" if v is None else str(v) for v in valores]
+        try:
+            return array(_TIPOS_ARRAY[tipo], valores)
+        except TypeError:  # None u otros valores sueltos
+            convertir = int if tipo == "i" else float
+            return array(_TIPOS_ARRAY[tipo], (convertir(v or 0) for v in valores))
+
+    # 🔹 Carga de datos
+
+    def cargar(self, filas):
+        """Reemplaza el contenido con `filas` (secuencia de tuplas en el orden de las columnas)."""
+        self.beginResetModel()
+        if filas:
+            self._columnas = [
+                self._columna_compacta(tipo, valores) for tipo, valores in zip(self._tipos, zip(*filas))
+            ]
+        else:
+            self._columnas = self._columnas_vacias()
+        self._orden = array("q", range(len(self._columnas[0])))
+        self._claves = None
+        self._fila_de_id = None
+        self._posicion_de = None
+        if self._columna_orden is not None:
+            self._ordenar_indices(self._columna_orden, self._sentido_orden)
+        self.endResetModel()
+
+    def aplicar_cambios(self, cambiadas, ids_eliminados):
+        """Aplica altas/modificaciones (filas completas, con el id en la primera columna) y bajas por id.
+
+        Solo se notifican a la vista las filas afectadas; no se recarga la tabla.
+        """
+        if self._fila_de_id is None:
+            self._fila_de_id = {id_fila: i for i, id_fila in enumerate(self._columnas[0])}
+        self._eliminar_ids(ids_eliminados)
+
+        nuevas = []
+        for fila in cambiadas:
+            i = self._fila_de_id.get(fila[0])
+            if i is None:
+                nuevas.append(fila)
+                continue
+            for columna, tipo, valor in zip(self._columnas, self._tipos, fila):
+                columna[i] = self._valor_compacto(tipo, valor)
+            if self._claves is not None:
+                self._claves[i] = self._clave_de_fila(i)
+            posicion = self._posiciones()[i]
+            self.dataChanged.emit(self.index(posicion, 0), self.index(posicion, self.columnCount() - 1))
+
+        if nuevas:
+            # Las altas se agregan al final de la vista, como en una planilla
+            inicio = len(self._orden)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(nuevas) - 1)
+            for fila in nuevas:
+                i = len(self._columnas[0])
+                for columna, tipo, valor in zip(self._columnas, self._tipos, fila):
+                    columna.append(self._valor_compacto(tipo, valor))
+                self._fila_de_id[fila[0]] = i
+                self._orden.append(i)
+                if self._posicion_de is not None:
+                    self._posicion_de.append(len(self._orden) - 1)
+                if self._claves is not None:
+                    self._claves.append(self._clave_de_fila(i))
+            self.endInsertRows()
+
+    def _eliminar_ids(self, ids_eliminados):
+        # La fila almacenada queda huérfana (sin posición visible) hasta la próxima carga completa
+        for id_fila in ids_eliminados:
+            i = self._fila_de_id.pop(id_fila, None)
+            if i is None:
+                continue
+            posicion = self._posiciones()[i]
+            self.beginRemoveRows(QModelIndex(), posicion, posicion)
+            del self._orden[posicion]
+            self._posicion_de = None
+            self.endRemoveRows()
+
+    def _posiciones(self):
+        if self._posicion_de is None:
+            self._posicion_de = array("q", bytes(8 * len(self._columnas[0])))
+            for posicion, i in enumerate(self._orden):
+                self._posicion_de[i] = posicion
+        return self._posicion_de
+
+    def _valor_compacto(self, tipo, valor):
+        if tipo == "i":
+            return int(valor or 0)
+        if tipo == "d":
+            return float(valor or 0)
+        return "" if valor is None else str(valor)
+
+    def _clave_de_fila(self, i):
+        return "\x1f".join(
+            self._textos_busqueda(tipo, [columna[i]])[0] for tipo, columna in zip(self._tipos, self._columnas)
+        )
+
+    def fila(self, posicion):
+        """Devuelve la fila visible `posicion` como tupla de valores."""
+        i = self._orden[posicion]
+        return tuple(columna[i] for columna in self._columnas)
+
+    def valor(self, posicion, columna):
+        """Devuelve el valor de una celda visible."""
+        return self._columnas[columna][self._orden[posicion]]
+
+    def claves_busqueda(self):
+        """Devuelve, en el orden visible, el texto de cada fila en minúsculas y sin acentos."""
+        if self._claves is None:
+            textos = [self._textos_busqueda(tipo, columna) for tipo, columna in zip(self._tipos, self._columnas)]
+            self._claves = list(map("\x1f".join, zip(*textos)))
+        return [self._claves[i] for i in self._orden]
+
+    @staticmethod
+    def _textos_busqueda(tipo, columna):
+        if tipo == "i":
+            return list(map(str, columna))
+        if tipo == "d":
+            return list(map("{:.2f}".format, columna))
+        # Se normaliza la columna entera de una vez: una sola llamada a unicodedata
+        unida = "\x1e".join(columna)
+        unida = unida.lower() if unida.isascii() else normalizar_texto(unida)
+        return unida.split("\x1e") if columna else []
+
+    # 🔹 Interfaz de QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._orden)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._encabezados)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tipo = self._tipos[index.column()]
+        if role == Qt.DisplayRole:
+            valor = self._columnas[index.column()][self._orden[index.row()]]
+            return f"{valor:.2f}" if tipo == "d" else str(valor)
+        if role == Qt.TextAlignmentRole and tipo in _TIPOS_ARRAY:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientacion == Qt.Horizontal:
+            return self._encabezados[seccion]
+        return str(seccion + 1)
+
+    def sort(self, columna, sentido=Qt.AscendingOrder):
+        """Ordena reordenando solo la permutación de índices (lo llama la vista al tocar el encabezado)."""
+        self.layoutAboutToBeChanged.emit()
+        persistentes = self.persistentIndexList()
+        almacenadas = [self._orden[indice.row()] for indice in persistentes]
+
+        self._ordenar_indices(columna, sentido)
+
+        if persistentes:
+            posicion_de = self._posiciones()
+            self.changePersistentIndexList(
+                persistentes,
+                [self.index(posicion_de[i], indice.column()) for i, indice in zip(almacenadas, persistentes)],
+            )
+        self.layoutChanged.emit()
+
+    def _ordenar_indices(self, columna, sentido):
+        self._posicion_de = None
+        self._columna_orden = columna
+        self._sentido_orden = sentido
+        valores = self._columnas[columna]
+        if self._tipos[columna] not in _TIPOS_ARRAY:
+            valores = [v.casefold() for v in valores]
+        # Se ordenan solo las filas visibles (las dadas de baja ya no están en _orden)
+        self._orden = array(
+            "q", sorted(self._orden, key=valores.__getitem__, reverse=sentido == Qt.DescendingOrder)
+        )
+
+
+class FiltroIncremental:
+    """Filtro de texto sobre claves precalculadas que reutiliza el resultado anterior.
+
+    Si el texto nuevo extiende al anterior ("lec" -> "lech"), solo se revisan las filas
+    que ya coincidían; al borrar caracteres se recupera el resultado guardado.
+    """
+
+    def __init__(self):
+        self._claves = []
+        self._historial = []  # [(texto, posiciones)] de los textos escritos hasta ahora
+
+    def cargar(self, claves):
+        self._claves = claves
+        self._historial = []
+
+    def filtrar(self, texto):
+        """Devuelve las posiciones (ordenadas) que contienen todas las palabras, o None si no hay filtro."""
+        texto = normalizar_texto(texto).strip()
+        if not texto:
+            self._historial = []
+            return None
+        palabras = texto.split()
+
+        while self._historial and not self._extiende(texto, self._historial[-1][0]):
+            self._historial.pop()
+        if self._historial and self._historial[-1][0] == texto:
+            return self._historial[-1][1]
+
+        claves = self._claves
+        candidatas = self._historial[-1][1] if self._historial else range(len(claves))
+        posiciones = candidatas
+        for palabra in palabras:  # cada palabra achica el conjunto que revisa la siguiente
+            posiciones = [i for i in posiciones if palabra in claves[i]]
+        self._historial.append((texto, posiciones))
+        return posiciones
+
+    @staticmethod
+    def _extiende(texto, anterior):
+        # Toda fila que contiene el texto extendido contiene las palabras del anterior
+        return texto.startswith(anterior)
+
+
+class ModeloFiltroRapido(QAbstractProxyModel):
+    """Proxy que muestra solo las filas del modelo columnar que pasan el FiltroIncremental."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filtro = FiltroIncremental()
+        self._claves_al_dia = False
+        self._texto = ""
+        self._filas = None  # posiciones de la fuente visibles (None = todas)
+
+    def setSourceModel(self, fuente):
+        super().setSourceModel(fuente)
+        fuente.modelReset.connect(self._fuente_cambiada)
+        fuente.layoutChanged.connect(self._fuente_cambiada)
+        fuente.dataChanged.connect(self._datos_cambiados)
+        # Altas y bajas incrementales: el proxy se reinicia alrededor del cambio de la fuente
+        fuente.rowsAboutToBeInserted.connect(self.beginResetModel)
+        fuente.rowsAboutToBeRemoved.connect(self.beginResetModel)
+        fuente.rowsInserted.connect(self._filas_fuente_cambiadas)
+        fuente.rowsRemoved.connect(self._filas_fuente_cambiadas)
+        self._fuente_cambiada()
+
+    def filtrar(self, texto):
+        """Aplica el texto de búsqueda sobre todas las columnas."""
+        self.beginResetModel()
+        self._texto = texto
+        self._aplicar_filtro()
+        self.endResetModel()
+
+    def _aplicar_filtro(self):
+        if not self._texto.strip():
+            self._filas = None
+            return
+        if not self._claves_al_dia:
+            # Las claves se calculan una vez por carga u orden, no en cada tecla
+            self._filtro.cargar(self.sourceModel().claves_busqueda())
+            self._claves_al_dia = True
+        self._filas = self._filtro.filtrar(self._texto)
+
+    def _fuente_cambiada(self):
+        # Cambió el contenido o el orden de la fuente: hay que recalcular claves y filtro
+        self.beginResetModel()
+        self._claves_al_dia = False
+        self._aplicar_filtro()
+        self.endResetModel()
+
+    def _filas_fuente_cambiadas(self):
+        self._claves_al_dia = False
+        self._aplicar_filtro()
+        self.endResetModel()
+
+    def _datos_cambiados(self, arriba, abajo, roles=()):
+        self._claves_al_dia = False  # el próximo filtro usa los datos nuevos
+        if self._filas is None:
+            self.dataChanged.emit(self.mapFromSource(arriba), self.mapFromSource(abajo), roles)
+        elif self._filas:
+            # Con filtro el rango de la fuente no es contiguo acá: la vista solo repinta lo visible
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._filas) - 1, self.columnCount() - 1), roles)
+
+    # 🔹 Interfaz de QAbstractProxyModel
+
+    def mapToSource(self, indice_proxy):
+        if not indice_proxy.isValid():
+            return QModelIndex()
+        fila = indice_proxy.row() if self._filas is None else self._filas[indice_proxy.row()]
+        return self.sourceModel().index(fila, indice_proxy.column())
+
+    def mapFromSource(self, indice_fuente):
+        if not indice_fuente.isValid():
+            return QModelIndex()
+        fila = indice_fuente.row()
+        if self._filas is not None:
+            posicion = bisect_left(self._filas, fila)
+            if posicion == len(self._filas) or self._filas[posicion] != fila:
+                return QModelIndex()
+            fila = posicion
+        return self.index(fila, indice_fuente.column())
+
+    def index(self, fila, columna, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= fila < self.rowCount() and 0 <= columna < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(fila, columna)
+
+    def parent(self, indice=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._filas is None else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if orientacion == Qt.Horizontal:
+            return self.sourceModel().headerData(seccion, orientacion, role)
+        if role == Qt.DisplayRole:
+            return str(seccion + 1)
+        return None
+
+    def sort(self, columna, sentido=Qt.AscendingOrder):
+        self.sourceModel().sort(columna, sentido)
@@ -0,0 +1,155 @@
+"""Regenera en lote los tickets de las ventas de un rango de fechas (auditorías, reimpresiones).
+
+Uso:
+    python -m gui.regenerar_tickets --desde 2024-05-01 --hasta 2024-05-31 [--backend pdf] [--procesos 4]
+
+Los tickets quedan en <salida>/AAAA/MM/DD/ y cada uno terminado se anota en <salida>/manifiesto.jsonl;
+si la corrida se interrumpe, al repetirla se saltean los que ya figuran en el manifiesto.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from utils.config import TICKETS_DIR, TICKET_BACKEND, DATOS_EMPRESA, TASA_IMPUESTOS
+from core.database import inicializar_db, obtener_ventas_por_fecha
+from gui.backends_ticket import obtener_backend, guardar_ticket
+
+SALIDA_POR_DEFECTO = os.path.join(TICKETS_DIR, "regenerados")
+MANIFIESTO = "manifiesto.jsonl"
+
+def agrupar_ventas(filas):
+    """Agrupa los renglones de obtener_ventas_por_fecha() en ventas, una por ticket.
+
+    Las ventas sin número de ticket (anteriores a los tickets) se agrupan por usuario y fecha.
+    """
+    ventas = {}
+    for ticket, venta_id, usuario_id, fecha, producto_id, nombre, cantidad, precio in filas:
+        clave = f"ticket_{ticket:08d}" if ticket is not None else f"venta_{usuario_id}_{fecha.replace(' ', '_').replace(':', '')}"
+        venta = ventas.get(clave)
+        if venta is None:
+            venta = ventas[clave] = {"clave": clave, "ticket": ticket, "fecha": fecha, "usuario_id": usuario_id, "productos": []}
+        venta["productos"].append({
+            "nombre": nombre,
+            "cantidad": cantidad,
+            "precio_unitario": precio,
+            "total": cantidad * precio,
+        })
+    for venta in ventas.values():
+        venta["subtotal"] = sum(p["total"] for p in venta["productos"])
+        venta["impuestos"] = venta["subtotal"] * TASA_IMPUESTOS
+        venta["total"] = venta["subtotal"] + venta["impuestos"]
+    return list(ventas.values())
+
+def ruta_relativa(venta, extension):
+    """Árbol por fecha: AAAA/MM/DD/<clave><extension>."""
+    anio, mes, dia = venta["fecha"][:10].split("-")
+    return os.path.join(anio, mes, dia, venta["clave"] + extension)
+
+def leer_manifiesto(salida):
+    """Claves de los tickets ya generados en una corrida anterior (cuyo archivo sigue existiendo)."""
+    hechos = set()
+    ruta = os.path.join(salida, MANIFIESTO)
+    if not os.path.exists(ruta):
+        return hechos
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            try:
+                entrada = json.loads(linea)
+            except json.JSONDecodeError:
+                continue  # última línea a medio escribir si la corrida se cortó
+            if os.path.exists(os.path.join(salida, entrada["archivo"])):
+                hechos.add(entrada["clave"])
+    return hechos
+
+_backends = {}
+
+def _renderizar(trabajo):
+    """Trabajo de cada proceso: renderiza un ticket, lo guarda y devuelve su entrada del manifiesto."""
+    venta, salida, nombre_backend = trabajo
+    backend = _backends.get(nombre_backend)
+    if backend is None:
+        backend = _backends[nombre_backend] = obtener_backend(nombre_backend)
+    try:
+        datos = backend.renderizar(DATOS_EMPRESA, venta["productos"], venta["subtotal"], venta["total"], venta["impuestos"])
+        relativa = ruta_relativa(venta, backend.extension)
+        destino = os.path.join(salida, relativa)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        guardar_ticket(destino, datos)
+    except Exception as e:  # un ticket fallido no corta el lote
+        return {"clave": venta["clave"], "error": str(e)}
+    return {
+        "clave": venta["clave"],
+        "ticket": venta["ticket"],
+        "fecha": venta["fecha"],
+        "archivo": relativa,
+        "bytes": len(datos),
+        "sha256": hashlib.sha256(datos).hexdigest(),
+    }
+
+def regenerar_tickets(desde, hasta, salida=SALIDA_POR_DEFECTO, backend=TICKET_BACKEND, procesos=None, progreso=None):
+    """Regenera los tickets de las ventas entre `desde` y `hasta` en paralelo.
+
+    `progreso(hechos, total)` se llama cada vez que termina un ticket. Devuelve un resumen con
+    total, generados, salteados, errores, segundos y tickets_por_segundo.
+    """
+    obtener_backend(backend)  # valida el nombre antes de lanzar los procesos
+    ventas = agrupar_ventas(obtener_ventas_por_fecha(desde, hasta))
+    os.makedirs(salida, exist_ok=True)
+    hechos = leer_manifiesto(salida)
+    pendientes = [v for v in ventas if v["clave"] not in hechos]
+    resumen = {
+        "total": len(ventas), "generados": 0, "salteados": len(ventas) - len(pendientes), "errores": 0,
+        "segundos": 0.0, "tickets_por_segundo": 0.0,
+    }
+    logging.info(f"🧾 {len(ventas)} ventas entre {desde} y {hasta}: {len(pendientes)} tickets pendientes, {resumen['salteados']} ya generados.")
+
+    inicio = time.perf_counter()
+    procesos = procesos or os.cpu_count() or 1
+    trabajos = [(venta, salida, backend) for venta in pendientes]
+    with open(os.path.join(salida, MANIFIESTO), "a", encoding="utf-8") as manifiesto, \
+            ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        try:
+            # Lotes grandes para que el envío entre procesos no pese más que el renderizado
+            lote = max(1, min(64, len(trabajos) // (procesos * 4) or 1))
+            for entrada in ejecutor.map(_renderizar, trabajos, chunksize=lote):
+                if "error" in entrada:
+                    resumen["errores"] += 1
+                    logging.error(f"❌ Error al regenerar {entrada['clave']}: {entrada['error']}")
+                    continue
+                manifiesto.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+                manifiesto.flush()
+                resumen["generados"] += 1
+                if progreso:
+                    progreso(resumen["generados"] + resumen["salteados"], resumen["total"])
+        except KeyboardInterrupt:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+            logging.warning(f"⚠️ Regeneración interrumpida: {resumen['generados']} tickets nuevos guardados; se puede retomar.")
+            raise
+
+    resumen["segundos"] = time.perf_counter() - inicio
+    if resumen["segundos"] > 0:
+        resumen["tickets_por_segundo"] = resumen["generados"] / resumen["segundos"]
+    logging.info(
+        f"✅ Tickets regenerados: {resumen['generados']} nuevos, {resumen['salteados']} salteados en "
+        f"{resumen['segundos']:.2f} s ({resumen['tickets_por_segundo']:.0f} tickets/s) → {salida}"
+    )
+    return resumen
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Regenera los tickets de las ventas de un rango de fechas.")
+    parser.add_argument("--desde", required=True, help="fecha inicial (AAAA-MM-DD)")
+    parser.add_argument("--hasta", help="fecha final inclusive (AAAA-MM-DD); por defecto, igual a --desde")
+    parser.add_argument("--salida", default=SALIDA_POR_DEFECTO, help="carpeta de destino")
+    parser.add_argument("--backend", default=TICKET_BACKEND, help="pdf, texto o escpos")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos en paralelo (por defecto, uno por CPU)")
+    args = parser.parse_args(argumentos)
+
+    inicializar_db()
+    resumen = regenerar_tickets(args.desde, args.hasta or args.desde, args.salida, args.backend, args.procesos)
+    return 1 if resumen["errores"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
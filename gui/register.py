@@ -1,5 +1,6 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
-from core.auth import registrar_usuario
+from core.auth import registrar_usuario_async
+from gui.tarea_fondo import TareaFondo
 
 class RegistroDialog(QDialog):
     """Ventana de registro de usuarios con validación y diseño optimizado."""
@@ -66,11 +67,17 @@ class RegistroDialog(QDialog):
             QMessageBox.warning(self, "Error", "Todos los campos son obligatorios.")
             return
 
-        mensaje = registrar_usuario(username, password, email, dni, "usuario")
+        # El hash de la contraseña se calcula en segundo plano
+        self.register_button.setEnabled(False)
+        TareaFondo(registrar_usuario_async(username, password, email, dni, "usuario"), self, self.registro_terminado, self.registro_fallido)
 
-        if "exitosamente" in mensaje:
-            QMessageBox.information(self, "Éxito", mensaje)
-            self.accept()
-        else:
-            QMessageBox.warning(self, "Error", mensaje)
+    def registro_terminado(self, mensaje):
+        self.register_button.setEnabled(True)
+        QMessageBox.information(self, "Éxito", mensaje)
+        self.accept()
+
+    def registro_fallido(self, mensaje):
+        # Usuario repetido (UsuarioExistente) o error inesperado al registrar
+        self.register_button.setEnabled(True)
+        QMessageBox.warning(self, "Error", mensaje)
 
@@ -0,0 +1,89 @@
+import os
+import queue
+import logging
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from utils.config import TICKETS_DIR, TICKET_DISPOSITIVO
+from gui.backends_ticket import obtener_backend, guardar_ticket, enviar_a_dispositivo
+
+class ServicioTickets(QObject):
+    """Genera los tickets en un hilo de fondo para que la caja no espere al renderizado.
+
+    Los trabajos se encolan con encolar(); al terminar cada uno se emite ticket_listo
+    (o ticket_error), que Qt entrega en el hilo de la interfaz. Los tickets se guardan en
+    `directorio`, o se mandan a `dispositivo` (impresora local o carpeta de spool) si se indica.
+    """
+
+    ticket_listo = pyqtSignal(int, str)    # número de ticket, ruta del archivo
+    ticket_error = pyqtSignal(int, str)    # número de ticket, mensaje
+
+    def __init__(self, directorio=TICKETS_DIR, dispositivo=TICKET_DISPOSITIVO, parent=None):
+        super().__init__(parent)
+        self.directorio = directorio
+        self.dispositivo = dispositivo
+        os.makedirs(self.directorio, exist_ok=True)
+        self._backends = {}
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._trabajar, name="tickets", daemon=True)
+        self._hilo.start()
+
+    def ruta_ticket(self, numero, extension=".pdf", directorio=None):
+        """Nombre determinístico: el mismo ticket siempre va al mismo archivo."""
+        return os.path.join(directorio or self.directorio, f"ticket_{numero:08d}{extension}")
+
+    def encolar(self, numero, empresa, productos, subtotal, total, impuestos, backend=None):
+        """Agrega un ticket a la cola y vuelve enseguida (`backend`: "pdf", "texto", "escpos")."""
+        self._cola.put((numero, empresa, productos, subtotal, total, impuestos, backend))
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def detener(self, esperar=True):
+        """Termina el hilo después de procesar los tickets ya encolados."""
+        self._cola.put(None)
+        if esperar:
+            self._hilo.join()
+
+    def _trabajar(self):
+        while True:
+            trabajo = self._cola.get()
+            if trabajo is None:
+                break
+            numero, empresa, productos, subtotal, total, impuestos, nombre_backend = trabajo
+            try:
+                ruta = self._emitir(numero, empresa, productos, subtotal, total, impuestos, nombre_backend)
+                logging.info(f"🧾 Ticket {numero} guardado en {ruta}")
+                self.ticket_listo.emit(numero, ruta)
+            except Exception as e:
+                logging.error(f"❌ Error al generar el ticket {numero}: {e}")
+                self.ticket_error.emit(numero, str(e))
+
+    def _backend(self, nombre):
+        if nombre not in self._backends:
+            self._backends[nombre] = obtener_backend(nombre) if nombre else obtener_backend()
+        return self._backends[nombre]
+
+    def _emitir(self, numero, empresa, productos, subtotal, total, impuestos, nombre_backend):
+        backend = self._backend(nombre_backend)
+        datos = backend.renderizar(empresa, productos, subtotal, total, impuestos)
+        if not self.dispositivo:
+            return guardar_ticket(self.ruta_ticket(numero, backend.extension), datos)
+        if os.path.isdir(self.dispositivo):
+            return guardar_ticket(self.ruta_ticket(numero, backend.extension, self.dispositivo), datos)
+        return enviar_a_dispositivo(self.dispositivo, datos)
+
+_servicio = None
+
+def obtener_servicio_tickets():
+    """Devuelve el servicio de tickets de la aplicación (se crea la primera vez)."""
+    global _servicio
+    if _servicio is None:
+        _servicio = ServicioTickets()
+    return _servicio
+
+def detener_servicio_tickets():
+    """Espera a que se terminen de generar los tickets pendientes (al cerrar la aplicación)."""
+    global _servicio
+    if _servicio is not None:
+        _servicio.detener()
+        _servicio = None
@@ -1,9 +1,11 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QLineEdit, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox, QLabel
-from core.database import obtener_productos, agregar_producto, actualizar_producto, inicializar_db, importar_desde_excel
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QLineEdit, QHeaderView, QFileDialog, QMessageBox, QLabel, QProgressDialog, QApplication, QAbstractItemView
+from PyQt5.QtCore import Qt, QTimer
+from core.database import obtener_productos, obtener_revision_productos, productos_modificados_desde, importar_desde_excel
 from core.database import eliminar_producto as eliminar_producto_db  # Renombramos solo eliminar_producto
 from .agregar_producto_dialog import AgregarProductoDialog
+from .modelo_tabla import ModeloTablaColumnar, ModeloFiltroRapido
+from utils.config import STOCK_BAJO
 import logging
-import pandas as pd
 
 class StockWindow(QWidget):
     """Ventana para la gestión del stock de productos."""
@@ -12,6 +14,7 @@ class StockWindow(QWidget):
         super().__init__()
         self.usuario_actual = usuario_actual
         self.usuario_es_admin = self.usuario_actual.get("rol") == "admin"
+        self.revision_stock = 0  # Revisión del catálogo que muestra la tabla
         self.init_ui()
 
     def init_ui(self):
@@ -26,67 +29,123 @@ class StockWindow(QWidget):
         self.campo_busqueda = QLineEdit()
         self.campo_busqueda.setPlaceholderText("Buscar producto...")
         layout.addWidget(self.campo_busqueda)
-        self.campo_busqueda.textChanged.connect(self.filtrar_productos)
+        # Debounce: se filtra cuando el usuario deja de tipear un instante
+        self.temporizador_busqueda = QTimer(self)
+        self.temporizador_busqueda.setSingleShot(True)
+        self.temporizador_busqueda.setInterval(150)
+        self.temporizador_busqueda.timeout.connect(self.filtrar_productos)
+        self.campo_busqueda.textChanged.connect(self.temporizador_busqueda.start)
 
-        self.tabla_stock = QTableWidget()
-        self.tabla_stock.setColumnCount(6)
-        self.tabla_stock.setHorizontalHeaderLabels(["ID", "Nombre", "Marca", "Cantidad", "Precio", "Categoría"])
-        self.tabla_stock.setSortingEnabled(True)
+        self.modelo_stock = ModeloTablaColumnar([
+            ("ID", "i"), ("Nombre", "s"), ("Marca", "s"), ("Cantidad", "i"), ("Precio", "d"), ("Categoría", "s")
+        ], self)
+        self.filtro_stock = ModeloFiltroRapido(self)
+        self.filtro_stock.setSourceModel(self.modelo_stock)
+        self.tabla_stock = QTableView()
+        self.tabla_stock.setModel(self.filtro_stock)
+        self.tabla_stock.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla_stock.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tabla_stock.setSortingEnabled(True)  # El modelo ordena internamente
         self.tabla_stock.horizontalHeader().setStretchLastSection(True)
         self.tabla_stock.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.tabla_stock.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tabla_stock.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # ResizeToContents mediría todas las filas
         layout.addWidget(self.tabla_stock)
 
+        # Productos a reponer según la velocidad de venta (los calcula el motor de reposición en segundo plano)
+        self.label_reposicion = QLabel("Productos a reponer")
+        layout.addWidget(self.label_reposicion)
+        self.modelo_reposicion = ModeloTablaColumnar([
+            ("ID", "i"), ("Nombre", "s"), ("Marca", "s"), ("Stock", "i"), ("Venta diaria", "d"),
+            ("Días de cobertura", "d"), ("Punto de pedido", "d"), ("Pedido sugerido", "i")
+        ], self)
+        self.tabla_reposicion = QTableView()
+        self.tabla_reposicion.setModel(self.modelo_reposicion)
+        self.tabla_reposicion.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla_reposicion.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tabla_reposicion.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabla_reposicion.setMaximumHeight(200)
+        layout.addWidget(self.tabla_reposicion)
+        self.version_reposicion = -1
+        self.temporizador_reposicion = QTimer(self)
+        self.temporizador_reposicion.setInterval(5000)
+        self.temporizador_reposicion.timeout.connect(self.cargar_reposicion)
+        self.temporizador_reposicion.start()
+
         botones_layout = QHBoxLayout()
         self.btn_actualizar = QPushButton("Actualizar Stock")
         self.btn_agregar = QPushButton("Agregar Producto")
         self.btn_editar = QPushButton("Editar Producto")
         self.btn_eliminar = QPushButton("Eliminar Producto")
         self.btn_importar = QPushButton("Importar desde Excel")
+        self.btn_exportar = QPushButton("Exportar Stock")
 
-        for btn in [self.btn_actualizar, self.btn_agregar, self.btn_editar, self.btn_eliminar, self.btn_importar]:
+        for btn in [self.btn_actualizar, self.btn_agregar, self.btn_editar, self.btn_eliminar, self.btn_importar, self.btn_exportar]:
             btn.setFixedSize(200, 40)
             botones_layout.addWidget(btn)
 
         layout.addLayout(botones_layout)
 
-        self.btn_actualizar.clicked.connect(self.cargar_stock)
+        self.btn_actualizar.clicked.connect(self.refrescar_stock)
         self.btn_agregar.clicked.connect(self.agregar_producto)
         self.btn_editar.clicked.connect(self.editar_producto)
         self.btn_eliminar.clicked.connect(self.eliminar_producto)
         self.btn_importar.clicked.connect(self.importar_desde_excel)
+        self.btn_exportar.clicked.connect(self.exportar_stock)
 
         self.setLayout(layout)
         self.cargar_stock()
+        self.cargar_reposicion()
 
     def cargar_stock(self):
         """Carga los productos en la tabla desde la base de datos."""
         try:
+            # La revisión se lee antes: un cambio concurrente se vuelve a aplicar en el próximo refresco
+            revision = obtener_revision_productos()
             productos = obtener_productos() or []
-            self.tabla_stock.setRowCount(len(productos))
-
-            for i, producto in enumerate(productos):
-                id_producto, nombre, marca, cantidad, precio, categoria = producto  
-                self.tabla_stock.setItem(i, 0, QTableWidgetItem(str(id_producto)))
-                self.tabla_stock.setItem(i, 1, QTableWidgetItem(nombre))
-                self.tabla_stock.setItem(i, 2, QTableWidgetItem(marca))  
-                self.tabla_stock.setItem(i, 3, QTableWidgetItem(str(cantidad)))
-                self.tabla_stock.setItem(i, 4, QTableWidgetItem(str(precio)))
-                self.tabla_stock.setItem(i, 5, QTableWidgetItem(categoria))
+            self.modelo_stock.cargar(productos)
+            self.revision_stock = revision
 
         except Exception as e:
             logging.error(f"❌ Error al cargar stock: {e}")
             QMessageBox.critical(self, "Error", f"No se pudo cargar el stock: {e}")
 
+    def cargar_reposicion(self):
+        """Muestra la última lista publicada por el motor de reposición (solo si cambió)."""
+        from core.reposicion import obtener_motor_reposicion  # NumPy se carga recién aquí
+
+        motor = obtener_motor_reposicion()
+        if motor.version == self.version_reposicion:
+            return
+        self.version_reposicion = motor.version
+        alertas = motor.alertas()
+        self.modelo_reposicion.cargar(alertas)
+        if motor.total_alertas > len(alertas):
+            self.label_reposicion.setText(f"Productos a reponer ({len(alertas)} más urgentes de {motor.total_alertas})")
+        else:
+            self.label_reposicion.setText(f"Productos a reponer ({len(alertas)})")
+
+    def refrescar_stock(self):
+        """Aplica a la tabla solo los productos que cambiaron desde la última carga."""
+        revision, cambiados, eliminados = productos_modificados_desde(self.revision_stock)
+        if revision == self.revision_stock:
+            return
+        # Si cambió gran parte del catálogo (p. ej. una importación) conviene recargar todo
+        if len(cambiados) + len(eliminados) > max(1000, self.modelo_stock.rowCount() // 5):
+            self.cargar_stock()
+            return
+        self.modelo_stock.aplicar_cambios(cambiados, eliminados)
+        self.revision_stock = revision
+
     def filtrar_productos(self):
         """Filtra los productos en la tabla según el texto ingresado."""
-        texto = self.campo_busqueda.text().lower()
-        for fila in range(self.tabla_stock.rowCount()):
-            visible = any(
-                texto in self.tabla_stock.item(fila, col).text().lower() if self.tabla_stock.item(fila, col) else False
-                for col in range(self.tabla_stock.columnCount())
-            )
-            self.tabla_stock.setRowHidden(fila, not visible)
+        self.filtro_stock.filtrar(self.campo_busqueda.text())
+
+    def producto_seleccionado(self):
+        """Devuelve la fila seleccionada (id, nombre, marca, cantidad, precio, categoria) o None."""
+        indice = self.filtro_stock.mapToSource(self.tabla_stock.currentIndex())
+        if not indice.isValid():
+            return None
+        return self.modelo_stock.fila(indice.row())
 
     def agregar_producto(self):
         """Abre el diálogo para agregar un nuevo producto."""
@@ -96,7 +155,7 @@ class StockWindow(QWidget):
 
         dialogo = AgregarProductoDialog()
         if dialogo.exec_():
-            self.cargar_stock()
+            self.refrescar_stock()
 
     def editar_producto(self):
         """Edita un producto existente en la base de datos."""
@@ -104,33 +163,16 @@ class StockWindow(QWidget):
             QMessageBox.warning(self, "Acceso Denegado", "Solo los administradores pueden editar productos.")
             return
 
-        fila_seleccionada = self.tabla_stock.currentRow()
-        if fila_seleccionada < 0:
+        producto = self.producto_seleccionado()
+        if producto is None:
             QMessageBox.warning(self, "Error", "Por favor, seleccione un producto para editar.")
             return
 
-        id_producto = self.tabla_stock.item(fila_seleccionada, 0)
-        if id_producto is None:
-            QMessageBox.warning(self, "Error", "Producto no válido.")
-            return
-
-        id_producto = id_producto.text()
-        nombre = self.tabla_stock.item(fila_seleccionada, 1).text()
-        marca = self.tabla_stock.item(fila_seleccionada, 2).text()
-        cantidad = self.tabla_stock.item(fila_seleccionada, 3).text()
-        precio = self.tabla_stock.item(fila_seleccionada, 4).text()
-        categoria = self.tabla_stock.item(fila_seleccionada, 5).text()
-
-        dialogo = AgregarProductoDialog()
-        dialogo.input_nombre.setText(nombre)
-        dialogo.input_marca.setText(marca)
-        dialogo.input_cantidad.setText(cantidad)
-        dialogo.input_precio.setText(precio)
-        dialogo.input_categoria.setCurrentText(categoria)
+        id_producto, nombre, marca, cantidad, precio, categoria = producto
 
-        if dialogo.exec_():
-            actualizar_producto(id_producto, nombre, marca, cantidad, precio, categoria)  # ✅ ACTUALIZA el producto
-            self.cargar_stock()
+        dialogo = AgregarProductoDialog(nombre, marca, cantidad, precio, categoria, id_producto=id_producto)
+        if dialogo.exec_():  # ✅ El diálogo guarda los cambios del producto
+            self.refrescar_stock()
 
     def eliminar_producto(self):
         """Elimina un producto del stock."""
@@ -138,17 +180,12 @@ class StockWindow(QWidget):
             QMessageBox.warning(self, "Acceso Denegado", "Solo los administradores pueden eliminar productos.")
             return
 
-        fila_seleccionada = self.tabla_stock.currentRow()
-        if fila_seleccionada < 0:
+        producto = self.producto_seleccionado()
+        if producto is None:
             QMessageBox.warning(self, "Error", "Por favor, seleccione un producto para eliminar.")
             return
 
-        item_id = self.tabla_stock.item(fila_seleccionada, 0)
-        if item_id is None:
-            QMessageBox.warning(self, "Error", "Producto no válido.")
-            return
-
-        id_producto = item_id.text()
+        id_producto = producto[0]
         confirmacion = QMessageBox.question(
             self, "Eliminar Producto", f"¿Seguro que quieres eliminar el producto ID {id_producto}?",
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
@@ -157,7 +194,7 @@ class StockWindow(QWidget):
         if confirmacion == QMessageBox.Yes:
             if eliminar_producto_db(id_producto):
                 QMessageBox.information(self, "Éxito", "Producto eliminado correctamente.")
-                self.cargar_stock()
+                self.refrescar_stock()
             else:
                 QMessageBox.warning(self, "Error", "No se pudo eliminar el producto.")
 
@@ -169,11 +206,86 @@ class StockWindow(QWidget):
 
         archivo, _ = QFileDialog.getOpenFileName(self, "Seleccionar Archivo", "", "Archivos Excel (*.xlsx)")
         if archivo:
-            if importar_desde_excel(archivo):
-                QMessageBox.information(self, "Éxito", "Productos importados correctamente.")
-                self.cargar_stock()
+            respuesta = QMessageBox.question(
+                self, "Importar desde Excel",
+                "¿Sincronizar con el stock actual?\n\n"
+                "Sí: actualiza los productos existentes (por nombre y marca) y agrega los nuevos.\n"
+                "No: agrega todas las filas como productos nuevos.",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if respuesta == QMessageBox.Cancel:
+                return
+            sincronizar = respuesta == QMessageBox.Yes
+
+            barra = QProgressDialog("Importando productos...", "Cancelar", 0, 0, self)
+            barra.setWindowTitle("Importar desde Excel")
+            barra.setWindowModality(Qt.WindowModal)
+            barra.setMinimumDuration(0)
+
+            def progreso(procesadas, total, filas_por_segundo):
+                if total:
+                    barra.setMaximum(total)
+                    barra.setValue(min(procesadas, total))
+                barra.setLabelText(f"Importados {procesadas} de {total or '?'} ({filas_por_segundo:.0f} filas/s)")
+                QApplication.processEvents()
+                return not barra.wasCanceled()
+
+            try:
+                resumen = importar_desde_excel(archivo, progreso, sincronizar)
+            except ValueError as e:  # planilla sin las columnas esperadas o productos repetidos
+                barra.close()
+                QMessageBox.warning(self, "Error", f"No se pudo importar los productos.\n\n{e}")
+                return
+            barra.close()
+            if resumen:
+                QMessageBox.information(
+                    self, "Éxito",
+                    f"Nuevos: {resumen['insertadas']} - Actualizados: {resumen['actualizadas']} - "
+                    f"Sin cambios: {resumen['sin_cambios']} - Descartados: {resumen['descartadas']}\n"
+                    f"Tiempo: {resumen['segundos']:.1f} s."
+                )
+                self.refrescar_stock()
             else:
                 QMessageBox.warning(self, "Error", "No se pudo importar los productos.")
 
         else:
-            QMessageBox.warning(self, "Error", "No se selecciono ningun archivo.")
\ No newline at end of file
+            QMessageBox.warning(self, "Error", "No se selecciono ningun archivo.")
+
+    def exportar_stock(self):
+        """Exporta los productos a CSV, Excel o Parquet leyendo la base por lotes."""
+        archivo, _ = QFileDialog.getSaveFileName(
+            self, "Exportar Stock", "stock.xlsx",
+            "Excel (*.xlsx);;CSV (*.csv);;Parquet (*.parquet)"
+        )
+        if not archivo:
+            return
+        respuesta = QMessageBox.question(
+            self, "Exportar Stock",
+            f"¿Exportar solo los productos con stock bajo ({STOCK_BAJO} unidades o menos)?",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.No
+        )
+        if respuesta == QMessageBox.Cancel:
+            return
+        stock_maximo = STOCK_BAJO if respuesta == QMessageBox.Yes else None
+
+        from core.exportador import exportar_a_archivo  # openpyxl/pyarrow se cargan recién aquí
+
+        barra = QProgressDialog("Exportando productos...", "Cancelar", 0, 0, self)
+        barra.setWindowTitle("Exportar Stock")
+        barra.setWindowModality(Qt.WindowModal)
+        barra.setMinimumDuration(0)
+
+        def progreso(exportadas, total, filas_por_segundo):
+            if total:
+                barra.setMaximum(total)
+                barra.setValue(min(exportadas, total))
+            barra.setLabelText(f"Exportados {exportadas} de {total or '?'} ({filas_por_segundo:.0f} filas/s)")
+            QApplication.processEvents()
+            return not barra.wasCanceled()
+
+        resumen = exportar_a_archivo(archivo, "productos", progreso, stock_maximo=stock_maximo)
+        barra.close()
+        if not resumen:
+            QMessageBox.warning(self, "Error", "No se pudo exportar el stock.")
+        elif not resumen["cancelado"]:
+            QMessageBox.information(self, "Éxito", f"Se exportaron {resumen['filas']} productos en {resumen['segundos']:.1f} s.")
@@ -0,0 +1,29 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class TareaFondo(QObject):
+    """Entrega el resultado de un Future en el hilo de la interfaz mediante señales Qt.
+
+    Uso: TareaFondo(futuro, self, al_terminar, al_fallar). Las señales se conectan antes de
+    enganchar el Future, así no se pierde el resultado aunque ya haya terminado.
+    """
+
+    terminado = pyqtSignal(object)
+    fallido = pyqtSignal(str)
+
+    def __init__(self, futuro, parent=None, al_terminar=None, al_fallar=None):
+        super().__init__(parent)
+        if al_terminar:
+            self.terminado.connect(al_terminar)
+        if al_fallar:
+            self.fallido.connect(al_fallar)
+        self.terminado.connect(self.deleteLater)
+        self.fallido.connect(self.deleteLater)
+        futuro.add_done_callback(self._al_terminar_futuro)
+
+    def _al_terminar_futuro(self, futuro):
+        # Corre en el hilo del pool: emitir una señal es seguro, Qt la encola hacia la interfaz
+        error = futuro.exception()
+        if error is not None:
+            self.fallido.emit(str(error))
+        else:
+            self.terminado.emit(futuro.result())
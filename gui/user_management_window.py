@@ -1,5 +1,7 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView
-from core.database import obtener_usuarios, eliminar_usuario, actualizar_rol_usuario
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTableView, QMessageBox, QHeaderView, QAbstractItemView
+from core.database import eliminar_usuario, actualizar_rol_usuario
+from core.directorio_usuarios import listar_usuarios
+from gui.modelo_tabla import ModeloTablaColumnar
 import logging
 
 class UserManagementWindow(QWidget):
@@ -18,9 +20,11 @@ class UserManagementWindow(QWidget):
         self.label = QLabel("Administración de Usuarios")
         layout.addWidget(self.label)
 
-        self.tabla_usuarios = QTableWidget()
-        self.tabla_usuarios.setColumnCount(4)
-        self.tabla_usuarios.setHorizontalHeaderLabels(["ID", "Nombre", "Email", "Rol"])
+        self.modelo_usuarios = ModeloTablaColumnar([("ID", "i"), ("Nombre", "s"), ("Email", "s"), ("Rol", "s")], self)
+        self.tabla_usuarios = QTableView()
+        self.tabla_usuarios.setModel(self.modelo_usuarios)
+        self.tabla_usuarios.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla_usuarios.setSelectionMode(QAbstractItemView.SingleSelection)
         self.tabla_usuarios.setSortingEnabled(True)  
         layout.addWidget(self.tabla_usuarios)
 
@@ -29,7 +33,7 @@ class UserManagementWindow(QWidget):
         self.tabla_usuarios.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
         self.tabla_usuarios.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid gray;
                 gridline-color: gray;
                 font-size: 12px;
@@ -40,7 +44,7 @@ class UserManagementWindow(QWidget):
                 border: 1px solid gray;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
             }
         """)
@@ -77,35 +81,34 @@ class UserManagementWindow(QWidget):
         self.cargar_usuarios()
 
     def cargar_usuarios(self):
-        """Carga usuarios en la tabla desde la base de datos."""
-        usuarios = obtener_usuarios()
+        """Carga usuarios en la tabla desde el directorio en memoria (se relee si hubo cambios)."""
+        usuarios = listar_usuarios()
 
         if not usuarios:
             QMessageBox.warning(self, "Aviso", "No hay usuarios registrados.")
             return
 
-        self.tabla_usuarios.setRowCount(len(usuarios))
+        try:
+            self.modelo_usuarios.cargar([(id_usuario, nombre, email, rol) for id_usuario, nombre, email, _, rol in usuarios])
+        except ValueError as e:
+            logging.error(f"Error al cargar usuario en la tabla: {e}")
+            QMessageBox.warning(self, "Error", "Formato de datos incorrecto.")
 
-        for i, usuario in enumerate(usuarios):
-            try:
-                id_usuario, nombre, _, email, _, rol = usuario 
-
-                self.tabla_usuarios.setItem(i, 0, QTableWidgetItem(str(id_usuario)))
-                self.tabla_usuarios.setItem(i, 1, QTableWidgetItem(nombre))
-                self.tabla_usuarios.setItem(i, 2, QTableWidgetItem(email))
-                self.tabla_usuarios.setItem(i, 3, QTableWidgetItem(rol))
-            except ValueError as e:
-                logging.error(f"Error al cargar usuario en la tabla: {e}")
-                QMessageBox.warning(self, "Error", "Formato de datos incorrecto.")
+    def usuario_seleccionado(self):
+        """Devuelve (id, nombre, email, rol) del usuario seleccionado o None."""
+        indice = self.tabla_usuarios.currentIndex()
+        if not indice.isValid():
+            return None
+        return self.modelo_usuarios.fila(indice.row())
 
     def eliminar_usuario(self):
         """Elimina un usuario seleccionado en la tabla."""
-        fila = self.tabla_usuarios.currentRow()
-        if fila == -1:
+        usuario = self.usuario_seleccionado()
+        if usuario is None:
             QMessageBox.warning(self, "Error", "Seleccione un usuario para eliminar.")
             return
 
-        id_usuario = self.tabla_usuarios.item(fila, 0).text()
+        id_usuario = usuario[0]
 
         confirmacion = QMessageBox.question(
             self, "Confirmar Eliminación", f"¿Está seguro de eliminar el usuario ID {id_usuario}?",
@@ -121,13 +124,12 @@ class UserManagementWindow(QWidget):
 
     def cambiar_rol_usuario(self):
         """Cambia el rol de un usuario seleccionado en la tabla."""
-        fila = self.tabla_usuarios.currentRow()
-        if fila == -1:
+        usuario = self.usuario_seleccionado()
+        if usuario is None:
             QMessageBox.warning(self, "Error", "Seleccione un usuario para cambiar el rol.")
             return
 
-        id_usuario = self.tabla_usuarios.item(fila, 0).text()
-        rol_actual = self.tabla_usuarios.item(fila, 3).text()
+        id_usuario, _, _, rol_actual = usuario
         nuevo_rol = "admin" if rol_actual == "cajero" else "cajero"
 
         confirmacion = QMessageBox.question(
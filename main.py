@@ -1,10 +1,9 @@
 import sys
 import logging
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QPushButton, QVBoxLayout, QWidget, QMainWindow, QApplication, QHBoxLayout, QMessageBox
 from gui.login import LoginDialog
-from gui.user_management_window import UserManagementWindow  
-from gui.carrito import Carrito 
-from core.database import inicializar_db
+from core.database import inicializar_db, cerrar_conexion, iniciar_mantenimiento_periodico, detener_mantenimiento_periodico
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -89,21 +88,31 @@ class MainWindow(QMainWindow):
 
     def abrir_users_window(self):
         """Abre la ventana de gestión de usuarios."""
+        from gui.user_management_window import UserManagementWindow  # Importación dentro de la función
         self.user_management_window = UserManagementWindow()
         self.user_management_window.show()
 
     def abrir_carrito(self):
         """Abre la ventana de ventas."""
         logging.info("🛒 Abriendo la ventana del carrito de compras...")
-        self.carrito_window = Carrito()
+        from gui.carrito import Carrito  # Importación dentro de la función
+        self.carrito_window = Carrito(usuario_actual=self.user_data)
         self.carrito_window.show()
     
 
 
+def iniciar_servicios():
+    """Arranca los servicios en segundo plano que no hacen falta para el login."""
+    from core.reposicion import iniciar_motor_reposicion
+    iniciar_motor_reposicion()
+    from core.respaldo import iniciar_respaldos_periodicos
+    iniciar_respaldos_periodicos()
+
 def main():
     try:
         logging.info("✅ Inicializando la base de datos...")
         inicializar_db()  
+        iniciar_mantenimiento_periodico()
 
         logging.info("✅ Creando la aplicación PyQt5...")
         app = QApplication.instance() or QApplication(sys.argv)
@@ -121,7 +130,18 @@ def main():
             logging.info(f"✅ Usuario autenticado: {user_data}")
             main_window = MainWindow(user_data)  
             main_window.show()
+            QTimer.singleShot(0, iniciar_servicios)  # numpy y los respaldos se cargan con la ventana ya visible
             app.exec_() 
+            from gui.servicio_tickets import detener_servicio_tickets
+            detener_servicio_tickets()  # Espera los tickets que quedaron en cola
+            from core.auth import detener_ejecutor_auth
+            detener_ejecutor_auth()  # Termina un rehash de contraseña pendiente
+            from core.reposicion import detener_motor_reposicion
+            detener_motor_reposicion()
+            from core.respaldo import detener_respaldos_periodicos
+            detener_respaldos_periodicos()  # Cancela un respaldo en curso y borra su temporal
+            detener_mantenimiento_periodico()
+            cerrar_conexion()
         else:
             logging.info("❌ El usuario cerró la ventana de login. Saliendo del programa.")
             sys.exit(0)
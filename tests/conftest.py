@@ -0,0 +1,22 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+@pytest.fixture
+def base_datos(tmp_path, monkeypatch):
+    """Base SQLite nueva en un directorio temporal, inicializada y con todas las migraciones."""
+    from core import database, archivo_ventas, respaldo, directorio_usuarios
+
+    ruta = str(tmp_path / "ordico.db")
+    database.cerrar_conexion()
+    for modulo in (database, archivo_ventas, respaldo):
+        monkeypatch.setattr(modulo, "DB_PATH", ruta)
+    monkeypatch.setattr(archivo_ventas, "VENTAS_ARCHIVO_DIR", "")
+    database.inicializar_db()
+    directorio_usuarios.invalidar_directorio_usuarios()  # el de otra base no sirve
+    yield ruta
+    database.cerrar_conexion()
+    directorio_usuarios.invalidar_directorio_usuarios()
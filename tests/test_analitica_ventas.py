@@ -0,0 +1,33 @@
+import pytest
+from datetime import date, datetime, timedelta
+from core.database import agregar_producto, registrar_venta
+from core.analitica_ventas import ventas_por_dia, ventas_por_producto, ventas_por_usuario, totales_ventas
+
+@pytest.fixture
+def ventas_de_hoy(base_datos):
+    agregar_producto("Yerba", "Marca", 100, 10.0, "Almacén")
+    agregar_producto("Azúcar", "Marca", 100, 4.0, "Almacén")
+    registrar_venta(1, [(1, 2), (2, 1)])
+    registrar_venta(1, [(1, 1)])
+    return date.today()
+
+def test_rango_dentro_de_un_solo_dia(ventas_de_hoy):
+    # "Hoy hasta ahora": no hay ningún día completo, todo sale de la tabla ventas
+    desde = datetime.combine(ventas_de_hoy, datetime.min.time())
+    hasta = datetime.now() + timedelta(seconds=1)
+    assert totales_ventas(desde, hasta) == (4, 34.0)
+    assert ventas_por_dia(desde, hasta) == [(ventas_de_hoy.isoformat(), 4, 34.0)]
+    assert [(fila[1], fila[2], fila[3]) for fila in ventas_por_producto(desde, hasta)] == [("Yerba", 3, 30.0), ("Azúcar", 1, 4.0)]
+    assert [(fila[2], fila[3]) for fila in ventas_por_usuario(desde, hasta)] == [(4, 34.0)]
+
+def test_dia_completo_y_puntas_dan_lo_mismo(ventas_de_hoy):
+    hoy = ventas_de_hoy.isoformat()
+    dia_completo = totales_ventas(hoy, hoy)
+    con_puntas = totales_ventas(f"{(ventas_de_hoy - timedelta(days=1)).isoformat()} 12:00:00",
+                                f"{(ventas_de_hoy + timedelta(days=1)).isoformat()} 12:00:00")
+    assert dia_completo == con_puntas == (4, 34.0)
+
+def test_rango_vacio(ventas_de_hoy):
+    ahora = datetime.now()
+    assert totales_ventas(ahora, ahora) == (0, 0.0)
+    assert ventas_por_dia(ahora, ahora) == []
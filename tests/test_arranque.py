@@ -0,0 +1,43 @@
+import os
+import sys
+import json
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Solo se cargan al exportar, importar, imprimir tickets o armar reportes
+MODULOS_PESADOS = ("numpy", "pandas", "fpdf", "werkzeug", "openpyxl", "PIL", "pyarrow", "tkinter")
+
+def _modulos_cargados(codigo, tmp_path):
+    """Ejecuta `codigo` en un intérprete nuevo y devuelve los módulos pesados que quedaron cargados."""
+    entorno = dict(os.environ, QT_QPA_PLATFORM="offscreen", DB_PATH=str(tmp_path / "ordico.db"))
+    programa = (
+        f"import sys, json\n{codigo}\n"
+        f"print(json.dumps(sorted(m for m in {MODULOS_PESADOS!r} if m in sys.modules)))"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", programa], cwd=RAIZ, env=entorno, capture_output=True, text=True, timeout=60,
+    )
+    assert salida.returncode == 0, salida.stderr
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+def test_importar_main_no_carga_modulos_pesados(tmp_path):
+    assert _modulos_cargados("import main", tmp_path) == []
+
+def test_login_no_espera_servicios_pesados(tmp_path):
+    # El diálogo falso anota lo cargado al mostrarse el login y lo cancela (sys.exit(0))
+    codigo = (
+        "import threading, main\n"
+        "class Login:\n"
+        "    def exec_(self):\n"
+        "        global al_login, hilos\n"
+        f"        al_login = [m for m in {MODULOS_PESADOS!r} if m in sys.modules]\n"
+        "        hilos = sorted(h.name for h in threading.enumerate() if h.name in ('reposicion', 'respaldo-db'))\n"
+        "        return False\n"
+        "main.LoginDialog = Login\n"
+        "try:\n"
+        "    main.main()\n"
+        "except SystemExit as e:\n"
+        "    assert e.code == 0, e.code\n"
+        "assert al_login == [] and hilos == [], (al_login, hilos)"
+    )
+    assert _modulos_cargados(codigo, tmp_path) == []
@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+from PyQt5.QtWidgets import QApplication
+from core import auth
+from core.auth import UsuarioExistente, autenticar_usuario, autenticar_usuario_async, registrar_usuario_async
+from core.database import agregar_usuario, obtener_usuario_para_login
+from core.limitador_login import LimitadorLogin, LoginBloqueado
+from gui.tarea_fondo import TareaFondo
+
+HASH_VIEJO = "pbkdf2:sha256:500"
+
+@pytest.fixture
+def autenticacion(base_datos, monkeypatch):
+    """Hashes baratos y un limitador propio (3 intentos por usuario) para cada test."""
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ITERACIONES", 1000)
+    monkeypatch.setattr(auth, "_limitador", LimitadorLogin({"usuario": 3, "terminal": 100}, 60, 30, 900, 100))
+    yield
+    auth.detener_ejecutor_auth()
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication([])
+
+def _esperar(condicion, segundos=10):
+    limite = time.monotonic() + segundos
+    while not condicion() and time.monotonic() < limite:
+        QApplication.processEvents()
+        time.sleep(0.005)
+    return condicion()
+
+# 🔹 Funciones en segundo plano
+
+def test_registrar_async_resuelve_o_falla(autenticacion):
+    assert registrar_usuario_async("ana", "clave1", "ana@ordico.com", "1").result(10) == \
+        "Usuario registrado exitosamente como admin."  # el primer usuario es admin
+    assert registrar_usuario_async("beto", "clave2", "beto@ordico.com", "2").result(10) == \
+        "Usuario registrado exitosamente como cajero."
+
+    repetido = registrar_usuario_async("ana", "otra", "otra@ordico.com", "3")
+    with pytest.raises(UsuarioExistente, match="ya existen"):
+        repetido.result(10)
+    assert obtener_usuario_para_login("otra@ordico.com") is None
+
+def test_autenticar_async(autenticacion):
+    registrar_usuario_async("ana", "clave1", "ana@ordico.com", "1").result(10)
+
+    usuario = autenticar_usuario_async("ana@ordico.com", "clave1").result(10)
+    assert (usuario["username"], usuario["rol"]) == ("ana", "admin")
+    assert autenticar_usuario_async("ana", "mal").result(10) is None
+    assert autenticar_usuario_async("nadie", "clave1").result(10) is None
+
+    # Tras 3 intentos del mismo usuario el Future falla sin verificar la contraseña
+    for _ in range(2):
+        autenticar_usuario_async("nadie", "x").result(10)
+    with pytest.raises(LoginBloqueado):
+        autenticar_usuario_async("nadie", "x").result(10)
+    assert autenticar_usuario_async("ana", "clave1").result(10)  # otro usuario sigue entrando
+
+# 🔹 Rehash en segundo plano
+
+def test_login_rehashea_un_hash_viejo(autenticacion):
+    agregar_usuario("ana", generate_password_hash("clave1", method=HASH_VIEJO), "ana@ordico.com", "1", "admin")
+    agregar_usuario("beto", generate_password_hash("clave2", method=HASH_VIEJO), "beto@ordico.com", "2", "cajero")
+
+    assert autenticar_usuario("ana", "clave1")
+    assert autenticar_usuario("beto", "incorrecta") is None
+    auth.detener_ejecutor_auth()  # espera el rehash pendiente
+
+    nuevo = obtener_usuario_para_login("ana")[2]
+    assert nuevo.startswith(auth.metodo_hash() + "$") and not auth.necesita_rehash(nuevo)
+    assert check_password_hash(nuevo, "clave1")
+    assert autenticar_usuario("ana", "clave1")
+    # Sin login exitoso no se toca el hash
+    assert obtener_usuario_para_login("beto")[2].startswith(HASH_VIEJO + "$")
+
+def test_rehash_no_pisa_un_cambio_de_contrasena(autenticacion):
+    agregar_usuario("ana", generate_password_hash("clave1", method=HASH_VIEJO), "ana@ordico.com", "1", "admin")
+    id_usuario, _, hash_actual = obtener_usuario_para_login("ana")[:3]
+    auth._rehashear(id_usuario, "hash leído antes del cambio", "clave1")
+    assert obtener_usuario_para_login("ana")[2] == hash_actual
+
+# 🔹 TareaFondo
+
+def test_tarea_fondo_entrega_resultado_o_error(app):
+    resultados, errores = [], []
+    with ThreadPoolExecutor(max_workers=2) as ejecutor:
+        bien = TareaFondo(ejecutor.submit(lambda: 42), None, resultados.append, errores.append)
+        mal = TareaFondo(ejecutor.submit(lambda: 1 / 0), None, resultados.append, errores.append)
+        assert _esperar(lambda: resultados and errores)
+    assert resultados == [42]
+    assert errores == ["division by zero"]
+    del bien, mal
+
+def test_tarea_fondo_con_futuro_ya_terminado(app):
+    futuro = Future()
+    futuro.set_result("listo")
+    resultados = []
+    tarea = TareaFondo(futuro, None, resultados.append)
+    assert _esperar(lambda: resultados)
+    assert resultados == ["listo"]
+    del tarea
+
+# 🔹 Diálogos: éxito y error van a métodos distintos
+
+@pytest.mark.parametrize("modulo, clase, campos, boton", [
+    ("gui.register", "RegistroDialog", ("username_input", "email_input", "dni_input", "password_input"), "register_button"),
+    ("gui.admin_user", "AdminUsersDialog", ("input_username", "input_email", "input_dni", "input_password"), "btn_registrar"),
+])
+def test_dialogo_de_registro(autenticacion, app, monkeypatch, modulo, clase, campos, boton):
+    import importlib
+
+    modulo = importlib.import_module(modulo)
+    mensajes = []
+    monkeypatch.setattr(modulo.QMessageBox, "information", lambda parent, titulo, texto: mensajes.append(("info", texto)))
+    monkeypatch.setattr(modulo.QMessageBox, "warning", lambda parent, titulo, texto: mensajes.append(("warning", texto)))
+
+    def registrar(valores):
+        dialogo = getattr(modulo, clase)()
+        for campo, valor in zip(campos, valores):
+            getattr(dialogo, campo).setText(valor)
+        getattr(dialogo, boton).click()
+        assert _esperar(lambda: mensajes)
+        return dialogo
+
+    dialogo = registrar(("ana", "ana@ordico.com", "1", "clave1"))
+    assert mensajes.pop()[0] == "info" and dialogo.result() == dialogo.Accepted
+
+    dialogo = registrar(("ana", "otra@ordico.com", "2", "clave2"))
+    assert mensajes.pop() == ("warning", "El nombre de usuario, el email o el DNI ya existen.")
+    assert dialogo.result() != dialogo.Accepted
+    assert getattr(dialogo, boton).isEnabled()
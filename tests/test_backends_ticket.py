@@ -0,0 +1,66 @@
+import os
+import re
+import pytest
+from gui.backends_ticket import BackendTexto, BackendEscPos
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+EMPRESA = {"nombre": "ORDICO", "cuit": "30-12345678-9", "direccion": "Calle Falsa 123"}
+PRODUCTOS = [
+    {"nombre": "Yerba mate 1 kg", "cantidad": 2, "precio_unitario": 3250.0, "total": 6500.0},
+    {"nombre": "Azúcar refinada", "cantidad": 1, "precio_unitario": 980.5, "total": 980.5},
+    {"nombre": "Galletitas de agua con salvado y semillas (paquete familiar)", "cantidad": 12,
+     "precio_unitario": 1234.56, "total": 14814.72},
+    {"nombre": "Ñoquis", "cantidad": 3, "precio_unitario": 0.99, "total": 2.97},
+]
+SUBTOTAL = 22298.19
+IMPUESTOS = round(SUBTOTAL * 0.21, 2)
+TOTAL = round(SUBTOTAL + IMPUESTOS, 2)
+
+@pytest.mark.parametrize("backend, archivo", [
+    (BackendTexto(ancho=48), "ticket_texto_48.txt"),
+    (BackendTexto(ancho=32), "ticket_texto_32.txt"),
+    (BackendEscPos(ancho=48), "ticket_escpos_48.bin"),
+])
+def test_ticket_coincide_con_el_golden(backend, archivo):
+    datos = backend.renderizar(EMPRESA, PRODUCTOS, SUBTOTAL, TOTAL, IMPUESTOS)
+    ruta = os.path.join(GOLDEN, archivo)
+    if os.getenv("ACTUALIZAR_GOLDEN"):  # ACTUALIZAR_GOLDEN=1 pytest ... después de un cambio de formato buscado
+        with open(ruta, "wb") as salida:
+            salida.write(datos)
+    with open(ruta, "rb") as esperado:
+        assert datos == esperado.read()
+
+def test_lineas_de_texto_respetan_el_ancho():
+    for ancho in (32, 48):
+        texto = BackendTexto(ancho=ancho).renderizar(EMPRESA, PRODUCTOS, SUBTOTAL, TOTAL, IMPUESTOS).decode("utf-8")
+        assert max(len(linea) for linea in texto.splitlines()) == ancho
+
+def _contenido_paginas(pdf):
+    """Operadores de dibujo de cada página (sin comprimir), sin la fecha ni los metadatos del archivo."""
+    pdf.set_compression(False)
+    salida = pdf.output(dest="S")
+    return "\n".join(re.findall(r"stream\n(.*?)\nendstream", salida, re.S)[:pdf.page_no()])
+
+@pytest.mark.parametrize("diseno", ["a4", "termica"])
+def test_ticket_pdf_coincide_con_el_golden(diseno):
+    from gui.generar_ticket import construir_ticket_pdf
+
+    pdf = construir_ticket_pdf(EMPRESA, PRODUCTOS, SUBTOTAL, TOTAL, IMPUESTOS, diseno)
+    contenido = _contenido_paginas(pdf).encode("latin-1")
+    ruta = os.path.join(GOLDEN, f"ticket_pdf_{diseno}.txt")
+    if os.getenv("ACTUALIZAR_GOLDEN"):
+        with open(ruta, "wb") as salida:
+            salida.write(contenido)
+    with open(ruta, "rb") as esperado:
+        assert contenido == esperado.read()
+
+def test_ticket_pdf_largo():
+    from gui.generar_ticket import construir_ticket_pdf
+
+    productos = PRODUCTOS * 15
+    a4 = construir_ticket_pdf(EMPRESA, productos, SUBTOTAL, TOTAL, IMPUESTOS, "a4")
+    assert a4.page_no() == 3  # las filas pasan de hoja solas
+    termica = construir_ticket_pdf(EMPRESA, productos, SUBTOTAL, TOTAL, IMPUESTOS, "termica")
+    assert termica.page_no() == 1  # el rollo se alarga con los ítems
+    assert "Total: $" in _contenido_paginas(termica)
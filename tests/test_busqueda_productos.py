@@ -0,0 +1,108 @@
+from core.database import (
+    agregar_producto, actualizar_producto, aplicar_migraciones, buscar_productos, conectar_db, eliminar_producto,
+    transaccion,
+)
+
+def _cargar_catalogo():
+    for producto in [
+        ("Leche entera", "La Serenísima", 10, 1.5, "Lácteos"),
+        ("Leche descremada", "Sancor", 5, 1.4, "Lácteos"),
+        ("Yogur bebible", "Sancor", 8, 2.0, "Lácteos"),
+        ("Azúcar refinada", "Ledesma", 30, 0.9, "Almacén"),
+        ("Lácteos surtidos en caja", "Varios", 1, 9.9, "Regalería"),
+    ]:
+        assert agregar_producto(*producto)
+
+def _nombres(texto):
+    return [fila[1] for fila in buscar_productos(texto)]
+
+def test_busqueda_sin_acentos_ni_mayusculas(base_datos):
+    _cargar_catalogo()
+    assert _nombres("azucar") == ["Azúcar refinada"]
+    assert _nombres("AZÚCAR") == ["Azúcar refinada"]
+
+def test_busqueda_por_prefijo_y_en_varias_columnas(base_datos):
+    _cargar_catalogo()
+    assert _nombres("l") == _nombres("L")
+    assert set(_nombres("lec")) == {"Leche entera", "Leche descremada"}
+    assert _nombres("lec seren") == ["Leche entera"]  # nombre + marca
+    assert _nombres('leche"') == ["Leche entera", "Leche descremada"]  # las comillas no rompen la consulta
+    assert _nombres("zzz") == []
+
+def test_primero_coincidencias_por_nombre(base_datos):
+    _cargar_catalogo()
+    # "Lácteos" está en el nombre de uno y en la categoría de otros tres
+    nombres = _nombres("lacteos")
+    assert nombres[0] == "Lácteos surtidos en caja"
+    assert sorted(nombres[1:]) == ["Leche descremada", "Leche entera", "Yogur bebible"]
+    assert len(buscar_productos("lacteos", limite=2)) == 2
+
+def test_los_triggers_mantienen_el_indice_al_dia(base_datos):
+    _cargar_catalogo()
+    assert _nombres("mate") == []
+    agregar_producto("Yerba mate", "Playadito", 7, 3.2, "Almacén")
+    assert _nombres("mate") == ["Yerba mate"]
+
+    id_yerba = buscar_productos("mate")[0][0]
+    actualizar_producto(id_yerba, "Yerba compuesta", "Playadito", 7, 3.2, "Almacén")
+    assert _nombres("mate") == []
+    assert _nombres("compuesta") == ["Yerba compuesta"]
+
+    with transaccion() as conn:  # cambiar solo el stock no toca el índice
+        conn.execute("UPDATE productos SET cantidad = 0 WHERE id = ?", (id_yerba,))
+    assert buscar_productos("compuesta")[0][3] == 0
+
+    assert eliminar_producto(id_yerba)
+    assert _nombres("compuesta") == []
+    # El índice externo coincide con la tabla
+    conectar_db().execute("INSERT INTO productos_fts (productos_fts) VALUES ('integrity-check')")
+
+def test_sin_fts_busca_por_nombre_con_like(base_datos):
+    _cargar_catalogo()
+    with transaccion() as conn:  # como una base con SQLite sin FTS5
+        for evento in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER productos_fts_{evento}")
+        conn.execute("DROP TABLE productos_fts")
+    assert set(_nombres("Lech")) == {"Leche entera", "Leche descremada"}
+    assert _nombres("Sancor") == []  # solo por nombre
+
+def test_la_migracion_agrega_el_prefijo_de_una_letra(base_datos):
+    _cargar_catalogo()
+    with transaccion("IMMEDIATE") as conn:  # índice de una base anterior a la migración 12
+        conn.execute("DROP TABLE productos_fts")
+        conn.execute(
+            """CREATE VIRTUAL TABLE productos_fts USING fts5(nombre, marca, categoria, content='productos',
+               content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"""
+        )
+        conn.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+        conn.execute("PRAGMA user_version = 11")
+    aplicar_migraciones()
+    sql = conectar_db().execute("SELECT sql FROM sqlite_master WHERE name = 'productos_fts'").fetchone()[0]
+    assert "prefix='1 2 3'" in sql
+    assert _nombres("azucar") == ["Azúcar refinada"]
+
+def test_latencia_con_terminos_comunes(base_datos):
+    """Benchmark: 100 000 productos; términos que aparecen en buena parte del catálogo."""
+    import statistics
+    import time
+
+    with transaccion("IMMEDIATE") as conn:
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000)
+               INSERT INTO productos (nombre, marca, cantidad, precio, categoria)
+               SELECT CASE i % 4 WHEN 0 THEN 'Leche entera ' WHEN 1 THEN 'Leche descremada ' WHEN 2 THEN 'Yerba mate '
+                      ELSE 'Galletitas de agua ' END || i,
+                      'Marca ' || (i % 300), 10, 1.0,
+                      CASE i % 3 WHEN 0 THEN 'Lácteos' WHEN 1 THEN 'Almacén' ELSE 'Limpieza' END
+               FROM n"""
+        )
+    for texto in ("l", "le", "leche", "leche ent", "lacteos", "yerba mate", "leche marca"):
+        buscar_productos(texto)
+        tiempos = []
+        for _ in range(10):
+            inicio = time.perf_counter()
+            assert len(buscar_productos(texto)) == 100
+            tiempos.append(time.perf_counter() - inicio)
+        mediana = statistics.median(tiempos)
+        print(f"\n{texto!r}: {mediana * 1000:.2f} ms")
+        assert mediana < 0.010, (texto, mediana)
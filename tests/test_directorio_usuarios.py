@@ -0,0 +1,78 @@
+from core import database, directorio_usuarios
+from core.database import actualizar_rol_usuario, agregar_usuario, eliminar_usuario
+from core.directorio_usuarios import (
+    cantidad_usuarios, estadisticas_directorio, listar_usuarios, obtener_usuario, rol_de_usuario,
+)
+
+def _contadores():
+    estadisticas = estadisticas_directorio()
+    return estadisticas["aciertos"], estadisticas["fallos"], estadisticas["invalidaciones"]
+
+def _diferencia(antes):
+    return tuple(despues - previo for despues, previo in zip(_contadores(), antes))
+
+def test_aciertos_y_fallos(base_datos):
+    agregar_usuario("ana", "hash", "ana@ordico.com", "1", "admin")
+    antes = _contadores()
+    assert not estadisticas_directorio()["cargado"]
+
+    assert cantidad_usuarios() == 1          # fallo: lee la base
+    assert estadisticas_directorio()["cargado"]
+    assert rol_de_usuario(1) == "admin"      # aciertos
+    assert obtener_usuario(99) is None
+    assert cantidad_usuarios("admin") == 1
+    assert _diferencia(antes) == (3, 1, 0)
+
+def test_un_alta_invalida_el_directorio(base_datos):
+    agregar_usuario("ana", "hash", "ana@ordico.com", "1", "admin")
+    assert [usuario[1] for usuario in listar_usuarios()] == ["ana"]
+    antes = _contadores()
+
+    assert agregar_usuario("beto", "hash", "beto@ordico.com", "2", "cajero")
+    assert not estadisticas_directorio()["cargado"]
+    assert [usuario[1] for usuario in listar_usuarios()] == ["ana", "beto"]
+    assert cantidad_usuarios("cajero") == 1
+    assert _diferencia(antes) == (1, 1, 1)
+
+    # Un alta rechazada (usuario repetido) no descarta el directorio
+    antes = _contadores()
+    assert not agregar_usuario("beto", "hash", "otro@ordico.com", "3", "cajero")
+    assert cantidad_usuarios() == 2
+    assert _diferencia(antes) == (1, 0, 0)
+
+def test_cambio_de_rol_y_baja_invalidan_el_directorio(base_datos):
+    agregar_usuario("ana", "hash", "ana@ordico.com", "1", "admin")
+    agregar_usuario("beto", "hash", "beto@ordico.com", "2", "cajero")
+    assert rol_de_usuario(2) == "cajero"
+    assert (cantidad_usuarios("admin"), cantidad_usuarios("cajero")) == (1, 1)
+
+    assert actualizar_rol_usuario(2, "admin")
+    assert rol_de_usuario(2) == "admin"
+    assert (cantidad_usuarios("admin"), cantidad_usuarios("cajero")) == (2, 0)
+
+    assert eliminar_usuario(1)
+    assert obtener_usuario(1) is None
+    assert cantidad_usuarios() == 1
+
+def test_no_guarda_una_carga_invalidada_durante_la_lectura(base_datos, monkeypatch):
+    agregar_usuario("ana", "hash", "ana@ordico.com", "1", "admin")
+    leer = database.obtener_usuarios
+
+    def leer_mientras_cambia_el_rol():
+        filas = leer()  # otra caja cambia el rol después de esta lectura
+        with database.transaccion() as conn:
+            conn.execute("UPDATE usuarios SET rol = 'cajero' WHERE id = 1")
+        directorio_usuarios.invalidar_directorio_usuarios()
+        return filas
+
+    monkeypatch.setattr(database, "obtener_usuarios", leer_mientras_cambia_el_rol)
+    assert rol_de_usuario(1) == "admin"  # esta consulta usa lo que leyó...
+    assert not estadisticas_directorio()["cargado"]  # ...pero no lo guarda
+    monkeypatch.setattr(database, "obtener_usuarios", leer)
+    assert rol_de_usuario(1) == "cajero"
+
+def test_sin_usuarios_no_se_guarda(base_datos):
+    antes = _contadores()
+    assert cantidad_usuarios() == 0
+    assert cantidad_usuarios() == 0  # una lista vacía puede ser un error de base: se vuelve a leer
+    assert _diferencia(antes) == (0, 2, 0)
@@ -0,0 +1,147 @@
+import csv
+import os
+import sys
+import pytest
+from core import exportador
+from core.database import agregar_producto, transaccion, conectar_db
+from core.archivo_ventas import archivar_anio
+from core.exportador import exportar, exportar_a_archivo
+
+def _cargar_ventas():
+    renglones = [(1, 1, 1, f"2024-{mes:02d}-15 10:00:00", mes, 10.0) for mes in range(1, 13)]
+    renglones += [(1, 1, 2, f"2026-01-{dia:02d} 10:00:00", 100 + dia, 10.0) for dia in range(1, 6)]
+    with transaccion("IMMEDIATE") as conn:
+        conn.executemany(
+            "INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario) VALUES (?, ?, ?, ?, ?, ?)",
+            renglones,
+        )
+
+def _leer(ruta):
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        return list(csv.DictReader(archivo))
+
+def test_exportar_ventas_incluye_los_anios_archivados(base_datos, tmp_path):
+    _cargar_ventas()
+    assert archivar_anio(2024)["borradas"] == 12
+    assert conectar_db().execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 5
+
+    ruta = str(tmp_path / "ventas.csv")
+    assert exportar(ruta, "ventas")["filas"] == 17
+    ids = [int(fila["id"]) for fila in _leer(ruta)]
+    assert ids == sorted(ids) and len(ids) == 17
+
+    exportar(ruta, "ventas", desde="2024-06-01", hasta="2024-07-31")
+    assert [fila["fecha"][:7] for fila in _leer(ruta)] == ["2024-06", "2024-07"]
+    exportar(ruta, "ventas", desde="2024-12-01", hasta="2026-01-02")
+    assert [fila["ticket"] for fila in _leer(ruta)] == ["12", "101", "102"]
+
+@pytest.fixture
+def salida(tmp_path):
+    """Directorio solo para los archivos exportados (la base de prueba está en tmp_path)."""
+    directorio = tmp_path / "salida"
+    directorio.mkdir()
+    return directorio
+
+def _cargar_productos():
+    for producto in [
+        ("Leche", "Sancor", 10, 1.5, "Lácteos"),
+        ("Yogur", "Sancor", 2, 2.0, "Lácteos"),
+        ("Yerba", "Playadito", 0, 3.2, "Almacén"),
+        ("Fósforos", "Tres Patitos", 50, 0.3, "Almacén"),
+        ("Varios", "", 1, 9.9, "Productos Varios"),
+    ]:
+        assert agregar_producto(*producto)
+
+def test_exportar_solo_las_columnas_pedidas(base_datos, salida):
+    _cargar_productos()
+    ruta = str(salida / "productos.csv")
+    assert exportar(ruta, columnas=["nombre", "marca", "categoria"])["filas"] == 5
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        filas = list(csv.reader(archivo))
+    assert filas[0] == ["nombre", "marca", "categoria"]
+    assert filas[1] == ["Leche", "Sancor", "Lácteos"]
+    assert filas[5] == ["Varios", "", "Productos Varios"]
+
+    with pytest.raises(ValueError, match="Columnas desconocidas en productos: costo"):
+        exportar(ruta, columnas=["nombre", "costo"])
+
+def test_filtros_de_categoria_y_stock(base_datos, salida):
+    _cargar_productos()
+    ruta = str(salida / "productos.csv")
+    exportar(ruta, categoria="Lácteos")
+    assert [fila["nombre"] for fila in _leer(ruta)] == ["Leche", "Yogur"]
+    exportar(ruta, stock_maximo=2)
+    assert [fila["nombre"] for fila in _leer(ruta)] == ["Yogur", "Yerba", "Varios"]
+    exportar(ruta, categoria="Almacén", stock_maximo=2)
+    assert [fila["nombre"] for fila in _leer(ruta)] == ["Yerba"]
+    exportar(ruta, categoria="Productos Varios")
+    assert [fila["nombre"] for fila in _leer(ruta)] == ["Varios"]
+
+    with pytest.raises(ValueError, match="solo se aplican a productos"):
+        exportar(ruta, "ventas", stock_maximo=2)
+    with pytest.raises(ValueError, match="solo se aplican a ventas"):
+        exportar(ruta, desde="2024-01-01")
+
+def test_exportar_xlsx(base_datos, salida):
+    from openpyxl import load_workbook
+
+    _cargar_productos()
+    ruta = str(salida / "productos.xlsx")
+    assert exportar(ruta, columnas=["id", "nombre", "cantidad", "precio"], stock_maximo=10, tamano_lote=2)["filas"] == 4
+    libro = load_workbook(ruta, read_only=True)
+    try:
+        filas = list(libro["Datos"].iter_rows(values_only=True))
+    finally:
+        libro.close()
+    assert filas == [
+        ("id", "nombre", "cantidad", "precio"),
+        (1, "Leche", 10, 1.5),
+        (2, "Yogur", 2, 2.0),
+        (3, "Yerba", 0, 3.2),
+        (5, "Varios", 1, 9.9),
+    ]
+    assert os.listdir(salida) == ["productos.xlsx"]
+
+@pytest.mark.parametrize("extension", ["csv", "xlsx"])
+def test_cancelar_desde_el_progreso(base_datos, salida, extension):
+    _cargar_productos()
+    ruta = str(salida / f"productos.{extension}")
+    exportar(ruta)  # exportación anterior: la cancelada no la pisa
+    anterior = os.path.getsize(ruta)
+
+    avances = []
+
+    def progreso(exportadas, total, filas_por_segundo):
+        avances.append((exportadas, total))
+        return exportadas < 2  # cancela después del segundo lote
+
+    resumen = exportar(ruta, progreso=progreso, tamano_lote=1)
+    assert resumen["cancelado"] and resumen["filas"] == 2
+    assert avances == [(1, 5), (2, 5)]
+    assert os.listdir(salida) == [f"productos.{extension}"]  # sin .tmp
+    assert os.path.getsize(ruta) == anterior
+
+def test_parquet_sin_pyarrow(base_datos, salida, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)  # import pyarrow falla aunque esté instalado
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    ruta = str(salida / "productos.parquet")
+    with pytest.raises(ValueError, match="instalar pyarrow"):
+        exportar(ruta)
+    assert exportar_a_archivo(ruta) is False
+    assert os.listdir(salida) == []
+
+def test_un_error_al_limpiar_no_tapa_el_original(base_datos, salida, monkeypatch):
+    _cargar_productos()
+
+    def escribir(self, filas):
+        raise OSError("disco lleno")
+
+    def cerrar(self):
+        self._archivo.close()
+        raise OSError("no se pudo cerrar")
+
+    monkeypatch.setattr(exportador._EscritorCSV, "escribir", escribir)
+    monkeypatch.setattr(exportador._EscritorCSV, "cerrar", cerrar)
+    with pytest.raises(OSError, match="disco lleno"):
+        exportar(str(salida / "productos.csv"))
+    assert os.listdir(salida) == []
@@ -0,0 +1,91 @@
+import pytest
+from openpyxl import Workbook
+from core.database import (
+    agregar_producto, aplicar_migraciones, conectar_db, obtener_revision_productos, productos_modificados_desde,
+    transaccion,
+)
+from core.importador import importar_excel, importar_desde_excel, ProductosRepetidos
+
+def _planilla(ruta, productos):
+    libro = Workbook()
+    hoja = libro.active
+    hoja.append(["Nombre", "Marca", "Cantidad", "Precio", "Categoría"])
+    for fila in productos:
+        hoja.append(list(fila))
+    libro.save(ruta)
+    return str(ruta)
+
+def _productos(cantidad_extra=0):
+    return [(f"Producto {i}", "Marca", i + cantidad_extra, 1.5, "Almacén") for i in range(10)]
+
+def test_sincronizar_dos_veces_el_mismo_archivo(base_datos, tmp_path):
+    archivo = _planilla(tmp_path / "catalogo.xlsx", _productos())
+    importar_excel(archivo, sincronizar=True)
+    importar_excel(archivo, sincronizar=True)
+    assert conectar_db().execute("SELECT COUNT(*) FROM productos").fetchone()[0] == 10
+
+def test_sincronizar_cambios_sobre_productos_existentes(base_datos, tmp_path):
+    importar_excel(_planilla(tmp_path / "lunes.xlsx", _productos()), sincronizar=True)
+    revision = obtener_revision_productos()
+    importar_excel(_planilla(tmp_path / "martes.xlsx", _productos(cantidad_extra=5)), sincronizar=True)
+
+    cantidades = dict(conectar_db().execute("SELECT nombre, cantidad FROM productos"))
+    assert cantidades == {f"Producto {i}": i + 5 for i in range(10)}
+    # El registro de cambios anota cada producto actualizado una sola vez, con la revisión nueva
+    cambios = conectar_db().execute("SELECT COUNT(*), MIN(revision) FROM productos_cambios").fetchone()
+    assert cambios[0] == 10 and cambios[1] > revision
+    _, cambiados, eliminados = productos_modificados_desde(revision)
+    assert len(cambiados) == 10 and eliminados == []
+
+def _conteo(resumen):
+    return resumen["insertadas"], resumen["actualizadas"], resumen["sin_cambios"]
+
+def test_conteos_de_la_sincronizacion(base_datos, tmp_path):
+    archivo = _planilla(tmp_path / "catalogo.xlsx", _productos())
+    assert _conteo(importar_excel(archivo, sincronizar=True)) == (10, 0, 0)
+    assert _conteo(importar_excel(archivo, sincronizar=True)) == (0, 0, 10)
+
+    productos = _productos()
+    productos[:3] = [(nombre, marca, cantidad + 100, precio, categoria) for nombre, marca, cantidad, precio, categoria in productos[:3]]
+    productos += [("Producto nuevo 1", "Marca", 1, 2.0, "Almacén"), ("Producto nuevo 2", "Marca", 1, 2.0, "Almacén")]
+    resumen = importar_excel(_planilla(tmp_path / "cambios.xlsx", productos), sincronizar=True)
+    assert _conteo(resumen) == (2, 3, 7)
+    assert resumen["importadas"] == 12
+
+def _indices_clave():
+    return conectar_db().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ux_productos_%'"
+    ).fetchall()
+
+def test_importar_sin_sincronizar_despues_de_sincronizar(base_datos, tmp_path):
+    archivo = _planilla(tmp_path / "catalogo.xlsx", _productos())
+    importar_excel(archivo, sincronizar=True)
+    assert _indices_clave() == []  # el índice UNIQUE dura solo lo que dura la sincronización
+
+    resumen = importar_excel(archivo)
+    assert resumen["insertadas"] == 10
+    assert agregar_producto("Producto 0", "Marca", 1, 1.5, "Almacén")
+    assert conectar_db().execute("SELECT COUNT(*) FROM productos").fetchone()[0] == 21
+
+def test_sincronizar_con_productos_repetidos(base_datos, tmp_path):
+    importar_excel(_planilla(tmp_path / "repetidos.xlsx", _productos() + _productos()))
+    archivo = _planilla(tmp_path / "catalogo.xlsx", _productos(cantidad_extra=5))
+
+    with pytest.raises(ProductosRepetidos, match="10 productos repetidos"):
+        importar_desde_excel(archivo, sincronizar=True)  # el mensaje llega hasta la ventana
+    conn = conectar_db()
+    assert conn.execute("SELECT COUNT(*), SUM(cantidad) FROM productos").fetchone() == (20, 90)
+    assert _indices_clave() == []
+
+def test_clave_sin_columnas_para_actualizar(base_datos, tmp_path):
+    archivo = _planilla(tmp_path / "catalogo.xlsx", _productos())
+    with pytest.raises(ValueError, match="no queda nada que actualizar"):
+        importar_excel(archivo, sincronizar=True, clave=("nombre", "marca", "cantidad", "precio", "categoria"))
+    assert conectar_db().execute("SELECT COUNT(*) FROM productos").fetchone()[0] == 0
+
+def test_la_migracion_quita_el_indice_que_quedaba(base_datos):
+    with transaccion("IMMEDIATE") as conn:
+        conn.execute("CREATE UNIQUE INDEX ux_productos_nombre_marca ON productos (nombre, marca)")
+        conn.execute("PRAGMA user_version = 10")
+    aplicar_migraciones()
+    assert _indices_clave() == []
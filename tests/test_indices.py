@@ -0,0 +1,90 @@
+import sqlite3
+import statistics
+import time
+import pytest
+from core import database
+from core.database import conectar_db, transaccion
+
+def _plan(sql, parametros=()):
+    return [fila[3] for fila in conectar_db().execute(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+
+CONSULTAS_FRECUENTES = [
+    # Reportes por rango de fechas
+    ("SELECT * FROM ventas WHERE fecha >= ? AND fecha < ?", ("2026-01-01", "2026-02-01"), "idx_ventas_fecha"),
+    # Ventas de un producto en un rango
+    ("SELECT SUM(cantidad) FROM ventas WHERE producto_id = ? AND fecha >= ? AND fecha < ?",
+     (1, "2026-01-01", "2026-02-01"), "idx_ventas_producto_fecha"),
+    # Ventas de un cajero en un rango
+    ("SELECT SUM(cantidad) FROM ventas WHERE usuario_id = ? AND fecha >= ? AND fecha < ?",
+     (1, "2026-01-01", "2026-02-01"), "idx_ventas_usuario_fecha"),
+    # Renglones de un ticket (regeneración)
+    ("SELECT * FROM ventas WHERE ticket = ?", (1,), "idx_ventas_ticket"),
+    # Filtros del catálogo
+    ("SELECT id FROM productos WHERE nombre = ?", ("Yerba",), "idx_productos_nombre"),
+    ("SELECT id FROM productos WHERE marca = ?", ("Marca",), "idx_productos_marca"),
+    ("SELECT id FROM productos WHERE categoria = ?", ("Almacén",), "idx_productos_categoria"),
+]
+
+@pytest.mark.parametrize("sql, parametros, indice", CONSULTAS_FRECUENTES)
+def test_consultas_frecuentes_usan_su_indice(base_datos, sql, parametros, indice):
+    plan = _plan(sql, parametros)
+    assert any(indice in paso for paso in plan), plan
+    assert not any(paso.startswith("SCAN") for paso in plan), plan
+
+def test_login_por_email_o_nombre_no_recorre_usuarios(base_datos):
+    from core.database import _SQL_USUARIO_LOGIN
+
+    plan = _plan(_SQL_USUARIO_LOGIN, ("ana", "ana"))
+    assert any("sqlite_autoindex_usuarios" in paso for paso in plan), plan
+    assert not any(paso.startswith("SCAN usuarios") for paso in plan), plan
+
+def test_listado_inicial_de_productos_sale_ordenado_del_indice(base_datos):
+    # El carrito sin texto de búsqueda muestra los primeros productos por nombre
+    plan = _plan("SELECT id, nombre, precio, cantidad FROM productos ORDER BY nombre LIMIT ?", (100,))
+    assert any("idx_productos_nombre" in paso for paso in plan), plan
+    assert not any("TEMP B-TREE" in paso for paso in plan), plan
+
+REPETICIONES = 300
+
+def _mediana_us(consulta):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        consulta()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1e6
+
+def test_latencia_de_busquedas_con_conexion_del_hilo(base_datos):
+    """Benchmark: cada consulta indexada con una conexión nueva por llamada (como antes) y con la del hilo."""
+    # Diez años de ventas: cada búsqueda devuelve pocas filas y se mide el acceso, no la lectura
+    with transaccion("IMMEDIATE") as conn:
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 5000)
+               INSERT INTO productos (nombre, marca, cantidad, precio, categoria)
+               SELECT IIF(i = 1, 'Yerba', 'Producto ' || i), IIF(i % 500 = 0, 'Marca', 'Marca ' || (i % 50)), 100, 10.0,
+                      IIF(i % 500 = 1, 'Almacén', 'Categoría ' || (i % 20)) FROM n"""
+        )
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 20000)
+               INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario)
+               SELECT 1 + i % 5, 1 + i % 5000, 1, datetime('2016-02-01', '+' || (i * 263) || ' minutes'), i, 10.0 FROM n"""
+        )
+
+    def _conexion_nueva(sql, parametros):
+        conn = sqlite3.connect(database.DB_PATH)
+        try:
+            database._aplicar_pragmas_sesion(conn)
+            conn.execute(sql, parametros).fetchall()
+        finally:
+            conn.close()
+
+    def _conexion_del_hilo(sql, parametros):
+        conectar_db().execute(sql, parametros).fetchall()
+
+    print(f"\n{'consulta':<28}{'nueva (µs)':>12}{'del hilo (µs)':>15}")
+    for sql, parametros, indice in CONSULTAS_FRECUENTES:
+        antes = _mediana_us(lambda: _conexion_nueva(sql, parametros))
+        despues = _mediana_us(lambda: _conexion_del_hilo(sql, parametros))
+        print(f"{indice:<28}{antes:>12.0f}{despues:>15.0f}")
+        # Abrir la base, leer el esquema y aplicar los PRAGMA cuesta más que la búsqueda por índice
+        assert despues * 2 < antes, (indice, antes, despues)
@@ -0,0 +1,46 @@
+import tracemalloc
+from datetime import date, timedelta
+from core.database import transaccion
+from core.informes_ventas import cargar_productos, cargar_ventas, top_productos, analisis_abc
+
+RENGLONES = 200000
+PRODUCTOS = 500
+
+def _ventas_sinteticas():
+    """RENGLONES ventas repartidas en los últimos 30 días, generadas dentro de SQLite."""
+    with transaccion("IMMEDIATE") as conn:
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+               INSERT INTO productos (nombre, marca, cantidad, precio, categoria)
+               SELECT 'Producto ' || i, 'Marca ' || (i % 37), 1000, i % 90 + 0.5, 'Categoría ' || (i % 12) FROM n""",
+            (PRODUCTOS,),
+        )
+        conn.execute(
+            """WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+               INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario)
+               SELECT i % 7 + 1, i * 7919 % ? + 1, i % 5 + 1,
+                      datetime('now', 'localtime', '-' || (i * 13 % 2592000) || ' seconds'), i / 3 + 1, i % 90 + 0.5
+               FROM n""",
+            (RENGLONES, PRODUCTOS),
+        )
+
+def test_memoria_acotada_por_renglon(base_datos):
+    _ventas_sinteticas()
+    desde, hasta = date.today() - timedelta(days=31), date.today()
+    productos = cargar_productos()
+    cargar_ventas(desde, hasta, productos, tamano_lote=10000)  # calienta cachés de pandas/NumPy
+
+    tracemalloc.start()
+    try:
+        ventas = cargar_ventas(desde, hasta, productos, tamano_lote=10000)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert len(ventas) == RENGLONES
+    # Documentado en core/informes_ventas.py: 42 bytes por renglón, pico ≈ 1,25 veces eso
+    bytes_por_renglon = ventas.memory_usage(index=False, deep=True).sum() / RENGLONES
+    assert bytes_por_renglon <= 48, bytes_por_renglon
+    assert pico / RENGLONES <= 1.5 * 48, pico / RENGLONES
+    assert top_productos(ventas, productos, 10)["importe"].is_monotonic_decreasing
+    assert set(analisis_abc(ventas, productos)["clase"]) <= {"A", "B", "C"}
@@ -0,0 +1,88 @@
+import pytest
+from core import auth
+from core.limitador_login import LimitadorLogin, LoginBloqueado
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+USUARIO = ("usuario", "ana")
+TERMINAL = ("terminal", "caja1")
+
+def _limitador(reloj, max_claves=100):
+    return LimitadorLogin({"usuario": 3, "terminal": 5}, ventana=60, bloqueo_base=30, bloqueo_max=100,
+                          max_claves=max_claves, reloj=reloj)
+
+def test_bloquea_al_superar_el_umbral():
+    reloj = Reloj()
+    limitador = _limitador(reloj)
+    assert [limitador.intentar((USUARIO,)) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limitador.intentar((USUARIO,)) == 30
+    reloj.avanzar(10)
+    assert limitador.intentar((USUARIO,)) == 20  # durante el bloqueo no se cuenta ni se alarga
+    assert limitador.espera((USUARIO,)) == 20
+    reloj.avanzar(20)
+    assert limitador.intentar((USUARIO,)) == 0.0
+
+def test_los_intentos_vencen_con_la_ventana():
+    reloj = Reloj()
+    limitador = _limitador(reloj)
+    for _ in range(3):
+        assert limitador.intentar((USUARIO,)) == 0.0
+        reloj.avanzar(15)
+    reloj.avanzar(16)  # el primero ya tiene más de 60 s
+    assert limitador.intentar((USUARIO,)) == 0.0
+    assert limitador.intentar((USUARIO,)) == 30
+
+def test_el_bloqueo_se_duplica_hasta_el_maximo():
+    reloj = Reloj()
+    limitador = _limitador(reloj)
+    duraciones = []
+    for _ in range(4):
+        for _ in range(3):
+            limitador.intentar((USUARIO,))
+        duraciones.append(limitador.intentar((USUARIO,)))
+        reloj.avanzar(duraciones[-1])
+    assert duraciones == [30, 60, 100, 100]
+
+def test_un_login_correcto_reinicia_la_clave():
+    reloj = Reloj()
+    limitador = _limitador(reloj)
+    for _ in range(3):
+        limitador.intentar((USUARIO,))
+    limitador.exito(USUARIO)
+    assert [limitador.intentar((USUARIO,)) for _ in range(3)] == [0.0, 0.0, 0.0]
+
+def test_la_terminal_limita_aunque_cambie_el_usuario():
+    reloj = Reloj()
+    limitador = _limitador(reloj)
+    for i in range(5):
+        assert limitador.intentar((("usuario", f"u{i}"), TERMINAL)) == 0.0
+    assert limitador.intentar((("usuario", "otro"), TERMINAL)) == 30
+
+def test_la_memoria_queda_acotada():
+    limitador = _limitador(Reloj(), max_claves=50)
+    for i in range(1000):
+        limitador.intentar((("usuario", f"u{i}"),))
+    assert limitador.cantidad_claves() == 50
+
+def test_un_intento_bloqueado_no_consulta_la_base_ni_calcula_hash(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(auth, "_limitador", _limitador(reloj))
+    monkeypatch.setattr(auth, "obtener_usuario_para_login", lambda entrada: None)
+    for _ in range(3):
+        assert auth.autenticar_usuario("ana", "x", terminal="caja1") is None
+
+    def _prohibido(entrada):
+        raise AssertionError("no debía consultar la base")
+
+    monkeypatch.setattr(auth, "obtener_usuario_para_login", _prohibido)
+    with pytest.raises(LoginBloqueado) as bloqueo:
+        auth.autenticar_usuario("ANA ", "x", terminal="caja1")  # la clave se normaliza
+    assert bloqueo.value.segundos == auth._limitador.bloqueo_base
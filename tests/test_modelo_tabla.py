@@ -0,0 +1,137 @@
+import statistics
+import time
+import pytest
+from PyQt5.QtCore import Qt
+from gui.modelo_tabla import ModeloTablaColumnar, FiltroIncremental, ModeloFiltroRapido
+
+COLUMNAS = [("ID", "i"), ("Nombre", "s"), ("Marca", "s"), ("Cantidad", "i"), ("Precio", "d"), ("Categoría", "s")]
+PRODUCTOS = [
+    (1, "Leche entera", "La Serenísima", 10, 1.5, "Lácteos"),
+    (2, "Leche descremada", "Sancor", 5, 1.4, "Lácteos"),
+    (3, "Azúcar", "Ledesma", 30, 0.9, "Almacén"),
+    (4, "Yerba", "Playadito", 7, 3.2, "Almacén"),
+    (5, "Lechuga", "Huerta", 2, 0.5, "Verdulería"),
+]
+
+@pytest.fixture
+def modelo():
+    modelo = ModeloTablaColumnar(COLUMNAS)
+    modelo.cargar(PRODUCTOS)
+    return modelo
+
+@pytest.fixture
+def proxy(modelo):
+    proxy = ModeloFiltroRapido()
+    proxy.setSourceModel(modelo)
+    return proxy
+
+def _ids(modelo):
+    return [modelo.valor(posicion, 0) for posicion in range(modelo.rowCount())]
+
+def _ids_proxy(proxy):
+    return [int(proxy.data(proxy.index(fila, 0))) for fila in range(proxy.rowCount())]
+
+# 🔹 ModeloTablaColumnar
+
+def test_ordenar_solo_mueve_la_permutacion(modelo):
+    modelo.sort(3, Qt.AscendingOrder)
+    assert _ids(modelo) == [5, 2, 4, 1, 3]
+    modelo.sort(1, Qt.DescendingOrder)  # texto sin distinguir mayúsculas
+    assert _ids(modelo) == [4, 5, 1, 2, 3]
+    assert modelo.fila(0) == PRODUCTOS[3]
+    assert modelo.data(modelo.index(0, 4)) == "3.20"
+
+def test_aplicar_cambios_con_la_tabla_ordenada(modelo):
+    modelo.sort(3, Qt.AscendingOrder)  # 5, 2, 4, 1, 3
+    cambiadas = []
+    modelo.dataChanged.connect(lambda arriba, abajo, roles=(): cambiadas.append((arriba.row(), abajo.row())))
+
+    modelo.aplicar_cambios(
+        [(4, "Yerba", "Playadito", 1, 3.2, "Almacén"), (6, "Café", "Cabrales", 1, 4.0, "Almacén")],
+        [2],
+    )
+    # La modificación se avisa en su posición visible; el alta va al final y la baja desaparece
+    assert cambiadas == [(1, 1)]
+    assert _ids(modelo) == [5, 4, 1, 3, 6]
+    assert modelo.fila(1)[3] == 1
+    modelo.sort(3, Qt.AscendingOrder)
+    assert _ids(modelo) == [4, 6, 5, 1, 3]
+
+# 🔹 FiltroIncremental
+
+def test_filtro_achica_y_agranda(modelo):
+    filtro = FiltroIncremental()
+    filtro.cargar(modelo.claves_busqueda())
+    assert filtro.filtrar("le") == [0, 1, 2, 4]  # "Ledesma" también
+    assert filtro.filtrar("lec") == [0, 1, 4]
+    assert filtro.filtrar("leche") == [0, 1]
+    assert filtro.filtrar("leche s") == [0, 1]  # palabras sueltas en cualquier columna
+    assert filtro.filtrar("leche sa") == [1]
+    # Al borrar se recupera el resultado guardado de ese texto
+    assert filtro.filtrar("lec") == [0, 1, 4]
+    assert filtro.filtrar("  ") is None
+    assert filtro.filtrar("AZUCAR") == [2]  # sin acentos ni mayúsculas
+    assert filtro.filtrar("lácteos") == [0, 1]
+
+# 🔹 ModeloFiltroRapido
+
+def test_proxy_mapea_filas_a_la_fuente(modelo, proxy):
+    modelo.sort(0, Qt.DescendingOrder)  # 5, 4, 3, 2, 1
+    proxy.filtrar("leche")
+    assert _ids_proxy(proxy) == [2, 1]
+    for fila in range(proxy.rowCount()):
+        fuente = proxy.mapToSource(proxy.index(fila, 1))
+        assert (fuente.row(), fuente.column()) == ([3, 4][fila], 1)
+        assert proxy.mapFromSource(fuente).row() == fila
+    assert not proxy.mapFromSource(modelo.index(0, 0)).isValid()  # Lechuga no pasa el filtro
+    proxy.filtrar("")
+    assert proxy.rowCount() == len(PRODUCTOS)
+
+def test_proxy_con_cambios_y_orden_mientras_filtra(modelo, proxy):
+    proxy.filtrar("almacen")
+    assert _ids_proxy(proxy) == [3, 4]
+
+    modelo.aplicar_cambios([(6, "Café", "Cabrales", 1, 4.0, "Almacén")], [3])
+    assert _ids_proxy(proxy) == [4, 6]
+    proxy.sort(3, Qt.AscendingOrder)
+    assert _ids_proxy(proxy) == [6, 4]
+    # Una modificación cuenta para el próximo filtro
+    modelo.aplicar_cambios([(4, "Yerba", "Playadito", 7, 3.2, "Infusiones")], [])
+    proxy.filtrar("almacen")
+    assert _ids_proxy(proxy) == [6]
+
+# 🔹 Benchmark: latencia por tecla con 100 000 productos
+
+FILAS_BENCHMARK = 100_000
+TEXTO_TIPEADO = "leche entera"
+
+def test_latencia_por_tecla_con_100k_filas():
+    marcas = ["La Serenísima", "Sancor", "Ilolay", "Tregar", "Milkaut"]
+    nombres = ["Leche entera", "Leche descremada", "Yogur bebible", "Queso cremoso", "Manteca", "Dulce de leche"]
+    modelo = ModeloTablaColumnar(COLUMNAS)
+    modelo.cargar([
+        (i, f"{nombres[i % 6]} {i % 997}", marcas[i % 5], i % 50, 1.0 + i % 300, "Lácteos")
+        for i in range(1, FILAS_BENCHMARK + 1)
+    ])
+    proxy = ModeloFiltroRapido()
+    proxy.setSourceModel(modelo)
+
+    inicio = time.perf_counter()
+    proxy.filtrar(TEXTO_TIPEADO[0])  # la primera tecla arma las claves de búsqueda
+    primera = time.perf_counter() - inicio
+    latencias = []
+    for largo in range(2, len(TEXTO_TIPEADO) + 1):
+        inicio = time.perf_counter()
+        proxy.filtrar(TEXTO_TIPEADO[:largo])
+        latencias.append(time.perf_counter() - inicio)
+    for largo in range(len(TEXTO_TIPEADO) - 1, 0, -1):  # y se borra de a una letra
+        inicio = time.perf_counter()
+        proxy.filtrar(TEXTO_TIPEADO[:largo])
+        latencias.append(time.perf_counter() - inicio)
+
+    print(f"\nprimera tecla (con claves): {primera * 1000:.0f} ms | "
+          f"por tecla: mediana {statistics.median(latencias) * 1000:.2f} ms, máx {max(latencias) * 1000:.1f} ms")
+    assert proxy.rowCount() == FILAS_BENCHMARK  # con "l" pasan todas ("Lácteos")
+    assert primera < 2.0
+    # Por debajo de los 150 ms del debounce: tipear no se traba
+    assert max(latencias) < 0.15, latencias
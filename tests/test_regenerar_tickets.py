@@ -0,0 +1,55 @@
+import os
+import json
+import hashlib
+from core.database import agregar_producto, transaccion
+from gui.regenerar_tickets import regenerar_tickets, MANIFIESTO
+
+TICKETS = 120
+
+def _cargar_ventas():
+    for i in range(3):
+        agregar_producto(f"Producto {i}", "Marca", 1000, 10.0 * (i + 1), "Almacén")
+    renglones = []
+    for ticket in range(1, TICKETS + 1):
+        fecha = f"2026-03-{1 + ticket % 3:02d} 10:{ticket % 60:02d}:00"  # tres días
+        renglones += [(1, 1 + ticket % 3, 2, fecha, ticket, 10.0), (1, 1 + (ticket + 1) % 3, 1, fecha, ticket, 20.0)]
+    with transaccion("IMMEDIATE") as conn:
+        conn.executemany(
+            "INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario) VALUES (?, ?, ?, ?, ?, ?)",
+            renglones,
+        )
+
+def _manifiesto(salida):
+    with open(os.path.join(salida, MANIFIESTO), encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+def test_regenerar_en_varios_procesos(base_datos, tmp_path):
+    _cargar_ventas()
+    salida = str(tmp_path / "regenerados")
+
+    resumen = regenerar_tickets("2026-03-01", "2026-03-03", salida, backend="pdf", procesos=4)
+    assert (resumen["total"], resumen["generados"], resumen["errores"]) == (TICKETS, TICKETS, 0)
+
+    entradas = _manifiesto(salida)
+    assert len(entradas) == TICKETS
+    assert len({e["clave"] for e in entradas}) == TICKETS
+    assert len({e["archivo"] for e in entradas}) == TICKETS
+    for entrada in entradas:
+        with open(os.path.join(salida, entrada["archivo"]), "rb") as archivo:
+            datos = archivo.read()
+        assert datos.startswith(b"%PDF") and hashlib.sha256(datos).hexdigest() == entrada["sha256"]
+        assert entrada["archivo"].startswith(os.path.join("2026", "03", entrada["fecha"][8:10]))
+
+def test_regenerar_retoma_lo_que_falta(base_datos, tmp_path):
+    _cargar_ventas()
+    salida = str(tmp_path / "regenerados")
+    regenerar_tickets("2026-03-01", "2026-03-03", salida, backend="texto", procesos=3)
+
+    # Como si la corrida anterior se hubiera cortado antes de escribir estos archivos
+    perdidos = _manifiesto(salida)[:10]
+    for entrada in perdidos:
+        os.remove(os.path.join(salida, entrada["archivo"]))
+
+    resumen = regenerar_tickets("2026-03-01", "2026-03-03", salida, backend="texto", procesos=3)
+    assert (resumen["generados"], resumen["salteados"]) == (10, TICKETS - 10)
+    assert all(os.path.exists(os.path.join(salida, e["archivo"])) for e in perdidos)
@@ -0,0 +1,137 @@
+import math
+import threading
+from datetime import date, timedelta
+import pytest
+from core import reposicion
+from core.database import actualizar_producto, agregar_producto, eliminar_producto, transaccion
+
+def test_el_motor_sigue_tras_un_error_inesperado(base_datos, monkeypatch):
+    llamadas = []
+    dos_vueltas = threading.Event()
+
+    def actualizar():
+        llamadas.append(1)
+        if len(llamadas) >= 2:
+            dos_vueltas.set()
+        raise ValueError("falla inesperada")
+
+    motor = reposicion.obtener_motor_reposicion()
+    monkeypatch.setattr(motor, "actualizar", actualizar)
+    hilo = reposicion.iniciar_motor_reposicion(intervalo=0.01)
+    try:
+        assert dos_vueltas.wait(5), "el hilo murió con la primera excepción"
+    finally:
+        reposicion.detener_motor_reposicion()
+        hilo.join(5)
+    assert not hilo.is_alive()
+
+HOY = date(2026, 3, 31)
+AYER = HOY - timedelta(days=1)
+
+def _motor(**opciones):
+    opciones = {"vida_media": 7, "dias_entrega": 5, "dias_ciclo": 10, "z": 1.65, "historia": 60, **opciones}
+    return reposicion.MotorReposicion(**opciones)
+
+def _vender(ventas):
+    """Inserta ventas ya fechadas: [(producto_id, día, unidades)]. El trigger arma los acumulados diarios."""
+    with transaccion("IMMEDIATE") as conn:
+        ticket = conn.execute("SELECT IFNULL(MAX(ticket), 0) FROM ventas").fetchone()[0]
+        for producto_id, dia, unidades in ventas:
+            ticket += 1
+            conn.execute(
+                "INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario) "
+                "VALUES (1, ?, ?, ?, ?, 10.0)",
+                (producto_id, unidades, f"{dia.isoformat()} 12:00:00", ticket),
+            )
+
+def _ewma(ventas, producto_id, ayer, alfa):
+    """Velocidad y media de los cuadrados esperadas, sumando día por día las ventas de `producto_id`."""
+    por_dia = {}
+    for id_, dia, unidades in ventas:
+        if id_ == producto_id:
+            por_dia[dia] = por_dia.get(dia, 0) + unidades
+    velocidad = sum(alfa * (1 - alfa) ** (ayer - dia).days * u for dia, u in por_dia.items() if dia <= ayer)
+    cuadrados = sum(alfa * (1 - alfa) ** (ayer - dia).days * u ** 2 for dia, u in por_dia.items() if dia <= ayer)
+    return velocidad, cuadrados
+
+def test_velocidad_ewma_de_las_ventas_diarias(base_datos):
+    agregar_producto("Yerba", "Playadito", 1, 10.0, "Almacén")
+    ventas = [(1, AYER - timedelta(days=d), 1 + d % 4) for d in range(30)]
+    ventas += [(1, AYER, 3), (1, HOY, 50)]  # dos ventas el mismo día se suman; la de hoy todavía no cuenta
+    _vender(ventas)
+
+    motor = _motor()
+    assert motor.actualizar(hoy=HOY)["dias_nuevos"] == 60
+    velocidad, cuadrados = _ewma(ventas, 1, AYER, motor.alfa)
+    assert motor.alfa == pytest.approx(1 - 0.5 ** (1 / 7))
+    assert motor._velocidad[1] == pytest.approx(velocidad)
+    assert motor._cuadrados[1] == pytest.approx(cuadrados)
+
+    # Al día siguiente solo se suma el día cerrado nuevo, y da lo mismo que recalcular todo
+    assert motor.actualizar(hoy=HOY + timedelta(days=1))["dias_nuevos"] == 1
+    velocidad, cuadrados = _ewma(ventas, 1, HOY, motor.alfa)
+    assert motor._velocidad[1] == pytest.approx(velocidad)
+    assert motor._cuadrados[1] == pytest.approx(cuadrados)
+    assert motor.actualizar(hoy=HOY + timedelta(days=1))["dias_nuevos"] == 0
+
+    # Un motor nuevo retoma el estado guardado en lugar de releer la historia
+    otro = _motor()
+    assert otro.actualizar(hoy=HOY + timedelta(days=1))["dias_nuevos"] == 0
+    assert otro._velocidad[1] == pytest.approx(velocidad)
+
+def test_punto_de_pedido_y_stock_de_seguridad(base_datos):
+    agregar_producto("Yerba", "Playadito", 12, 10.0, "Almacén")
+    ventas = [(1, AYER - timedelta(days=d), 2 if d % 2 else 6) for d in range(40)]
+    _vender(ventas)
+
+    motor = _motor()
+    motor.actualizar(hoy=HOY)
+    velocidad, cuadrados = _ewma(ventas, 1, AYER, motor.alfa)
+    desvio = math.sqrt(cuadrados - velocidad ** 2)
+    punto = velocidad * 5 + 1.65 * desvio * math.sqrt(5)  # demanda en la entrega + stock de seguridad
+    assert desvio > 0 and 12 <= punto
+
+    [(producto_id, nombre, marca, stock, venta_diaria, cobertura, punto_pedido, sugerido)] = motor.alertas()
+    assert (producto_id, nombre, marca, stock) == (1, "Yerba", "Playadito", 12)
+    assert venta_diaria == pytest.approx(velocidad)
+    assert cobertura == pytest.approx(12 / velocidad)
+    assert punto_pedido == pytest.approx(punto)
+    assert sugerido == math.ceil(punto + velocidad * 10 - 12)  # llega al punto y cubre el ciclo
+
+    # Sin variación en las ventas no hay stock de seguridad
+    sin_z = _motor(z=0)
+    sin_z.actualizar(hoy=HOY)
+    assert sin_z.alertas()[0][6] == pytest.approx(velocidad * 5)
+
+def test_alertas_ordenadas_por_cobertura(base_datos):
+    for nombre, stock in (("Leche", 5), ("Pan", 5), ("Arroz", 100), ("Fideos", 0), ("Sal", 1), ("Azúcar", 4)):
+        agregar_producto(nombre, "Marca", stock, 1.0, "Almacén")
+    ventas = []
+    for d in range(30):
+        dia = AYER - timedelta(days=d)
+        ventas += [(1, dia, 10), (2, dia, 5), (3, dia, 1), (6, dia, 2)]
+    ventas.append((5, AYER, 30))  # Sal: una sola venta grande, ayer
+    _vender(ventas)  # Fideos no se vende: sin velocidad no hay alerta
+
+    motor = _motor()
+    resumen = motor.actualizar(hoy=HOY)
+    nombres = [alerta[1] for alerta in motor.alertas()]
+    # Sal (0,4 días de cobertura), Leche (0,5), Pan (1), Azúcar (2); Arroz tiene 100 días de stock
+    assert nombres == ["Sal", "Leche", "Pan", "Azúcar"]
+    assert [alerta[5] for alerta in motor.alertas()] == sorted(alerta[5] for alerta in motor.alertas())
+    assert resumen["alertas"] == motor.total_alertas == 4
+    version = motor.version
+
+    # El stock cambia por el registro de productos, sin releer el catálogo
+    actualizar_producto(2, "Pan", "Marca", 200, 1.0, "Almacén")
+    eliminar_producto(1)
+    resumen = motor.actualizar(hoy=HOY)
+    assert resumen["cambios_stock"] == 2 and resumen["dias_nuevos"] == 0
+    assert [alerta[1] for alerta in motor.alertas()] == ["Sal", "Azúcar"]
+    assert motor.version == version + 1
+
+    # La lista publicada se corta en max_alertas, el total no
+    corto = _motor(max_alertas=1)
+    corto.actualizar(hoy=HOY)
+    assert [alerta[1] for alerta in corto.alertas()] == ["Sal"]
+    assert corto.total_alertas == 2
@@ -0,0 +1,53 @@
+import sqlite3
+import threading
+import time
+from core.database import agregar_producto, registrar_venta, transaccion
+from core.respaldo import crear_respaldo
+
+VENTAS_PREVIAS = 20000
+VENTAS_DURANTE = 20
+LATENCIA_MAXIMA = 0.5  # segundos por venta; con busy_timeout, una venta bloqueada tarda 5 s o falla
+
+def test_respaldo_no_frena_las_ventas(base_datos, tmp_path):
+    agregar_producto("Yerba", "Marca", 1000, 100.0, "Almacén")
+    with transaccion("IMMEDIATE") as conn:
+        conn.execute(
+            f"""WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {VENTAS_PREVIAS})
+               INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario)
+               SELECT 1, 1, 1, datetime('now', 'localtime', '-' || i || ' minutes'), i, 100.0 FROM n"""
+        )
+
+    copiando, vendido = threading.Event(), threading.Event()
+    avance, resultado = [], {}
+
+    def _progreso(copiadas, totales):
+        avance.append(copiadas)
+        copiando.set()
+        vendido.wait(30)  # el respaldo queda a mitad de la copia mientras las cajas venden
+
+    def _respaldar():
+        resultado.update(crear_respaldo(str(tmp_path / "respaldos"), comprimir=False, progreso=_progreso, paginas=8))
+
+    hilo = threading.Thread(target=_respaldar, daemon=True)
+    hilo.start()
+    try:
+        assert copiando.wait(30)
+        latencias = []
+        for _ in range(VENTAS_DURANTE):
+            inicio = time.perf_counter()
+            assert registrar_venta(2, [(1, 1)]) is not None
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        vendido.set()
+        hilo.join(30)
+
+    assert not hilo.is_alive(), "el respaldo no terminó"
+    assert max(latencias) < LATENCIA_MAXIMA, latencias
+    assert not resultado["cancelado"] and len(avance) > 1
+    assert avance == sorted(avance)  # la copia nunca volvió a empezar
+    copia = sqlite3.connect(resultado["archivo"])
+    try:
+        # El respaldo es la foto del momento en que empezó: sin las ventas hechas durante la copia
+        assert copia.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == VENTAS_PREVIAS
+    finally:
+        copia.close()
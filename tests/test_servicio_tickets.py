@@ -0,0 +1,87 @@
+import os
+import time
+import pytest
+from PyQt5.QtCore import Qt
+from gui.servicio_tickets import ServicioTickets
+
+EMPRESA = {"nombre": "ORDICO", "cuit": "30-12345678-9", "direccion": "Calle Falsa 123"}
+PRODUCTOS = [
+    {"nombre": f"Producto {i}", "cantidad": 1 + i % 3, "precio_unitario": 100.0 + i, "total": (1 + i % 3) * (100.0 + i)}
+    for i in range(8)
+]
+SUBTOTAL = sum(p["total"] for p in PRODUCTOS)
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = ServicioTickets(directorio=str(tmp_path / "tickets"), dispositivo="")
+    servicio.listos, servicio.errores = [], []
+    # Conexión directa: las señales se reciben en el hilo de tickets, sin event loop de Qt
+    servicio.ticket_listo.connect(lambda numero, ruta: servicio.listos.append((numero, ruta)), Qt.DirectConnection)
+    servicio.ticket_error.connect(lambda numero, mensaje: servicio.errores.append((numero, mensaje)), Qt.DirectConnection)
+    yield servicio
+    if servicio._hilo.is_alive():
+        servicio.detener()
+
+def _encolar(servicio, numero, productos=PRODUCTOS, backend="texto"):
+    servicio.encolar(numero, EMPRESA, productos, SUBTOTAL, SUBTOTAL * 1.21, SUBTOTAL * 0.21, backend=backend)
+
+def test_tickets_en_orden_con_nombre_deterministico(servicio, tmp_path):
+    numeros = [7, 3, 120, 42, 99999999]
+    for numero in numeros:
+        _encolar(servicio, numero)
+    servicio.detener()
+
+    assert [numero for numero, _ in servicio.listos] == numeros  # en el orden en que se encolaron
+    for numero, ruta in servicio.listos:
+        assert ruta == str(tmp_path / "tickets" / f"ticket_{numero:08d}.txt")
+        assert os.path.isfile(ruta)
+    assert servicio.errores == []
+    assert sorted(os.listdir(tmp_path / "tickets")) == sorted(f"ticket_{n:08d}.txt" for n in numeros)  # sin .tmp
+
+def test_el_mismo_ticket_reescribe_el_mismo_archivo(servicio, tmp_path):
+    _encolar(servicio, 5, PRODUCTOS[:1])
+    _encolar(servicio, 5, PRODUCTOS)
+    servicio.detener()
+    assert servicio.listos[0][1] == servicio.listos[1][1]
+    assert os.listdir(tmp_path / "tickets") == ["ticket_00000005.txt"]
+    with open(servicio.listos[1][1], encoding="utf-8") as archivo:
+        assert "Producto 7" in archivo.read()
+
+def test_un_error_se_informa_y_el_servicio_sigue(servicio):
+    _encolar(servicio, 1, backend="inexistente")
+    _encolar(servicio, 2, [{"nombre": "Sin precio"}])
+    _encolar(servicio, 3)
+    servicio.detener()
+    assert [numero for numero, _ in servicio.errores] == [1, 2]
+    assert "Backend de tickets desconocido" in servicio.errores[0][1]
+    assert [numero for numero, _ in servicio.listos] == [3]
+
+def test_detener_vacia_la_cola_antes_de_terminar(servicio):
+    for numero in range(1, 51):
+        _encolar(servicio, numero)
+    servicio.detener()
+    assert not servicio._hilo.is_alive()
+    assert servicio.pendientes() == 0
+    assert len(servicio.listos) == 50
+
+RAFAGA = 200
+
+@pytest.mark.parametrize("backend", ["pdf", "texto", "escpos"])
+def test_rafaga_de_tickets(servicio, backend):
+    """Benchmark: una ráfaga de tickets de 8 renglones; la caja solo paga el encolado."""
+    _encolar(servicio, 0, backend=backend)  # primer ticket: carga del backend (fpdf, fuentes)
+    while not servicio.listos:
+        time.sleep(0.01)
+
+    inicio = time.perf_counter()
+    for numero in range(1, RAFAGA + 1):
+        _encolar(servicio, numero, backend=backend)
+    encolado = time.perf_counter() - inicio
+    servicio.detener()
+    total = time.perf_counter() - inicio
+
+    print(f"\n{backend}: encolar {encolado / RAFAGA * 1e6:.0f} µs por venta, "
+          f"{RAFAGA / total:.0f} tickets/s")
+    assert len(servicio.listos) == RAFAGA + 1 and servicio.errores == []
+    assert encolado / RAFAGA < 0.001  # el hilo de la interfaz no espera el renderizado
+    assert RAFAGA / total > 50
@@ -0,0 +1,112 @@
+import multiprocessing
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from core.database import (
+    agregar_producto, conectar_db, registrar_venta, transaccion, aplicar_migraciones, StockInsuficiente,
+    VentaInvalida,
+)
+from core.archivo_ventas import archivar_anio, ventas_en_rango
+
+def _vender(ruta, usuario_id, intentos):
+    """Corre en otro proceso: vende de a una unidad del producto 1 hasta agotar los intentos."""
+    from core import database
+
+    database.DB_PATH = ruta
+    tickets, rechazadas = [], 0
+    for _ in range(intentos):
+        try:
+            ticket = registrar_venta(usuario_id, [(1, 1)])
+        except StockInsuficiente:
+            rechazadas += 1
+        else:
+            assert ticket is not None
+            tickets.append(ticket)
+    return tickets, rechazadas
+
+def test_varias_cajas_venden_el_mismo_producto(base_datos):
+    stock, cajas, intentos = 50, 4, 20
+    agregar_producto("Yerba", "Marca", stock, 100.0, "Almacén")
+
+    with ProcessPoolExecutor(cajas, mp_context=multiprocessing.get_context("spawn")) as ejecutor:
+        resultados = list(ejecutor.map(_vender, [base_datos] * cajas, range(1, cajas + 1), [intentos] * cajas))
+
+    tickets = [ticket for vendidos, _ in resultados for ticket in vendidos]
+    rechazadas = sum(rechazos for _, rechazos in resultados)
+    assert len(tickets) == stock and rechazadas == cajas * intentos - stock
+    assert len(set(tickets)) == stock  # un número de ticket por venta, sin repetidos
+    conn = conectar_db()
+    assert conn.execute("SELECT cantidad FROM productos WHERE id = 1").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*), SUM(cantidad) FROM ventas").fetchone() == (stock, stock)
+
+def test_venta_sin_stock_no_deja_rastros(base_datos):
+    agregar_producto("Yerba", "Marca", 2, 100.0, "Almacén")
+    agregar_producto("Azúcar", "Marca", 10, 50.0, "Almacén")
+    try:
+        registrar_venta(1, [(2, 1), (1, 3)])
+    except StockInsuficiente as e:
+        assert (e.producto_id, e.solicitado, e.disponible) == (1, 3, 2)
+    else:
+        raise AssertionError("la venta debía rechazarse")
+    conn = conectar_db()
+    assert conn.execute("SELECT cantidad FROM productos ORDER BY id").fetchall() == [(2,), (10,)]
+    assert conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 0
+
+def _archivar_tickets_de_2024():
+    """Cinco tickets de 2024 (1 a 5), archivados: la tabla ventas queda vacía."""
+    with transaccion("IMMEDIATE") as conn:
+        conn.executemany(
+            "INSERT INTO ventas (usuario_id, producto_id, cantidad, fecha, ticket, precio_unitario) VALUES (?, ?, ?, ?, ?, ?)",
+            [(1, 1, 1, f"2024-0{ticket}-10 10:00:00", ticket, 100.0) for ticket in range(1, 6)],
+        )
+    assert archivar_anio(2024)["borradas"] == 5
+    assert conectar_db().execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 0
+
+def test_el_ticket_sigue_despues_de_archivar(base_datos):
+    agregar_producto("Yerba", "Marca", 10, 100.0, "Almacén")
+    _archivar_tickets_de_2024()
+    assert registrar_venta(1, [(1, 1)]) == 6
+    assert registrar_venta(1, [(1, 1)]) == 7
+
+def test_ventas_en_rango_anidadas(base_datos):
+    agregar_producto("Yerba", "Marca", 10, 100.0, "Almacén")
+    _archivar_tickets_de_2024()
+    registrar_venta(1, [(1, 1)])
+    conn = conectar_db()
+
+    def contar(tabla):
+        return conn.execute(f"SELECT COUNT(*) FROM {tabla} WHERE fecha < '2025-01-01'").fetchone()[0]
+
+    with ventas_en_rango("2024-01-01", "2025-01-01") as externa:
+        with ventas_en_rango() as interna:  # cada una con su vista y sus adjuntos
+            assert externa != interna
+            assert contar(externa) == contar(interna) == 5
+        assert contar(externa) == 5  # cerrar la interna no borra la externa
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_temp_master WHERE type = 'view'").fetchone()[0] == 0
+    assert [fila[1] for fila in conn.execute("PRAGMA database_list")] == ["main", "temp"]
+
+def test_la_migracion_siembra_la_secuencia_con_los_archivos(base_datos):
+    agregar_producto("Yerba", "Marca", 10, 100.0, "Almacén")
+    _archivar_tickets_de_2024()
+    # Base archivada antes de existir la secuencia
+    with transaccion("IMMEDIATE") as conn:
+        conn.execute("DROP TRIGGER ventas_secuencia_ai")
+        conn.execute("DROP TABLE secuencia_tickets")
+        conn.execute("PRAGMA user_version = 9")
+    aplicar_migraciones()
+    assert registrar_venta(1, [(1, 1)]) == 6
+
+@pytest.mark.parametrize("items, mensaje", [
+    ([(1, -3)], "Cantidad inválida"),
+    ([(1, 0)], "Cantidad inválida"),
+    ([(1, 2), (1, -1)], "Cantidad inválida"),  # no se compensa dentro del carrito
+    ([(1, 1), (99, 1)], "Productos inexistentes: 99"),
+    ([], "no tiene productos"),
+])
+def test_venta_invalida_no_deja_rastros(base_datos, items, mensaje):
+    agregar_producto("Yerba", "Marca", 5, 100.0, "Almacén")
+    with pytest.raises(VentaInvalida, match=mensaje):
+        registrar_venta(1, items)
+    conn = conectar_db()
+    assert conn.execute("SELECT cantidad FROM productos").fetchall() == [(5,)]
+    assert conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 0
+    assert conn.execute("SELECT ultimo FROM secuencia_tickets").fetchone()[0] == 0
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde un archivo .env (opcional)
@@ -6,7 +7,97 @@ load_dotenv()
 
 # Configuración de la base de datos
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Obtiene el directorio actual
-DB_PATH = "ordico.db"
+DB_PATH = os.getenv("DB_PATH", "ordico.db")  # otra ruta permite medir con bases de prueba
+
+# Perfiles de PRAGMA para SQLite (se elige con la variable de entorno DB_PERFIL)
+DB_PERFILES = {
+    # WAL: los cajeros pueden leer y vender mientras se importa stock
+    "rendimiento": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,       # en KiB (negativo) → 64 MiB
+        "mmap_size": 268435456,     # 256 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,       # ms
+    },
+    # WAL con fsync en cada commit (más lento, máxima durabilidad)
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+    # Comportamiento original de SQLite (rollback journal)
+    "compatible": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
+DB_PERFIL = os.getenv("DB_PERFIL", "rendimiento")
+DB_MANTENIMIENTO_INTERVALO = 300  # segundos entre wal_checkpoint/optimize
+
+# Archivo de ventas de años cerrados (ventas_AAAA.db); vacío = misma carpeta que la base
+VENTAS_ARCHIVO_DIR = os.getenv("VENTAS_ARCHIVO_DIR", "")
+VENTAS_ARCHIVO_LOTE = 2000  # renglones borrados de la base principal por transacción
+VENTAS_ARCHIVO_PAUSA = 0.02  # segundos entre lotes de borrado
+
+# Respaldos en caliente con la API de backup de SQLite (core/respaldo.py)
+RESPALDO_DIR = os.getenv("RESPALDO_DIR", os.path.join(os.path.dirname(BASE_DIR), "respaldos"))
+RESPALDO_PAGINAS_POR_PASO = 1024  # páginas copiadas por paso (4 MiB con páginas de 4 KiB)
+RESPALDO_PAUSA = 0.0              # segundos entre pasos
+RESPALDO_INTERVALO = 6 * 3600     # segundos entre respaldos programados
+RESPALDO_RETENCION = 28           # respaldos que se conservan (una semana a 4 por día)
+RESPALDO_COMPRIMIR = True         # gzip, en el hilo de respaldos
+RESPALDO_COMPRESION_NIVEL = 1
+
+# Clave natural de productos para sincronizar catálogos (columnas de la tabla productos)
+CLAVE_NATURAL_PRODUCTOS = ("nombre", "marca")
+
+# Productos con esta cantidad o menos se consideran con stock bajo
+STOCK_BAJO = 5
+
+# Reposición: velocidad de venta por EWMA y punto de pedido = demanda en la entrega + stock de seguridad
+REPOSICION_VIDA_MEDIA_DIAS = 14     # una venta de hace 14 días pesa la mitad que una de ayer
+REPOSICION_HISTORIA_DIAS = 180      # días de ventas que se leen en la primera carga
+REPOSICION_DIAS_ENTREGA = 7         # demora del proveedor
+REPOSICION_DIAS_CICLO = 14          # días de venta que debe cubrir cada pedido
+REPOSICION_NIVEL_SERVICIO_Z = 1.65  # ≈ 95 % de probabilidad de no quedarse sin stock en la entrega
+REPOSICION_INTERVALO = 60           # segundos entre actualizaciones del motor
+REPOSICION_MAX_ALERTAS = 500        # tamaño de la lista publicada
+
+# Tickets de venta (PDF) generados en segundo plano
+TICKETS_DIR = os.path.join(os.path.dirname(BASE_DIR), "tickets")
+TICKET_DISENO = os.getenv("TICKET_DISENO", "a4")  # "a4" o "termica" (rollo de 80 mm)
+TICKET_BACKEND = os.getenv("TICKET_BACKEND", "pdf")  # "pdf", "texto" o "escpos"
+TICKET_ANCHO_TEXTO = int(os.getenv("TICKET_ANCHO_TEXTO", "48"))  # caracteres por línea (80 mm: 48, 58 mm: 32)
+TICKET_DISPOSITIVO = os.getenv("TICKET_DISPOSITIVO", "")  # impresora (/dev/usb/lp0) o carpeta de spool; vacío = TICKETS_DIR
+
+# Datos que se imprimen en los tickets
+DATOS_EMPRESA = {
+    "nombre": "ORDICO",
+    "cuit": "30-12345678-9",
+    "direccion": "Calle Falsa 123",
+}
+TASA_IMPUESTOS = 0.21  # IVA aplicado sobre el subtotal
+
+# Hash de contraseñas (PBKDF2-SHA256). Los hashes con otro costo se regeneran al iniciar sesión
+PASSWORD_HASH_ITERACIONES = int(os.getenv("PASSWORD_HASH_ITERACIONES", "1000000"))
+AUTH_HILOS = 2  # hilos que calculan hashes fuera de la interfaz (hashlib libera el GIL)
+
+# Límite de intentos de login (ventana deslizante por usuario y por terminal)
+TERMINAL_ID = os.getenv("TERMINAL_ID", socket.gethostname())
+LOGIN_VENTANA = 60                  # segundos
+LOGIN_MAX_INTENTOS_USUARIO = 5      # por usuario/email dentro de la ventana
+LOGIN_MAX_INTENTOS_TERMINAL = 30    # por terminal dentro de la ventana
+LOGIN_BLOQUEO_BASE = 30             # segundos del primer bloqueo; se duplica en cada bloqueo siguiente
+LOGIN_BLOQUEO_MAX = 900
+LOGIN_MAX_CLAVES = 10000            # claves recordadas (LRU)
 
 # Configuración del correo electrónico
 SMTP_SERVER = "smtp.gmail.com"
@@ -1,3 +1,4 @@
+import unicodedata
 import random
 import string
 
@@ -14,3 +15,9 @@ def generar_nueva_contrasena(longitud=8):
     """
     caracteres = string.ascii_letters + string.digits
     return ''.join(random.choice(caracteres) for _ in range(longitud))
+
+def normalizar_texto(texto):
+    """
+    Pasa el texto a minúsculas y sin acentos ("Lácteos" -> "lacteos") para búsquedas.
+    """
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii").lower()